@@ -0,0 +1,443 @@
+"""
+Load test - throughput, tail latency and errors of the /analyze_crisis service
+
+Closed-loop load: `--concurrency` workers each keep one keep-alive connection
+and send the next request as soon as the previous one returns. Passing
+several levels (--concurrency 1,4,16,64) shows where throughput stops
+growing and latency takes off.
+
+Requests are drawn from the synthetic corpus of pipeline_benchmark.py. The
+mix weights four request kinds: "full" and "triage" analyses, "deferred"
+(defer_explanation) and "batch" (/analyze_batch with --batch-size items).
+
+Without --url the service runs in this process: uvicorn serves main.app on a
+free localhost port, and the Gemini client is replaced by StubGeminiClient
+with the configured latency and error rate. No API key or network is needed.
+Caches are disabled unless --cache is given, so each request does the full
+work. `serve` starts the same stubbed service for a load generator running
+elsewhere.
+
+Usage:
+    python benchmarks/load_test.py run --concurrency 1,8,32 --requests 500
+    python benchmarks/load_test.py run --mix full=0.6,triage=0.3,batch=0.1 --gemini-error-rate 0.1
+    python benchmarks/load_test.py serve --port 8000 --gemini-latency-ms 1200
+    python benchmarks/load_test.py run --url http://127.0.0.1:8000 --output load.json
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.pipeline_benchmark import make_corpus, percentile
+from utils.config import config
+from utils.logger import logger
+
+REQUEST_KINDS = ("full", "triage", "deferred", "batch")
+DEFAULT_MIX = "full=0.7,triage=0.2,deferred=0.05,batch=0.05"
+
+
+class StubGeminiClient:
+    """
+    Stand-in for GeminiClient that sleeps instead of calling the API
+
+    Latency is drawn from a normal distribution (clipped at zero). A share
+    `error_rate` of calls fails the way the real client reports errors, and
+    `timeout_rate` of calls hang for `timeout_seconds`, which trips
+    AsyncGeminiClient's per-call timeout in async serving mode.
+    """
+
+    model_name = "stub-gemini"
+
+    def __init__(self, latency_ms: float = 800.0, jitter_ms: float = 200.0,
+                 error_rate: float = 0.0, timeout_rate: float = 0.0,
+                 timeout_seconds: float = 30.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.hangs = 0
+
+    def _draw(self) -> Tuple[float, float]:
+        with self._lock:
+            self.calls += 1
+            return max(0.0, self._rng.gauss(self.latency_ms, self.jitter_ms)) / 1000, self._rng.random()
+
+    def generate_content(self, prompt: str) -> Dict[str, Any]:
+        delay, roll = self._draw()
+        if roll < self.timeout_rate:
+            with self._lock:
+                self.hangs += 1
+            time.sleep(self.timeout_seconds)
+            return {"success": False, "error": "stub: no response", "model": self.model_name}
+
+        time.sleep(delay)
+        if roll < self.timeout_rate + self.error_rate:
+            with self._lock:
+                self.errors += 1
+            return {"success": False, "error": "stub: 503 model overloaded", "model": self.model_name}
+        return {
+            "success": True,
+            "text": f"Stub assessment of a {len(prompt)}-character prompt: respond according to priority.",
+            "model": self.model_name
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"calls": self.calls, "errors": self.errors, "hangs": self.hangs}
+
+
+def install_stub_gemini(pipeline, stub: StubGeminiClient, cache: bool = False):
+    """Route the pipeline's Gemini explanations (sync, async and deferred) to the stub"""
+    from utils.gemini_client import AsyncGeminiClient
+
+    generator = pipeline.explanation_generator
+    generator.gemini_client = stub
+    generator.async_client = AsyncGeminiClient(stub)
+    generator.use_gemini = True
+    if not cache:
+        generator.explanation_cache = None
+        pipeline.result_cache = None
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """"full=0.7,triage=0.3" -> normalised weights"""
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in REQUEST_KINDS:
+            raise ValueError(f"Unknown request kind '{kind}', expected one of {REQUEST_KINDS}")
+        mix[kind] = float(weight or 1)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("Request mix weights must add up to more than zero")
+    return {kind: weight / total for kind, weight in mix.items()}
+
+
+def build_requests(count: int, mix: Dict[str, float], batch_size: int = 8,
+                   seed: int = 42) -> List[Tuple[str, str, bytes]]:
+    """Deterministic (kind, path, body) list; cycled through when the run needs more"""
+    rng = random.Random(seed)
+    corpus = make_corpus(max(count, 1) * 2, seed)
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+
+    def item(report: Dict[str, Any], **extra) -> Dict[str, Any]:
+        return {"text": report["text"], "source": "loadtest", "location": "Chennai", **extra}
+
+    requests = []
+    for _ in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "batch":
+            body = [item(rng.choice(corpus)) for _ in range(batch_size)]
+            path = "/analyze_batch"
+        else:
+            extra = {"mode": "triage"} if kind == "triage" else {}
+            if kind == "deferred":
+                extra["defer_explanation"] = True
+            body = item(rng.choice(corpus), **extra)
+            path = "/analyze_crisis"
+        requests.append((kind, path, json.dumps(body).encode("utf-8")))
+    return requests
+
+
+class _Worker:
+    """One keep-alive connection; reconnects after a failed request"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.connection = None
+
+    def send(self, path: str, body: bytes) -> Optional[str]:
+        """None on success, otherwise an error label"""
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            self.connection.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            response = self.connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                return f"http_{response.status}"
+            return None
+        except Exception as e:
+            self.connection.close()
+            self.connection = None
+            return type(e).__name__
+
+
+def _latency_summary(latencies_ms: List[float]) -> Dict[str, Any]:
+    if not latencies_ms:
+        return {"count": 0}
+    return {
+        "count": len(latencies_ms),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms), 2),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 2)
+    }
+
+
+def run_level(url: str, requests: List[Tuple[str, str, bytes]], concurrency: int,
+              total: int, duration: Optional[float] = None, warmup: int = 0,
+              timeout: float = 60.0) -> Dict[str, Any]:
+    """Closed-loop run at one concurrency level; stops after `total` requests or `duration` seconds"""
+    parsed = urlparse(url)
+    host, port = parsed.hostname, parsed.port or 80
+
+    warm = _Worker(host, port, timeout)
+    for i in range(warmup):
+        _, path, body = requests[i % len(requests)]
+        warm.send(path, body)
+
+    lock = threading.Lock()
+    next_index = [0]
+    samples: List[Tuple[str, float, Optional[str]]] = []
+    deadline = time.perf_counter() + duration if duration else None
+
+    def take() -> Optional[int]:
+        with lock:
+            if next_index[0] >= total or (deadline and time.perf_counter() >= deadline):
+                return None
+            next_index[0] += 1
+            return next_index[0] - 1
+
+    def loop():
+        worker = _Worker(host, port, timeout)
+        while True:
+            index = take()
+            if index is None:
+                return
+            kind, path, body = requests[index % len(requests)]
+            start = time.perf_counter()
+            error = worker.send(path, body)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                samples.append((kind, elapsed, error))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(loop)
+    wall = time.perf_counter() - started
+
+    errors: Dict[str, int] = {}
+    by_kind: Dict[str, List[float]] = {}
+    ok_latencies = []
+    for kind, elapsed, error in samples:
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+            continue
+        ok_latencies.append(elapsed)
+        by_kind.setdefault(kind, []).append(elapsed)
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "succeeded": len(ok_latencies),
+        "errors": errors,
+        "duration_s": round(wall, 3),
+        "throughput_rps": round(len(ok_latencies) / wall, 2) if wall else None,
+        "latency": _latency_summary(ok_latencies),
+        "by_kind": {kind: _latency_summary(by_kind[kind]) for kind in REQUEST_KINDS if kind in by_kind}
+    }
+
+
+class InProcessServer:
+    """main.app on uvicorn in a background thread, with the stub Gemini installed"""
+
+    def __init__(self, stub: StubGeminiClient, cache: bool = False,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.stub = stub
+        self.cache = cache
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def start(self) -> str:
+        import uvicorn
+        # main.py picks the endpoint flavour from config at import time
+        with contextlib.redirect_stdout(io.StringIO()):
+            import main
+            pipeline = main.get_pipeline()
+        install_stub_gemini(pipeline, self.stub, self.cache)
+
+        self.server = uvicorn.Server(uvicorn.Config(main.app, host=self.host, port=self.port,
+                                                    log_level="warning", access_log=False))
+        self.thread = threading.Thread(target=self.server.run, name="loadtest-server", daemon=True)
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("In-process server failed to start")
+            time.sleep(0.05)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        return f"http://{self.host}:{port}"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.should_exit = True
+            self.thread.join(timeout=10)
+
+
+def wait_until_ready(url: str, timeout: float = 300.0) -> Dict[str, Any]:
+    """Poll /ready until the model is loaded or has failed (keyword-only serving)"""
+    parsed = urlparse(url)
+    deadline = time.monotonic() + timeout
+    readiness: Dict[str, Any] = {}
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=5)
+            connection.request("GET", "/ready")
+            readiness = json.loads(connection.getresponse().read() or b"{}")
+            connection.close()
+            if readiness.get("model_state") in ("ready", "failed"):
+                return readiness
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.5)
+    return readiness
+
+
+def _stub_from_args(args) -> StubGeminiClient:
+    return StubGeminiClient(args.gemini_latency_ms, args.gemini_jitter_ms, args.gemini_error_rate,
+                            args.gemini_timeout_rate, config.GEMINI_TIMEOUT_SECONDS * 2, args.seed)
+
+
+def _apply_serving_config(args):
+    if args.serving_mode:
+        config.SERVING_MODE = args.serving_mode
+    if args.micro_batching is not None:
+        config.ENABLE_MICRO_BATCHING = args.micro_batching
+
+
+def command_run(args):
+    mix = parse_mix(args.mix)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    requests = build_requests(max(args.requests, 1), mix, args.batch_size, args.seed)
+
+    server = None
+    stub = None
+    url = args.url
+    if url is None:
+        _apply_serving_config(args)
+        stub = _stub_from_args(args)
+        server = InProcessServer(stub, args.cache)
+        url = server.start()
+
+    try:
+        readiness = wait_until_ready(url)
+        results = []
+        for level in levels:
+            row = run_level(url, requests, level, args.requests, args.duration, args.warmup, args.timeout)
+            results.append(row)
+            latency = row["latency"]
+            print(f"c={level:<4} {row['throughput_rps']:>8} req/s  p50={latency.get('p50_ms')}ms  "
+                  f"p99={latency.get('p99_ms')}ms  errors={sum(row['errors'].values())}", file=sys.stderr)
+    finally:
+        if server is not None:
+            server.stop()
+
+    report = {
+        "meta": {
+            "target": args.url or "in-process",
+            "serving_mode": config.SERVING_MODE if args.url is None else None,
+            "micro_batching": config.ENABLE_MICRO_BATCHING if args.url is None else None,
+            "mix": mix,
+            "batch_size": args.batch_size,
+            "seed": args.seed,
+            "model_state": readiness.get("model_state"),
+            "stub_gemini": None if stub is None else {
+                "latency_ms": stub.latency_ms,
+                "jitter_ms": stub.jitter_ms,
+                "error_rate": stub.error_rate,
+                "timeout_rate": stub.timeout_rate,
+                **stub.get_stats()
+            }
+        },
+        "levels": results
+    }
+    encoded = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(encoded + "\n")
+    else:
+        print(encoded)
+
+
+def command_serve(args):
+    _apply_serving_config(args)
+    server = InProcessServer(_stub_from_args(args), args.cache, args.host, args.port)
+    url = server.start()
+    print(f"Serving main.app with stub Gemini on {url} (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        while server.thread.is_alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    service = argparse.ArgumentParser(add_help=False)
+    service.add_argument("--gemini-latency-ms", type=float, default=800.0)
+    service.add_argument("--gemini-jitter-ms", type=float, default=200.0)
+    service.add_argument("--gemini-error-rate", type=float, default=0.0)
+    service.add_argument("--gemini-timeout-rate", type=float, default=0.0,
+                         help="Share of Gemini calls that never answer in time")
+    service.add_argument("--serving-mode", choices=["sync", "async"], default=None,
+                         help="Override config.SERVING_MODE")
+    service.add_argument("--micro-batching", dest="micro_batching", action="store_true", default=None)
+    service.add_argument("--no-micro-batching", dest="micro_batching", action="store_false")
+    service.add_argument("--cache", action="store_true",
+                         help="Keep the result and explanation caches (off: every request does full work)")
+    service.add_argument("--seed", type=int, default=42)
+
+    run_parser = commands.add_parser("run", parents=[service], help="Generate load and report")
+    run_parser.add_argument("--url", default=None, help="Running service (default: start one in-process)")
+    run_parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated levels")
+    run_parser.add_argument("--requests", type=int, default=200, help="Requests per level")
+    run_parser.add_argument("--duration", type=float, default=None, help="Stop a level after this many seconds")
+    run_parser.add_argument("--warmup", type=int, default=10, help="Unrecorded requests before each level")
+    run_parser.add_argument("--mix", default=DEFAULT_MIX)
+    run_parser.add_argument("--batch-size", type=int, default=8)
+    run_parser.add_argument("--timeout", type=float, default=60.0, help="Client timeout per request")
+    run_parser.add_argument("--output", default=None, help="Write the JSON report here (default: stdout)")
+
+    serve_parser = commands.add_parser("serve", parents=[service], help="Serve main.app with the stub Gemini")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+
+    args = parser.parse_args()
+    # Per-request log records and fallback warnings would compete with the
+    # service for the GIL and the console
+    logger.setLevel(logging.ERROR)
+    if args.command == "run":
+        command_run(args)
+    else:
+        command_serve(args)
+
+
+if __name__ == "__main__":
+    main()
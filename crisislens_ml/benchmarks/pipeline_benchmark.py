@@ -0,0 +1,269 @@
+"""
+Pipeline benchmark - per-stage and end-to-end latency on a synthetic corpus
+
+Generates a deterministic corpus of crisis and non-crisis reports in four
+length classes (alert ~150 chars, report ~1.5k, article ~10k, long article
+~50k), then times every stage on its public entry point and the whole
+CrisisPipeline.analyze (result cache disabled). Each stage gets the raw text,
+so its numbers include building its TextFeatures.
+
+The JSON written to --output is stable for a given seed and corpus size, so
+two runs can be diffed between commits; --compare prints the p50/p95 change
+against an earlier file.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py --reports 200 --output bench.json
+    python benchmarks/pipeline_benchmark.py --output new.json --compare bench.json
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main_pipeline import CrisisPipeline
+from utils.config import config
+from utils.logger import logger
+
+# Target size in characters of each length class
+LENGTH_CLASSES = {"alert": 150, "report": 1500, "article": 10000, "long_article": 50000}
+# Share of the corpus in each class; long articles are rare in the feed
+LENGTH_WEIGHTS = {"alert": 0.5, "report": 0.3, "article": 0.15, "long_article": 0.05}
+CRISIS_SHARE = 0.6
+
+CRISIS_SENTENCES = [
+    "Heavy rainfall causes severe flooding in {place}, {n} homes submerged.",
+    "Fire breaks out at the {place} market complex, {n} shops affected.",
+    "Earthquake of magnitude 5.{d} felt across {place}, {n} people injured.",
+    "Cyclone warning issued for {place}, {n} fishermen still missing at sea.",
+    "Landslide blocks the road near {place} after heavy rain, {n} vehicles stranded.",
+    "Dengue outbreak in {place}, hospitals report {n} new cases and a shortage of beds.",
+    "Rescue teams evacuate {n} residents trapped by rising water in {place}.",
+    "Urgent help needed in {place}, {n} families displaced and without food.",
+]
+NEUTRAL_SENTENCES = [
+    "The city council discussed the new park budget for {place} at today's meeting.",
+    "Beautiful weather in {place} today, perfect for the beach.",
+    "Scheduled maintenance of the water supply in {place} on Sunday.",
+    "Local schools in {place} announced the results of the annual sports day.",
+    "Traffic was slow on the main road near {place} station this morning.",
+    "A new library branch with {n} seats opened in {place}.",
+    "Residents of {place} gathered for the weekend farmers market.",
+    "The metro extension to {place} is expected to finish next year.",
+]
+PLACES = ["Chennai", "Adyar", "T Nagar", "Velachery", "Tambaram", "Guindy", "Mylapore", "Porur"]
+
+
+def _sentence(rng: random.Random, pool: List[str]) -> str:
+    return rng.choice(pool).format(place=rng.choice(PLACES), n=rng.randint(2, 400), d=rng.randint(0, 9))
+
+
+def make_report(rng: random.Random, length_class: str, is_crisis: bool) -> str:
+    """One report: a crisis report opens with a crisis sentence and mixes in background"""
+    target = LENGTH_CLASSES[length_class]
+    sentences = [_sentence(rng, CRISIS_SENTENCES if is_crisis else NEUTRAL_SENTENCES)]
+    size = len(sentences[0])
+    while size < target:
+        pool = CRISIS_SENTENCES if is_crisis and rng.random() < 0.3 else NEUTRAL_SENTENCES
+        sentence = _sentence(rng, pool)
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def make_corpus(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Deterministic corpus of {"text", "length_class", "is_crisis"} records"""
+    rng = random.Random(seed)
+    classes = list(LENGTH_WEIGHTS)
+    weights = [LENGTH_WEIGHTS[c] for c in classes]
+    corpus = []
+    for _ in range(count):
+        length_class = rng.choices(classes, weights)[0]
+        is_crisis = rng.random() < CRISIS_SHARE
+        corpus.append({
+            "text": make_report(rng, length_class, is_crisis),
+            "length_class": length_class,
+            "is_crisis": is_crisis
+        })
+    return corpus
+
+
+def corpus_digest(corpus: List[Dict[str, Any]]) -> str:
+    digest = hashlib.sha256()
+    for item in corpus:
+        digest.update(item["text"].encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies_ms: List[float]) -> Dict[str, float]:
+    total_seconds = sum(latencies_ms) / 1000
+    return {
+        "count": len(latencies_ms),
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3),
+        "throughput_per_s": round(len(latencies_ms) / total_seconds, 1) if total_seconds else None
+    }
+
+
+def time_stage(fn: Callable[[Dict[str, Any]], Any], corpus: List[Dict[str, Any]],
+               repeat: int = 1) -> Dict[str, Any]:
+    """Latency of fn over the corpus, overall and per length class"""
+    by_class: Dict[str, List[float]] = {}
+    everything = []
+    for _ in range(repeat):
+        for item in corpus:
+            start = time.perf_counter()
+            fn(item)
+            elapsed = (time.perf_counter() - start) * 1000
+            everything.append(elapsed)
+            by_class.setdefault(item["length_class"], []).append(elapsed)
+    return {
+        **summarize(everything),
+        "by_length": {c: summarize(by_class[c]) for c in LENGTH_CLASSES if c in by_class}
+    }
+
+
+def build_stages(pipeline: CrisisPipeline) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    detector = pipeline.crisis_detector
+    classifier = pipeline.type_classifier
+    severity = pipeline.severity_estimator
+    urgency = pipeline.urgency_detector
+    explainer = pipeline.explanation_generator
+
+    # Fixed inputs so only the explanation builder itself is timed
+    severity_sample = severity.estimate(CRISIS_SENTENCES[0].format(place="Chennai", n=12, d=0))
+    urgency_sample = urgency.detect(CRISIS_SENTENCES[6].format(place="Chennai", n=12, d=0))
+    info_gaps = {"completeness_score": 0.7, "information_gaps": []}
+
+    return {
+        "crisis_detector.detect": lambda item: detector.detect(item["text"]),
+        "crisis_detector.predict": lambda item: detector.predict(item["text"]),
+        "type_classifier.classify": lambda item: classifier.classify(item["text"]),
+        "severity_estimator.estimate": lambda item: severity.estimate(item["text"]),
+        "urgency_detector.detect": lambda item: urgency.detect(item["text"]),
+        "explanation_generator.rule_based": lambda item: explainer._generate_rule_based(
+            "Flood", severity_sample, urgency_sample, info_gaps, 0.7, item["text"][:200], "Chennai"
+        ),
+        "pipeline.analyze": lambda item: pipeline.analyze(
+            item["text"], source="benchmark", location="Chennai"
+        ),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(reports: int = 200, seed: int = 42, repeat: int = 1,
+                  stages: Optional[List[str]] = None) -> Dict[str, Any]:
+    corpus = make_corpus(reports, seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline = CrisisPipeline()
+    pipeline.result_cache = None
+    timed = build_stages(pipeline)
+    if stages:
+        timed = {name: fn for name, fn in timed.items() if name in stages}
+
+    # Warm up every stage (compiled regexes, lazy model load) before timing
+    warmup = corpus[:5]
+    for fn in timed.values():
+        for item in warmup:
+            fn(item)
+
+    results = {name: time_stage(fn, corpus, repeat) for name, fn in timed.items()}
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config_fingerprint": config.fingerprint(),
+            "detection_backend": pipeline.crisis_detector.backend_name,
+            "model_state": pipeline.crisis_detector.load_state,
+            "seed": seed,
+            "repeat": repeat,
+            "corpus": {
+                "reports": len(corpus),
+                "sha256": corpus_digest(corpus),
+                "crisis": sum(item["is_crisis"] for item in corpus),
+                "by_length": {c: sum(item["length_class"] == c for item in corpus) for c in LENGTH_CLASSES}
+            }
+        },
+        "stages": results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """p50/p95 change per stage against a previous run"""
+    lines = []
+    if current["meta"]["corpus"]["sha256"] != baseline["meta"]["corpus"]["sha256"]:
+        lines.append("warning: corpora differ, deltas are not like for like")
+    for name, row in current["stages"].items():
+        old = baseline["stages"].get(name)
+        if old is None:
+            lines.append(f"{name}: new")
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms"):
+            change = 100 * (row[key] - old[key]) / old[key] if old[key] else 0.0
+            deltas.append(f"{key} {old[key]:.3f} -> {row[key]:.3f} ({change:+.1f}%)")
+        lines.append(f"{name}: " + ", ".join(deltas))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus per stage")
+    parser.add_argument("--stage", action="append", default=None,
+                        help="Only run this stage (repeatable), e.g. pipeline.analyze")
+    parser.add_argument("--output", default=None, help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", default=None, help="Earlier JSON report to diff against")
+    args = parser.parse_args()
+
+    # Per-request records (and the keyword-fallback warnings when no model is
+    # installed) would otherwise be timed and interleaved with the report
+    logger.setLevel(logging.CRITICAL)
+    report = run_benchmark(args.reports, args.seed, args.repeat, args.stage)
+
+    encoded = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(encoded + "\n")
+    else:
+        print(encoded)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for line in compare(report, baseline):
+            print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Triage vs full analysis - latency and payload size
+
+Runs the same reports through CrisisPipeline.analyze in mode="full" and
+mode="triage" (result cache disabled) and prints per-mode latency
+percentiles and mean JSON payload size.
+
+Usage:
+    python benchmarks/triage_benchmark.py --reports 200
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main_pipeline import CrisisPipeline
+
+TEMPLATES = [
+    "Heavy rainfall causes severe flooding in {place}. {n} homes submerged, urgent evacuation ordered.",
+    "Fire breaks out at {place} market complex, {n} shops affected, fire department responding.",
+    "Earthquake of magnitude 5.8 felt across {place}, {n} people injured and buildings collapsed.",
+    "Cyclone warning issued for {place}, {n} fishermen still missing at sea.",
+    "Beautiful weather in {place} today, perfect for the beach and outdoor activities.",
+    "Scheduled maintenance of water supply in {place} on Sunday, routine inspection planned.",
+]
+PLACES = ["Chennai", "Adyar", "T Nagar", "Velachery", "Tambaram", "Guindy"]
+
+
+def make_reports(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(place=rng.choice(PLACES), n=rng.randint(2, 400))
+        for _ in range(count)
+    ]
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_mode(pipeline: CrisisPipeline, reports: list, mode: str) -> dict:
+    latencies, sizes = [], []
+    for text in reports:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = pipeline.analyze(text, source="benchmark", location="Chennai", mode=mode)
+        latencies.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(json.dumps(result, default=str).encode("utf-8")))
+    return {
+        "mode": mode,
+        "reports": len(reports),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "mean_payload_bytes": round(statistics.mean(sizes), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reports", type=int, default=200)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline = CrisisPipeline()
+    pipeline.result_cache = None
+    reports = make_reports(args.reports)
+
+    run_mode(pipeline, reports[:10], "full")  # warm up
+    full = run_mode(pipeline, reports, "full")
+    triage = run_mode(pipeline, reports, "triage")
+
+    for row in (full, triage):
+        print(json.dumps(row))
+    print(json.dumps({
+        "latency_reduction_pct": round(100 * (1 - triage["mean_ms"] / full["mean_ms"]), 1),
+        "payload_reduction_pct": round(100 * (1 - triage["mean_payload_bytes"] / full["mean_payload_bytes"]), 1)
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Export / quantize the crisis detection model and check backend parity
+
+    python export_model.py export [--quantize]
+        Writes <ONNX_MODEL_DIR>/<model name>/model.onnx (and model.int8.onnx
+        with --quantize, ONNX Runtime dynamic int8) plus the tokenizer files.
+
+    python export_model.py parity --backend onnx [--model-file model.int8.onnx]
+    python export_model.py parity --backend torch_int8
+        Runs the fp32 torch backend and the candidate over sample texts and
+        fails (exit 1) when a hybrid score moves by more than the tolerance.
+
+Select the backend for serving with config.CRISIS_DETECTION_BACKEND (and
+config.ONNX_MODEL_FILE for the quantized graph).
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from models.crisis_detector import CrisisDetector
+from models.inference_backend import BACKENDS, EXPORT_INFO_FILE, resolve_model_dir
+from utils.config import config
+from utils.model_registry import get_model_registry
+
+PARITY_TEXTS = [
+    "Flood in Chennai, 12 people dead and hundreds trapped, urgent rescue needed",
+    "Fire breaks out at T Nagar market complex, 5 shops affected, 3 injured",
+    "Beautiful weather in Chennai today, perfect for the beach",
+    "Residents gathered near the river this morning",
+    "Cyclone warning issued for the coast, fishermen advised not to venture into the sea",
+    "Dengue cases rising in the city, hospitals report shortage of beds",
+    "Scheduled maintenance of the metro line this weekend",
+    "Landslide blocks the highway after heavy rain, vehicles stranded",
+    "The city council discussed the new park budget at today's meeting",
+    "Water supply disrupted in several areas, people queue for tankers",
+]
+
+
+def export_onnx(output_dir: Optional[str] = None, quantize: bool = False, opset: int = 17,
+                model_name: Optional[str] = None) -> List[str]:
+    """Export the fp32 model (and optionally an int8 copy) to ONNX"""
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    model_name = model_name or config.CRISIS_DETECTION_MODEL
+    output_dir = resolve_model_dir(model_name, output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    path, local_files_only = get_model_registry().resolve(model_name)
+    tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=local_files_only)
+    model = AutoModelForSequenceClassification.from_pretrained(path, local_files_only=local_files_only)
+    model.eval()
+
+    sample = tokenizer([PARITY_TEXTS[0]], return_tensors="pt")
+    input_names = list(sample.keys())
+    model_path = os.path.join(output_dir, "model.onnx")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset
+        )
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, EXPORT_INFO_FILE), "w", encoding="utf-8") as f:
+        json.dump({"model_name": model_name, "opset": opset}, f, indent=2)
+    written = [model_path]
+    print(f"✅ Exported {model_name} to {model_path}")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = os.path.join(output_dir, "model.int8.onnx")
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        written.append(quantized_path)
+        print(f"✅ Quantized to {quantized_path}")
+
+    return written
+
+
+def compare_backends(reference: CrisisDetector, candidate: CrisisDetector,
+                     texts: Optional[List[str]] = None,
+                     tolerance: Optional[float] = None) -> Dict[str, Any]:
+    """Hybrid score differences between two detectors over the same texts"""
+    texts = texts or PARITY_TEXTS
+    tolerance = config.BACKEND_PARITY_TOLERANCE if tolerance is None else tolerance
+    threshold = config.CRISIS_DETECTION_THRESHOLD
+
+    reference_scores = reference.hybrid_scores(texts)
+    candidate_scores = candidate.hybrid_scores(texts)
+    diffs = [abs(a - b) for a, b in zip(reference_scores, candidate_scores)]
+    flips = sum(
+        (a >= threshold) != (b >= threshold)
+        for a, b in zip(reference_scores, candidate_scores)
+    )
+
+    return {
+        "reference": reference.backend_name,
+        "candidate": candidate.backend_name,
+        "texts": len(texts),
+        "max_abs_diff": max(diffs),
+        "mean_abs_diff": sum(diffs) / len(diffs),
+        "decision_flips": flips,
+        "tolerance": tolerance,
+        "passed": max(diffs) <= tolerance
+    }
+
+
+def _load_texts(path: Optional[str]) -> Optional[List[str]]:
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the crisis detection model and check backend parity")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Export the model to ONNX")
+    export_parser.add_argument("--output-dir", default=None,
+                               help="Export directory (default: <config.ONNX_MODEL_DIR>/<model name>)")
+    export_parser.add_argument("--model", default=None,
+                               help="Model to export (default: config.CRISIS_DETECTION_MODEL)")
+    export_parser.add_argument("--quantize", action="store_true",
+                               help="Also write an int8 dynamically quantized model.int8.onnx")
+    export_parser.add_argument("--opset", type=int, default=17)
+
+    parity_parser = commands.add_parser("parity", help="Compare a backend's hybrid scores against fp32 torch")
+    parity_parser.add_argument("--backend", choices=[b for b in BACKENDS if b != "torch"], required=True)
+    parity_parser.add_argument("--model-file", default=None,
+                               help="ONNX file inside the export directory (default: config.ONNX_MODEL_FILE)")
+    parity_parser.add_argument("--tolerance", type=float, default=None)
+    parity_parser.add_argument("--texts-file", default=None, help="One text per line (default: built-in samples)")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_onnx(args.output_dir, args.quantize, args.opset, args.model)
+        sys.exit(0)
+
+    if args.model_file:
+        config.ONNX_MODEL_FILE = args.model_file
+    report = compare_backends(
+        CrisisDetector(backend="torch"),
+        CrisisDetector(backend=args.backend),
+        _load_texts(args.texts_file),
+        args.tolerance
+    )
+    for key, value in report.items():
+        print(f"   {key}: {value}")
+    print("✅ Parity check passed" if report["passed"] else "❌ Parity check failed")
+    sys.exit(0 if report["passed"] else 1)
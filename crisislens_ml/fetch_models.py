@@ -0,0 +1,43 @@
+"""
+Download the HuggingFace models into the local model registry
+
+    python fetch_models.py            # fetch every model at its pinned commit
+    python fetch_models.py --verify   # rehash local copies against their manifests
+    python fetch_models.py --model org/name --revision main
+                                      # resolve a branch to a commit to pin
+
+Models land in config.MODEL_CACHE_DIR and are then loaded with
+local_files_only; set config.MODEL_OFFLINE to forbid any hub access.
+"""
+import argparse
+import sys
+
+from utils.config import config
+from utils.model_registry import ModelIntegrityError, get_model_registry
+
+MODELS = [config.CRISIS_DETECTION_MODEL, config.TYPE_CLASSIFICATION_MODEL]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch or verify the pinned HuggingFace models")
+    parser.add_argument("--verify", action="store_true", help="Only verify the local copies")
+    parser.add_argument("--model", action="append", default=None,
+                        help="Model name (repeatable, default: the configured models)")
+    parser.add_argument("--revision", default=None,
+                        help="Branch, tag or commit to fetch instead of the pinned commit")
+    args = parser.parse_args()
+
+    registry = get_model_registry()
+    failed = False
+    for model_name in args.model or MODELS:
+        try:
+            if args.verify:
+                manifest = registry.verify(model_name, use_stamp=False)
+                print(f"✅ {model_name}: {len(manifest['files'])} files match revision {manifest['revision']}")
+            else:
+                manifest = registry.fetch(model_name, args.revision)
+                print(f"✅ {model_name} @ {manifest['revision']} -> {registry.local_dir(model_name)}")
+        except (ModelIntegrityError, OSError, ValueError) as e:
+            print(f"❌ {model_name}: {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
@@ -1,6 +1,11 @@
-from fastapi import FastAPI
+import json
+from typing import List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from main_pipeline import analyze_crisis
+from main_pipeline import (analyze_crisis, analyze_crisis_async, analyze_crisis_batched,
+                           get_batch_scheduler, get_pipeline, config)
 
 app = FastAPI()
 
@@ -8,20 +13,126 @@ class InputData(BaseModel):
     text: str
     source: str
     location: str
+    # Return scores + rule-based explanation now, Gemini explanation via /explanations/{id}
+    defer_explanation: Optional[bool] = None
+    callback_url: Optional[str] = None
+    # "triage": compact payload with detection, type, severity, urgency and priority only
+    mode: Literal["full", "triage"] = "full"
 
-#Define check_health route
+#Define check_health route (async so it never waits behind busy worker threads)
 @app.get('/')
-def check_health():
+async def check_health():
     return {"success": "true",
             "status": "ok",
             "message": "ML service is running."}
 
+#Readiness (distinct from liveness): 503 until the crisis detection model is loaded
+@app.get('/ready')
+async def check_ready():
+    readiness = get_pipeline().get_readiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+#Start loading the model without holding up startup; requests get keyword-only
+#detection in the meantime
+def start_model_warmup():
+    get_pipeline().warm_up(background=config.BACKGROUND_MODEL_WARMUP)
+
+app.add_event_handler("startup", start_model_warmup)
+
 #Define FastAPI app
-@app.post('/analyze_crisis')
 def analyze_crisis_endpoint(input_data: InputData):
-    result = analyze_crisis(
-        text=input_data.text,
-        source=input_data.source,
-        location=input_data.location
-    )
-    return result
\ No newline at end of file
+    # Concurrent requests share one batched detection forward pass
+    analyze = analyze_crisis_batched if config.ENABLE_MICRO_BATCHING else analyze_crisis
+    try:
+        return analyze(
+            text=input_data.text,
+            source=input_data.source,
+            location=input_data.location,
+            defer_explanation=input_data.defer_explanation,
+            callback_url=input_data.callback_url,
+            mode=input_data.mode
+        )
+    except ValueError as e:
+        # Rejected callback_url (checked before any scoring work)
+        raise HTTPException(status_code=422, detail=str(e))
+
+#Async serving mode: CPU stages on a dedicated executor, Gemini awaited
+async def analyze_crisis_async_endpoint(input_data: InputData):
+    try:
+        return await analyze_crisis_async(
+            text=input_data.text,
+            source=input_data.source,
+            location=input_data.location,
+            defer_explanation=input_data.defer_explanation,
+            callback_url=input_data.callback_url,
+            mode=input_data.mode
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+if config.SERVING_MODE == "async":
+    app.post('/analyze_crisis')(analyze_crisis_async_endpoint)
+else:
+    app.post('/analyze_crisis')(analyze_crisis_endpoint)
+
+#Bulk analysis: one NDJSON line per item ({"index", "result"} or {"index", "error"}),
+#streamed as each item completes
+@app.post('/analyze_batch')
+def analyze_batch_endpoint(items: List[InputData]):
+    if len(items) > config.MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413,
+                            detail=f"At most {config.MAX_BATCH_ITEMS} items per batch")
+
+    def stream():
+        results = get_pipeline().iter_analyze_batch(
+            [item.text for item in items],
+            sources=[item.source for item in items],
+            locations=[item.location for item in items],
+            defer_explanations=[item.defer_explanation for item in items],
+            callback_urls=[item.callback_url for item in items],
+            modes=[item.mode for item in items],
+            chunk_size=config.STREAM_BATCH_CHUNK_SIZE
+        )
+        for index, result in results:
+            if "error" in result:
+                line = {"index": index, "error": result["error"]}
+            else:
+                line = {"index": index, "result": result}
+            yield json.dumps(line, default=str) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+#Status and result of a deferred explanation
+@app.get('/explanations/{job_id}')
+def explanation_status(job_id: str):
+    job = get_pipeline().get_explanation_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired explanation job")
+    return job
+
+#Per-stage latency histograms and counters in Prometheus text format (per worker)
+@app.get('/metrics')
+def prometheus_metrics():
+    return PlainTextResponse(get_pipeline().render_metrics(), media_type="text/plain; version=0.0.4")
+
+#Queue depth and batch size metrics of the micro-batching scheduler
+@app.get('/metrics/batching')
+def batching_metrics():
+    if not config.ENABLE_MICRO_BATCHING:
+        return {"enabled": False}
+    return {"enabled": True, **get_batch_scheduler().get_metrics()}
+
+#Predictions resolved by the keyword pre-filter vs the transformer
+@app.get('/metrics/cascade')
+def cascade_metrics():
+    return get_pipeline().crisis_detector.get_cascade_stats()
+
+#Resident memory of this worker and whether the model weights are memory-mapped
+@app.get('/metrics/memory')
+def memory_metrics():
+    return get_pipeline().get_memory_stats()
+
+#Hit/miss/eviction counters of the analysis result cache
+@app.get('/metrics/cache')
+def cache_metrics():
+    return get_pipeline().get_cache_stats()
@@ -1,10 +1,15 @@
 """
 MAIN PIPELINE - Connects all Person A's models
 """
+import asyncio
+import copy
 import string
 import sys
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, Optional, Tuple
 
 # ====== FIXED IMPORTS ======
 try:
@@ -19,6 +24,14 @@ try:
     from crisislens_ml.models.severity_estimator import SeverityEstimator
     from crisislens_ml.models.urgency_estimator import UrgencyDetector
     from utils.config import config
+    from utils.batch_scheduler import MicroBatchScheduler
+    from utils.text_features import TextFeatures
+    from utils.cache_manager import DiskCache, LRUCache, TieredCache, make_cache_key
+    from utils.explanation_jobs import ExplanationJobManager, check_callback_url
+    from utils.location_extractor import extract_location_simple, get_simple_location_extractor
+    from utils.logger import log_event, logger, trace_enabled
+    from utils.memory_stats import process_memory
+    from utils.metrics import StageTimer, get_metrics, render_counter
     
 except ImportError:
     # Fallback: Add parent directory
@@ -33,11 +46,24 @@ except ImportError:
         from crisislens_ml.models.urgency_estimator import UrgencyDetector
         from crisislens_ml.scoring.explanation_generator import ExplanationGenerator
         from crisislens_ml.utils.config import config
+        from crisislens_ml.utils.batch_scheduler import MicroBatchScheduler
+        from crisislens_ml.utils.text_features import TextFeatures
+        from crisislens_ml.utils.cache_manager import DiskCache, LRUCache, TieredCache, make_cache_key
+        from crisislens_ml.utils.explanation_jobs import ExplanationJobManager, check_callback_url
+        from crisislens_ml.utils.location_extractor import extract_location_simple, get_simple_location_extractor
+        from crisislens_ml.utils.logger import log_event, logger, trace_enabled
+        from crisislens_ml.utils.memory_stats import process_memory
+        from crisislens_ml.utils.metrics import StageTimer, get_metrics, render_counter
     except ImportError as e:
         print(f"❌ CRITICAL: Cannot import modules: {e}")
         print("Please ensure all model files exist in the correct locations.")
         raise
 
+PIPELINE_VERSION = "1.1"
+
+# "full": complete analysis; "triage": detection, type, severity, urgency and priority only
+ANALYSIS_MODES = ("full", "triage")
+
 class CrisisPipeline:
     """
     Main orchestrator - Chains all Person A's models
@@ -59,30 +85,128 @@ class CrisisPipeline:
         
         # Explanation generator (with optional Gemini)
         self.explanation_generator = ExplanationGenerator()
+        
+        # Background workers for deferred (Gemini) explanations
+        self.explanation_jobs = ExplanationJobManager(
+            generate_fn=self._generate_deferred_explanation,
+            max_workers=config.EXPLANATION_WORKERS,
+            result_ttl_seconds=config.EXPLANATION_JOB_TTL_SECONDS,
+            max_jobs=config.EXPLANATION_JOB_MAX,
+            callback_timeout_seconds=config.EXPLANATION_CALLBACK_TIMEOUT_SECONDS,
+            callback_allowed_hosts=config.EXPLANATION_CALLBACK_ALLOWED_HOSTS
+        )
 
-        # Initialize location info storage
-        self._extracted_location_info = {
-            "name": "Chennai",
-            "extracted_from_text": False,
-            "coordinates": config.CITY_COORDINATES["Chennai"],
-            "confidence": "default",
-            "all_locations": []
-        }
+        # Cache of complete results keyed on normalized text + request + config
+        self.result_cache = None
+        if config.ENABLE_RESULT_CACHE:
+            self.result_cache = LRUCache(
+                max_entries=config.RESULT_CACHE_MAX_ENTRIES,
+                ttl_seconds=config.RESULT_CACHE_TTL_SECONDS
+            )
+            # Persistent store so warm results survive restarts
+            if config.RESULT_CACHE_DB_PATH:
+                try:
+                    disk_cache = DiskCache(
+                        config.RESULT_CACHE_DB_PATH,
+                        pipeline_version=PIPELINE_VERSION,
+                        max_entries=config.RESULT_CACHE_DB_MAX_ENTRIES,
+                        ttl_seconds=config.RESULT_CACHE_DB_TTL_SECONDS
+                    )
+                    self.result_cache = TieredCache(self.result_cache, disk_cache)
+                    print(f"💾 Persistent result cache: {config.RESULT_CACHE_DB_PATH} ({len(disk_cache)} entries)")
+                except Exception as e:
+                    print(f"⚠️ Warning: Persistent cache unavailable, using memory only: {e}")
+
+        # Deferred results waiting for their explanation job: job_id -> (cache_key, result).
+        # They are only cached once the Gemini explanation is in.
+        self._deferred_results: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._deferred_results_lock = threading.Lock()
+
+        # Crisis-detection-only batcher used by analyze_async (created on first use)
+        self._detection_scheduler = None
+        self._detection_scheduler_lock = threading.Lock()
+
+        # Model weights are loaded by warm_up() (or lazily on the first request)
+        self._warmup_thread = None
+        self._warmup_lock = threading.Lock()
         
         print(f"✅ All models initialized!")
+        print(f"📍 Focus City: Chennai ({config.CITY_COORDINATES['Chennai']})")
+        print(f"📊 Using weights: {config.WEIGHTS}")
+        print("=" * 60)
+
+    def warm_up(self, background: bool = False):
+        """
+        Load the crisis detection model and run a dummy prediction
         
-        # PRELOAD MODELS to avoid lag on first request
+        With background=True this returns immediately; until the model is
+        ready, requests get keyword-only crisis detection.
+        """
+        if not background:
+            self._warm_up_models()
+            return
+        with self._warmup_lock:
+            if self._warmup_thread is not None:
+                return
+            self.crisis_detector.mark_loading()
+            self._warmup_thread = threading.Thread(
+                target=self._warm_up_models, name="model-warmup", daemon=True
+            )
+            self._warmup_thread.start()
+
+    def _warm_up_models(self):
         print("⏳ Pre-loading ML models (downloading if needed)...")
         try:
-            # Trigger lazy loading by running a dummy prediction
-            self.crisis_detector.predict("warmup text")
-            print("✅ Crisis Detector model fully loaded.")
+            if self.crisis_detector.warm_up():
+                print(f"✅ Crisis Detector model fully loaded in {self.crisis_detector.load_seconds}s.")
+                memory = self.get_memory_stats()
+                model = memory["crisis_detection_model"]
+                print(f"🧠 Model weights: {model['weights_mb']} MB "
+                      f"({'memory-mapped, shared' if model['weights_mmapped'] else 'private heap'}), "
+                      f"process RSS: {memory['process'].get('rss_mb', 'n/a')} MB")
+            else:
+                print("⚠️ Warning: Model preload failed, using keyword detection (will retry on request)")
         except Exception as e:
             print(f"⚠️ Warning: Model preload failed (will retry on request): {e}")
 
-        print(f"📍 Focus City: Chennai ({config.CITY_COORDINATES['Chennai']})")
-        print(f"📊 Using weights: {config.WEIGHTS}")
-        print("=" * 60)
+    def render_metrics(self) -> str:
+        """Stage latency histograms plus detection and cache counters, Prometheus text format"""
+        text = get_metrics().render()
+        cascade = self.crisis_detector.get_cascade_stats()
+        text += render_counter(
+            "crisislens_detection_tier_total", "Crisis detections resolved per cascade tier", "tier",
+            {tier: cascade[tier] for tier in self.crisis_detector.cascade_counts}
+        )
+        if self.result_cache is not None:
+            cache = self.result_cache.get_stats()
+            text += render_counter(
+                "crisislens_result_cache_lookups_total", "Result cache lookups", "outcome",
+                {"hit": cache["hits"], "miss": cache["misses"]}
+            )
+        return text
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Resident memory of this process and the crisis detection weights"""
+        return {
+            "process": process_memory(),
+            "crisis_detection_model": self.crisis_detector.memory_stats()
+        }
+
+    def get_readiness(self) -> Dict[str, Any]:
+        """
+        Readiness of the crisis detection model
+        
+        "failed" counts as ready: the service answers from keywords (degraded)
+        rather than waiting for a model that is not coming.
+        """
+        state = self.crisis_detector.load_state
+        return {
+            "ready": state in ("ready", "failed"),
+            "model_state": state,
+            "degraded": state == "failed",
+            "load_seconds": self.crisis_detector.load_seconds,
+            "load_error": self.crisis_detector.load_error
+        }
 
     @staticmethod
     def remove_punctuation(text: str) -> str:
@@ -97,21 +221,382 @@ class CrisisPipeline:
         return text.strip()
     
     def analyze(self, text: str, source: str = "unknown", 
-                location: str = "Chennai") -> Dict[str, Any]:
+                location: str = "Chennai",
+                crisis_result: Optional[Dict[str, Any]] = None,
+                defer_explanation: Optional[bool] = None,
+                callback_url: Optional[str] = None,
+                mode: str = "full") -> Dict[str, Any]:
         """
         Main analysis function - processes text through entire pipeline
         
+        Identical requests (same normalized text, source, location and
+        config) are served from the result cache.
+        
         Args:
             text: Crisis report text
             source: Source of report (IMD, SACHET, etc.)
             location: Location mentioned
+            crisis_result: Precomputed detection result (used by analyze_batch)
+            defer_explanation: Return the rule-based explanation now and compute
+                the Gemini one in the background (None = config.DEFER_EXPLANATIONS)
+            callback_url: URL the finished deferred explanation is POSTed to
+            mode: "full" or "triage" (compact scores only, no explanation)
             
         Returns:
             Complete analysis with all scores
+            
+        Raises:
+            ValueError: Unknown mode, or a callback_url that is unsafe or
+                cannot be honoured (explanation not deferred)
+        """
+        self._check_mode(mode)
+        deferred = self._should_defer(defer_explanation, mode)
+        self._check_callback(callback_url, deferred)
+        cache_key = self._cache_key(text, source, location, deferred, mode, callback_url)
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            return cached
+        return self._analyze_and_cache(cache_key, text, source, location, crisis_result,
+                                       deferred, callback_url, mode)
+
+    def analyze_batched(self, text: str, source: str = "unknown",
+                        location: str = "Chennai",
+                        defer_explanation: Optional[bool] = None,
+                        callback_url: Optional[str] = None,
+                        mode: str = "full") -> Dict[str, Any]:
+        """
+        Same as analyze(), but the crisis detection forward pass is grouped
+        with concurrent callers into one batch
+        
+        Only predict_batch runs on the scheduler thread; every other stage
+        (including the Gemini call) stays on the caller's thread, so one slow
+        request does not hold up the rest of its batch.
+        """
+        self._check_mode(mode)
+        deferred = self._should_defer(defer_explanation, mode)
+        self._check_callback(callback_url, deferred)
+        cache_key = self._cache_key(text, source, location, deferred, mode, callback_url)
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            return cached
+        
+        timer = StageTimer()
+        detection_input = self._detection_input(text)
+        timer.lap("preprocessing")
+        crisis_result = self._get_detection_scheduler().process(detection_input)
+        timer.lap("detection")
+        return self._analyze_and_cache(cache_key, text, source, location, crisis_result,
+                                       deferred, callback_url, mode, timer)
+
+    @staticmethod
+    def _check_mode(mode: str):
+        if mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode '{mode}', expected one of {ANALYSIS_MODES}")
+
+    def _should_defer(self, defer_explanation: Optional[bool], mode: str = "full") -> bool:
+        """Deferring only pays off when the slow Gemini path is in use"""
+        if mode == "triage":
+            return False
+        if defer_explanation is None:
+            defer_explanation = config.DEFER_EXPLANATIONS
+        return bool(defer_explanation) and self.explanation_generator.use_gemini
+
+    def _check_callback(self, callback_url: Optional[str], deferred: bool):
+        """Reject a callback_url before any work is done (it may resolve DNS)"""
+        if not callback_url:
+            return
+        if not deferred:
+            raise ValueError(
+                "callback_url needs a deferred explanation "
+                "(defer_explanation with the Gemini explanations enabled, full mode)"
+            )
+        check_callback_url(callback_url, self.explanation_jobs.callback_allowed_hosts)
+
+    def _cache_key(self, text: str, source: str, location: Optional[str],
+                   deferred: bool = False, mode: str = "full",
+                   callback_url: Optional[str] = None) -> Optional[str]:
+        # A caller waiting for its own callback always gets a fresh job
+        if self.result_cache is None or callback_url:
+            return None
+        config_version = f"{PIPELINE_VERSION}:{config.fingerprint()}"
+        if deferred:
+            config_version += ":deferred"
+        if mode != "full":
+            config_version += f":{mode}"
+        # Keyword-only answers given while the model is loading (or after it
+        # failed to load) must never be served once the model is ready
+        load_state = self.crisis_detector.load_state
+        if load_state != "ready":
+            config_version += f":{load_state}"
+        return make_cache_key(text, source, location, config_version)
+
+    def _cache_lookup(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return a private copy of a cached result, or None"""
+        if cache_key is None:
+            return None
+        cached = self.result_cache.get(cache_key)
+        if cached is None:
+            return None
+        logger.debug("Returning cached analysis")
+        result = copy.deepcopy(cached)
+        if "metadata" in result:
+            result["metadata"]["cache_hit"] = True
+        return result
+
+    def _analyze_and_cache(self, cache_key: Optional[str], text: str, source: str,
+                           location: Optional[str],
+                           crisis_result: Optional[Dict[str, Any]],
+                           deferred: bool = False,
+                           callback_url: Optional[str] = None,
+                           mode: str = "full",
+                           timer: Optional[StageTimer] = None) -> Dict[str, Any]:
+        if mode == "triage":
+            result = self._run_triage(text, source, location, crisis_result, timer)
+        else:
+            result = self._run_analysis(text, source, location, crisis_result,
+                                        deferred, callback_url, timer)
+        self._store_result(cache_key, result)
+        return result
+
+    def _store_result(self, cache_key: Optional[str], result: Dict[str, Any]):
+        if cache_key is None:
+            return
+        job_id = result.get("explanation_job_id")
+        if job_id is None:
+            self.result_cache.set(cache_key, copy.deepcopy(result))
+            return
+        
+        # A pending result is held back until its job finishes; the job may
+        # already have finished before the result got here
+        with self._deferred_results_lock:
+            self._deferred_results[job_id] = (cache_key, copy.deepcopy(result))
+        job = self.explanation_jobs.get(job_id)
+        if job is None:
+            with self._deferred_results_lock:
+                self._deferred_results.pop(job_id, None)
+        elif job["status"] in (ExplanationJobManager.COMPLETED, ExplanationJobManager.FAILED):
+            self._finish_deferred_result(job)
+
+    async def analyze_async(self, text: str, source: str = "unknown",
+                            location: str = "Chennai",
+                            defer_explanation: Optional[bool] = None,
+                            callback_url: Optional[str] = None,
+                            mode: str = "full") -> Dict[str, Any]:
+        """
+        Non-blocking analyze() for async servers
+        
+        CPU-bound stages run on the dedicated CPU executor (crisis detection
+        is micro-batched when enabled) and the Gemini call is awaited, so the
+        event loop stays free for other requests.
+        """
+        self._check_mode(mode)
+        deferred = self._should_defer(defer_explanation, mode)
+        loop = asyncio.get_running_loop()
+        executor = get_cpu_executor()
+        if callback_url:
+            await loop.run_in_executor(executor, self._check_callback, callback_url, deferred)
+        cache_key = self._cache_key(text, source, location, deferred, mode, callback_url)
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            return cached
+        
+        timer = StageTimer()
+        crisis_result = None
+        if config.ENABLE_MICRO_BATCHING:
+            detection_input = await loop.run_in_executor(executor, self._detection_input, text)
+            timer.lap("preprocessing")
+            crisis_result = await asyncio.wrap_future(
+                self._get_detection_scheduler().submit(detection_input)
+            )
+            timer.lap("detection")
+        
+        if mode == "triage":
+            result = await loop.run_in_executor(
+                executor, self._run_triage, text, source, location, crisis_result, timer
+            )
+            self._store_result(cache_key, result)
+            return result
+        
+        stages = await loop.run_in_executor(
+            executor, self._run_scoring_stages, text, source, location, crisis_result, timer
+        )
+        if "result" in stages:
+            result = stages["result"]
+        elif deferred:
+            # Rule-based text and the job submission (callback DNS check) are blocking
+            explanation = await loop.run_in_executor(
+                executor, self._explain, stages, True, callback_url
+            )
+            result = self._compile_result(stages, *explanation)
+        else:
+            timer.mark()
+            explanation_result = await self.explanation_generator.agenerate(
+                **stages["explanation_kwargs"]
+            )
+            timer.lap("explanation")
+            result = self._compile_result(stages, explanation_result)
+        
+        self._store_result(cache_key, result)
+        return result
+
+    @staticmethod
+    def _detection_input(text: str) -> TextFeatures:
+        """Cleaned text features fed to the crisis detector"""
+        return TextFeatures(CrisisPipeline.remove_punctuation(text))
+
+    def _get_detection_scheduler(self) -> MicroBatchScheduler:
+        with self._detection_scheduler_lock:
+            if self._detection_scheduler is None:
+                self._detection_scheduler = MicroBatchScheduler(
+                    process_batch=self.crisis_detector.predict_batch,
+                    length_fn=self.crisis_detector.estimate_token_length,
+                    max_batch_size=config.MICRO_BATCH_MAX_SIZE,
+                    max_wait_ms=config.MICRO_BATCH_WINDOW_MS,
+                    bucket_boundaries=config.MICRO_BATCH_LENGTH_BUCKETS
+                ).start()
+        return self._detection_scheduler
+
+    def _generate_deferred_explanation(self, **kwargs) -> Dict[str, Any]:
+        """Worker-side explanation: the Gemini path, formatted like result["explanation"]"""
+        return self._format_explanation(self.explanation_generator.generate(**kwargs))
+
+    @staticmethod
+    def _format_explanation(explanation_result: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "content": explanation_result["explanation"],
+            "method": explanation_result.get("method", "unknown"),
+            "model": explanation_result.get("model", "rule_based"),
+            "success": explanation_result.get("success", True)
+        }
+
+    def _finish_deferred_result(self, job: Dict[str, Any]):
+        """
+        Cache a held-back deferred result with its finished Gemini explanation
+        
+        A failed job caches nothing, so the next identical request tries again.
+        """
+        with self._deferred_results_lock:
+            pending = self._deferred_results.pop(job["job_id"], None)
+        if pending is None or job["status"] != ExplanationJobManager.COMPLETED:
+            return
+        cache_key, result = pending
+        result["explanation"] = {**job["explanation"], "deferred": True, "job_id": job["job_id"],
+                                 "status": ExplanationJobManager.COMPLETED}
+        self.result_cache.set(cache_key, result)
+
+    def get_explanation_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status and (when finished) explanation of a deferred explanation job"""
+        return self.explanation_jobs.get(job_id)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the result and explanation caches"""
+        if self.result_cache is None:
+            result_stats = {"enabled": False}
+        else:
+            result_stats = {"enabled": True, **self.result_cache.get_stats()}
+        return {
+            "result_cache": result_stats,
+            "explanation_cache": self.explanation_generator.get_cache_stats()
+        }
+
+    def _run_analysis(self, text: str, source: str, location: Optional[str],
+                      crisis_result: Optional[Dict[str, Any]],
+                      deferred: bool = False, callback_url: Optional[str] = None,
+                      timer: Optional[StageTimer] = None) -> Dict[str, Any]:
+        """Run every pipeline step for one report (uncached)"""
+        stages = self._run_scoring_stages(text, source, location, crisis_result, timer)
+        if "result" in stages:
+            return stages["result"]
+        
+        explanation_result, explanation_job_id = self._explain(stages, deferred, callback_url)
+        return self._compile_result(stages, explanation_result, explanation_job_id)
+
+    def _run_triage(self, text: str, source: str, location: Optional[str],
+                    crisis_result: Optional[Dict[str, Any]],
+                    timer: Optional[StageTimer] = None) -> Dict[str, Any]:
+        """
+        Compact triage result: detection, type, overall severity, urgency, priority
+        
+        Skips location resolution, the explanation and the descriptive blocks
+        (predictions, breakdowns, thresholds, text analysis, metadata) of the
+        full result. Scores are identical to mode="full".
+        """
+        start_time = time.time()
+        timer = timer or StageTimer()
+        timer.mark()
+        
+        if crisis_result is None:
+            detection_input = self._detection_input(text)
+            timer.lap("preprocessing")
+            crisis_result = self.crisis_detector.predict(detection_input)
+            timer.lap("detection")
+        if not crisis_result["is_crisis"]:
+            self._finish_request(timer, "non_crisis", source=source,
+                                 crisis_confidence=round(crisis_result["confidence"], 3))
+            return {
+                "mode": "triage",
+                "is_crisis": False,
+                "crisis_confidence": round(crisis_result["confidence"], 3),
+                "source": source,
+                "location": location
+            }
+        
+        timer.mark()
+        features = TextFeatures(text)
+        timer.lap("preprocessing")
+        type_result = self.type_classifier.predict(features)
+        timer.lap("type")
+        severity_result = self.severity_estimator.estimate(features)
+        timer.lap("severity")
+        urgency_result = self.urgency_detector.detect(features)
+        timer.lap("urgency")
+        priority_score = self._calculate_priority(
+            crisis_confidence=crisis_result["confidence"],
+            type_confidence=type_result["confidence"],
+            severity=severity_result["overall"],
+            urgency=urgency_result["urgency_score"],
+            crisis_type=type_result["type"]
+        )
+        timer.lap("priority")
+        self._finish_request(timer, "triage", source=source, location=location,
+                             crisis_type=type_result["type"],
+                             priority_level=self._get_priority_level(priority_score))
+        
+        return {
+            "mode": "triage",
+            "is_crisis": True,
+            "source": source,
+            "location": location,
+            "crisis_confidence": round(crisis_result["confidence"], 3),
+            "type": type_result["type"],
+            "type_confidence": round(type_result["confidence"], 3),
+            "severity": round(severity_result["overall"], 3),
+            "urgency": {
+                "level": urgency_result["urgency_level"],
+                "score": round(urgency_result["urgency_score"], 3)
+            },
+            "priority": {
+                "score": round(priority_score, 3),
+                "level": self._get_priority_level(priority_score)
+            },
+            "processing_time_ms": int((time.time() - start_time) * 1000)
+        }
+
+    def _run_scoring_stages(self, text: str, source: str, location: Optional[str],
+                            crisis_result: Optional[Dict[str, Any]],
+                            timer: Optional[StageTimer] = None) -> Dict[str, Any]:
+        """
+        Steps 0-5 (location, detection, type, severity, urgency, priority)
+        
+        CPU-bound; returns the per-stage results for _explain/_compile_result,
+        or {"result": ...} when the report is not a crisis.
         """
         import re
-        import time
         start_time = time.time()
+        timer = timer or StageTimer()
+        timer.mark()
+        # The step trace is only formatted when DEBUG logging is on
+        trace = trace_enabled()
 
             # Initialize with default values
         extracted_from_text = False
@@ -119,22 +604,15 @@ class CrisisPipeline:
         location_confidence = "medium"
         all_locations_found = []
         primary_location_name = None
-
-        self._extracted_location_info = {
-            "name": "Chennai",
-            "extracted_from_text": False,
-            "coordinates": config.CITY_COORDINATES["Chennai"],
-            "confidence": "default",
-            "all_locations": []
-        }
+        # Per-request location details; nothing request-specific is stored on
+        # self, so concurrent analyze() calls cannot see each other's location
+        location_info = self._default_location_info()
         
         # ===== STEP 0: EXTRACT LOCATION FROM TEXT =====
-        print("0️⃣  Extracting location from text...")
         
         if location is None:
             try:
                 # Use SIMPLE location extractor
-                from ..utils.simple_location import extract_location_simple
                 location_result = extract_location_simple(text)
                 
                 if location_result and location_result.get("primary_location"):
@@ -143,23 +621,20 @@ class CrisisPipeline:
                     coords = primary.get("coordinates")
                     
                     if primary_location_name:
-                        print(f"   📍 Extracted location: {primary_location_name}")
-                        print(f"      Type: {primary.get('type', 'unknown')}")
-                        print(f"      Confidence: {primary.get('confidence', 0):.1%}")
-                        
-                        if coords:
-                            print(f"      Coordinates: {coords.get('lat', 'N/A')}, {coords.get('lon', 'N/A')}")
-                            if coords.get("state"):
-                                print(f"      State: {coords['state']}")
-                            print(f"      Source: {coords.get('source', 'database')}")
+                        if trace:
+                            logger.debug(
+                                f"Extracted location: {primary_location_name} "
+                                f"(type={primary.get('type', 'unknown')}, "
+                                f"confidence={primary.get('confidence', 0):.1%}, "
+                                f"coordinates={coords})"
+                            )
                         
                         location = primary_location_name
                         extracted_coordinates = coords
                         extracted_from_text = True
                         location_confidence = "high" if primary.get("confidence", 0) > 0.8 else "medium"
                         
-                        # Store in instance variable
-                        self._extracted_location_info = {
+                        location_info = {
                             "name": primary_location_name,
                             "extracted_from_text": True,
                             "coordinates": coords,
@@ -167,74 +642,78 @@ class CrisisPipeline:
                             "all_locations": [entity.get("name", "") for entity in location_result.get("entities", [])[:5]]
                         }
                     else:
-                        print("   ⚠️  Could not extract location name")
-                        self._handle_location_failure()
+                        logger.debug("Could not extract location name, using default: Chennai")
                         
                 else:
-                    print("   ⚠️  Could not extract location, using default: Chennai")
-                    self._handle_location_failure()
+                    logger.debug("Could not extract location, using default: Chennai")
                     
             except Exception as e:
-                print(f"   ⚠️  Location extraction failed: {e}")
-                print("   Using default: Chennai")
-                self._handle_location_failure()
+                logger.warning(f"Location extraction failed, using default: Chennai: {e}")
+                location_info = self._default_location_info()
         else:
-            print(f"   📍 Using provided location: {location}")
             # Handle provided location
-            self._handle_provided_location(location)
+            location_info = self._provided_location_info(location)
+        timer.lap("location")
         # ===== STEP 0: TEXT PREPROCESSING =====
-        print("0️⃣  Preprocessing text (removing punctuation)...")
         cleaned_text = CrisisPipeline.remove_punctuation(text)  # Option 1: Call directly on class
-
-        print(f"\n📥 ANALYZING REPORT: '{cleaned_text[:60]}...'")
-
-        print("-" * 60)
+        if trace:
+            logger.debug(f"Analyzing report: '{cleaned_text[:60]}...' (location: {location})")
+        timer.lap("preprocessing")
         
         # ===== STEP 1: CRISIS DETECTION =====
-        print("1️⃣  Detecting if this is a crisis...")
-        crisis_result = self.crisis_detector.predict(cleaned_text)
+        if crisis_result is None:
+            crisis_result = self.crisis_detector.predict(TextFeatures(cleaned_text))
+            timer.lap("detection")
         
         if not crisis_result["is_crisis"]:
-            return {
+            self._finish_request(timer, "non_crisis", source=source, location=location,
+                                 crisis_confidence=round(crisis_result["confidence"], 3))
+            return {"result": {
                 "is_crisis": False,
                 "crisis_confidence": crisis_result["confidence"],
                 "message": "Not identified as a crisis situation",
                 "source": source,
                 "location": location,
                 "text_preview": text[:100] + "..." if len(text) > 100 else text
-            }
+            }}
         
-        print(f"   ✅ CRISIS DETECTED")
-        print(f"      Confidence: {crisis_result['confidence']:.2%}")
-        print(f"      Method: {crisis_result.get('method', 'unknown')}")
+        if trace:
+            logger.debug(f"1. Crisis detected: confidence={crisis_result['confidence']:.2%}, "
+                         f"method={crisis_result.get('method', 'unknown')}")
+        timer.mark()
         
-        # ===== STEP 2: TYPE CLASSIFICATION =====
-        print("2️⃣  Classifying crisis type...")
-        type_result = self.type_classifier.predict(text)  # Uses keywords from config
+        # Lowercasing, tokens, numbers and keyword hits computed once for all stages below
+        features = TextFeatures(text)
+        hits = features.keyword_hits
+        timer.lap("preprocessing")
         
-        print(f"   ✅ Type: {type_result['type']}")
-        print(f"      Confidence: {type_result['confidence']:.2%}")
-        print(f"      Method: {type_result.get('method', 'unknown')}")
+        # ===== STEP 2: TYPE CLASSIFICATION =====
+        type_result = self.type_classifier.predict(features)  # Uses keywords from config
+        timer.lap("type")
+        if trace:
+            logger.debug(f"2. Type: {type_result['type']} (confidence={type_result['confidence']:.2%}, "
+                         f"method={type_result.get('method', 'unknown')})")
+            timer.mark()
         
         # ===== STEP 3: SEVERITY ESTIMATION =====
-        print("3️⃣  Estimating severity (4 dimensions)...")
-        severity_result = self.severity_estimator.estimate(text)
-        
-        print(f"   ✅ Overall Severity: {severity_result['overall']:.2%}")
-        print(f"      Breakdown: Human={severity_result['human_impact']:.2%}, "
-              f"Infra={severity_result['infrastructure_damage']:.2%}")
+        severity_result = self.severity_estimator.estimate(features)
+        timer.lap("severity")
+        if trace:
+            logger.debug(f"3. Severity: {severity_result['overall']:.2%} "
+                         f"(human={severity_result['human_impact']:.2%}, "
+                         f"infra={severity_result['infrastructure_damage']:.2%})")
+            timer.mark()
         
         # ===== STEP 4: URGENCY DETECTION =====
-        print("4️⃣  Detecting urgency level...")
-        urgency_result = self.urgency_detector.detect(text)
-        
-        print(f"   ✅ Urgency: {urgency_result['urgency_level'].upper()}")
-        print(f"      Score: {urgency_result['urgency_score']:.2%}")
-        if urgency_result['found_keywords']:
-            print(f"      Keywords: {', '.join(urgency_result['found_keywords'][:3])}")
+        urgency_result = self.urgency_detector.detect(features)
+        timer.lap("urgency")
+        if trace:
+            logger.debug(f"4. Urgency: {urgency_result['urgency_level'].upper()} "
+                         f"(score={urgency_result['urgency_score']:.2%}, "
+                         f"keywords={urgency_result['found_keywords'][:3]})")
+            timer.mark()
         
         # ===== STEP 5: CALCULATE PRIORITY SCORE =====
-        print("5️⃣  Calculating priority score...")
         priority_score = self._calculate_priority(
             crisis_confidence=crisis_result["confidence"],
             type_confidence=type_result["confidence"],
@@ -245,25 +724,81 @@ class CrisisPipeline:
         
         # Get priority level
         priority_level = self._get_priority_level(priority_score)
-        print(f"   ✅ Priority: {priority_level} ({priority_score:.2%})")
+        timer.lap("priority")
+        if trace:
+            logger.debug(f"5. Priority: {priority_level} ({priority_score:.2%})")
+            timer.mark()
         
+        return {
+            "text": text,
+            "source": source,
+            "location": location,
+            "location_info": location_info,
+            "extracted_from_text": extracted_from_text,
+            "start_time": start_time,
+            "timer": timer,
+            "features": features,
+            "crisis_result": crisis_result,
+            "type_result": type_result,
+            "severity_result": severity_result,
+            "urgency_result": urgency_result,
+            "priority_score": priority_score,
+            "priority_level": priority_level,
+            "explanation_kwargs": {
+                "crisis_type": type_result["type"],
+                "severity": severity_result,
+                "urgency": urgency_result,
+                "info_gaps": {"completeness_score": 0.7, "information_gaps": []},  # Mock since we skipped InfoGap
+                "priority_score": priority_score,
+                "text_snippet": text[:200],
+                "location": location
+            }
+        }
+
+    def _explain(self, stages: Dict[str, Any], deferred: bool,
+                 callback_url: Optional[str]):
+        """Step 6 - returns (explanation_result, explanation_job_id)"""
         # ===== STEP 6: GENERATE EXPLANATION =====
-        print("6️⃣  Generating explanation...")
-        explanation_result = self.explanation_generator.generate(
-            crisis_type=type_result["type"],
-            severity=severity_result,
-            urgency=urgency_result,
-            info_gaps={"completeness_score": 0.7, "information_gaps": []},  # Mock since we skipped InfoGap
-            priority_score=priority_score,
-            text_snippet=text[:200],
-            location=location
-        )
+        stages["timer"].mark()
+        explanation_kwargs = stages["explanation_kwargs"]
+        explanation_job_id = None
+        if deferred:
+            # Rule-based now, Gemini in the background
+            explanation_result = self.explanation_generator.generate(
+                **explanation_kwargs, use_gemini=False
+            )
+            explanation_job_id = self.explanation_jobs.submit(
+                explanation_kwargs,
+                callback_url=callback_url,
+                on_finish=self._finish_deferred_result
+            )
+            logger.debug("Gemini explanation deferred (job %s)", explanation_job_id)
+        else:
+            explanation_result = self.explanation_generator.generate(**explanation_kwargs)
         
-        print(f"   ✅ Explanation generated")
-        print(f"      Method: {explanation_result.get('method', 'unknown')}")
+        stages["timer"].lap("explanation")
+        logger.debug("6. Explanation generated (method=%s)", explanation_result.get("method", "unknown"))
+        return explanation_result, explanation_job_id
+
+    def _compile_result(self, stages: Dict[str, Any], explanation_result: Dict[str, Any],
+                        explanation_job_id: Optional[str] = None) -> Dict[str, Any]:
+        """Step 7 - assemble the response from the stage results"""
+        timer = stages["timer"]
+        timer.mark()
+        text = stages["text"]
+        source = stages["source"]
+        location = stages["location"]
+        location_info = stages["location_info"]
+        features = stages["features"]
+        hits = features.keyword_hits
+        crisis_result = stages["crisis_result"]
+        type_result = stages["type_result"]
+        severity_result = stages["severity_result"]
+        urgency_result = stages["urgency_result"]
+        priority_score = stages["priority_score"]
+        priority_level = stages["priority_level"]
         
         # ===== STEP 7: COMPILE FINAL RESULTS =====
-        print("7️⃣  Compiling final results...")
         
         result = {
             # Basic Info
@@ -274,11 +809,11 @@ class CrisisPipeline:
             
             # Location Information (FIXED with safe access)
             "location": {
-                "name": self._extracted_location_info.get("name", location) if hasattr(self, '_extracted_location_info') else location,
-                "extracted_from_text": self._extracted_location_info.get("extracted_from_text", False) if hasattr(self, '_extracted_location_info') else False,
-                "coordinates": self._extracted_location_info.get("coordinates", config.CITY_COORDINATES.get(location, config.CITY_COORDINATES["Chennai"])) if hasattr(self, '_extracted_location_info') else config.CITY_COORDINATES.get(location, config.CITY_COORDINATES["Chennai"]),
-                "confidence": self._extracted_location_info.get("confidence", "medium") if hasattr(self, '_extracted_location_info') else "medium",
-                "all_possible_locations": self._extracted_location_info.get("all_locations", []) if hasattr(self, '_extracted_location_info') else [],
+                "name": location_info.get("name", location),
+                "extracted_from_text": location_info.get("extracted_from_text", False),
+                "coordinates": location_info.get("coordinates", config.CITY_COORDINATES.get(location, config.CITY_COORDINATES["Chennai"])),
+                "confidence": location_info.get("confidence", "medium"),
+                "all_possible_locations": location_info.get("all_locations", []),
                 "extraction_method": "simple_database"
             },
             
@@ -338,26 +873,22 @@ class CrisisPipeline:
             },
             
             # Explanation
-            "explanation": {
-                "content": explanation_result["explanation"],
-                "method": explanation_result.get("method", "unknown"),
-                "model": explanation_result.get("model", "rule_based"),
-                "success": explanation_result.get("success", True)
-            },
+            "explanation": self._format_explanation(explanation_result),
             
             # Text Analysis
             "text_analysis": {
-                "word_count": len(text.split()),
+                "word_count": features.word_count,
                 "has_numbers": any(char.isdigit() for char in text),
-                "casualty_keywords_found": any(word in text.lower() for word in ["dead", "killed", "injured", "missing", "casualty"]),
-                "time_keywords_found": any(word in text.lower() for word in ["now", "immediate", "urgent", "emergency"]),
-                "has_casualties": "dead" in text.lower() or "killed" in text.lower() or "casualty" in text.lower(),
-                "has_injuries": "injured" in text.lower() or "wounded" in text.lower() or "hurt" in text.lower()
+                "casualty_keywords_found": any(hits.contains(word) for word in ["dead", "killed", "injured", "missing", "casualty"]),
+                "time_keywords_found": any(hits.contains(word) for word in ["now", "immediate", "urgent", "emergency"]),
+                "has_casualties": hits.contains("dead") or hits.contains("killed") or hits.contains("casualty"),
+                "has_injuries": hits.contains("injured") or hits.contains("wounded") or hits.contains("hurt")
             },
             
             # Metadata
             "metadata": {
-                "pipeline_version": "1.0",
+                "pipeline_version": PIPELINE_VERSION,
+                "cache_hit": False,
                 "models_used": [
                     f"CrisisDetector ({crisis_result.get('method', 'unknown')})",
                     f"TypeClassifier ({type_result.get('method', 'unknown')})",
@@ -365,23 +896,41 @@ class CrisisPipeline:
                     f"UrgencyDetector (keyword-based)",
                     f"ExplanationGenerator ({explanation_result.get('method', 'unknown')})"
                 ],
-                "location_extraction_used": self._extracted_location_info.get("extracted_from_text", False) if hasattr(self, '_extracted_location_info') else False,
+                "location_extraction_used": location_info.get("extracted_from_text", False),
                 "focus_city": "Chennai",
                 "base_coordinates": config.CITY_COORDINATES["Chennai"],
                 "person": "Person A (ML Pipeline)",
                 "timestamp": self._get_timestamp(),
-                "processing_time_ms": int((time.time() - start_time) * 1000)
+                "processing_time_ms": int((time.time() - stages["start_time"]) * 1000)
             }
         }
 
-        print("\n✅ ANALYSIS COMPLETE!")
-        print(f"📍 Location: {location} ({'extracted' if extracted_from_text else 'provided'})")
-        print(f"🎯 Priority: {priority_level} ({priority_score:.1%})")
-        print(f"⚠️  Severity: {severity_result['overall']:.1%}")
-        print(f"⚡ Urgency: {urgency_result['urgency_level'].upper()}")
-        print("-" * 60)
+        if explanation_job_id is not None:
+            result["explanation"].update({
+                "deferred": True,
+                "job_id": explanation_job_id,
+                "status": ExplanationJobManager.PENDING
+            })
+            result["explanation_job_id"] = explanation_job_id
+
+        timer.lap("compile")
+        result["metadata"]["stage_timings_ms"] = timer.breakdown_ms()
+        self._finish_request(timer, "crisis", source=source, location=location,
+                             location_extracted=stages["extracted_from_text"],
+                             crisis_type=type_result["type"], priority_level=priority_level,
+                             priority_score=round(priority_score, 3),
+                             severity=round(severity_result["overall"], 3),
+                             urgency=urgency_result["urgency_level"],
+                             explanation_method=explanation_result.get("method", "unknown"))
 
         return result
+
+    @staticmethod
+    def _finish_request(timer: StageTimer, kind: str, **fields):
+        """Add the request to the latency histograms and log its one summary record"""
+        timer.finish(kind)
+        log_event("analysis", kind=kind, total_ms=round(sum(timer.stages.values()) * 1000, 3),
+                  stage_timings_ms=timer.breakdown_ms(), **fields)
     
     def _calculate_priority(self, crisis_confidence: float, type_confidence: float,
                            severity: float, urgency: float, crisis_type: str) -> float:
@@ -453,39 +1002,108 @@ class CrisisPipeline:
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     def analyze_batch(self, texts: list, sources: list = None, 
-                     locations: list = None) -> list:
-        """Analyze multiple texts"""
-        results = []
-        for i, text in enumerate(texts):
-            source = sources[i] if sources and i < len(sources) else "unknown"
-            location = locations[i] if locations and i < len(locations) else "Chennai"
-            
-            result = self.analyze(text, source, location)
-            results.append(result)
-        
+                     locations: list = None, batch_size: Optional[int] = None,
+                     defer_explanations: list = None, callback_urls: list = None,
+                     modes: list = None) -> list:
+        """Analyze multiple texts, running crisis detection as batched forward passes"""
+        results = [None] * len(texts)
+        for i, result in self.iter_analyze_batch(texts, sources, locations, batch_size,
+                                                 defer_explanations, callback_urls,
+                                                 modes=modes, chunk_size=None,
+                                                 raise_errors=True):
+            results[i] = result
         return results
 
-    def _handle_location_failure(self):
-        """Handle location extraction failure"""
-        self._extracted_location_info = {
+    def iter_analyze_batch(self, texts: list, sources: list = None,
+                           locations: list = None, batch_size: Optional[int] = None,
+                           defer_explanations: list = None, callback_urls: list = None,
+                           modes: list = None, chunk_size: Optional[int] = None,
+                           raise_errors: bool = False) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Stream (index, result) pairs as each report finishes
+        
+        Reports are processed in chunks of `chunk_size` (None = all at once):
+        cached results of a chunk are yielded first, then its misses get one
+        batched detection pass and are yielded one by one as they complete.
+        With raise_errors=False a failing report yields {"error": ...}
+        instead of aborting the stream.
+        """
+        chunk_size = chunk_size or max(1, len(texts))
+        for chunk_start in range(0, len(texts), chunk_size):
+            pending = []
+            for i in range(chunk_start, min(chunk_start + chunk_size, len(texts))):
+                text = texts[i]
+                source = sources[i] if sources and i < len(sources) else "unknown"
+                location = locations[i] if locations and i < len(locations) else "Chennai"
+                mode = (modes[i] if modes and i < len(modes) else None) or "full"
+                callback_url = callback_urls[i] if callback_urls and i < len(callback_urls) else None
+                try:
+                    self._check_mode(mode)
+                    deferred = self._should_defer(
+                        defer_explanations[i] if defer_explanations and i < len(defer_explanations) else None,
+                        mode
+                    )
+                    self._check_callback(callback_url, deferred)
+                except ValueError as e:
+                    if raise_errors:
+                        raise
+                    yield i, {"error": str(e)}
+                    continue
+                
+                cache_key = self._cache_key(text, source, location, deferred, mode, callback_url)
+                cached = self._cache_lookup(cache_key)
+                if cached is not None:
+                    yield i, cached
+                else:
+                    pending.append((i, cache_key, source, location, deferred, callback_url, mode))
+            
+            if not pending:
+                continue
+            
+            # Only texts missing from the cache go through the model
+            batch_start = time.perf_counter()
+            cleaned_texts = [self._detection_input(texts[item[0]]) for item in pending]
+            cleaned_at = time.perf_counter()
+            crisis_results = self.crisis_detector.predict_batch(cleaned_texts, batch_size=batch_size)
+            # Each report is charged an equal share of the batched passes
+            preprocessing_share = (cleaned_at - batch_start) / len(pending)
+            detection_share = (time.perf_counter() - cleaned_at) / len(pending)
+            
+            for (i, cache_key, source, location, deferred, callback_url, mode), crisis_result in zip(pending, crisis_results):
+                timer = StageTimer()
+                timer.record("preprocessing", preprocessing_share)
+                timer.record("detection", detection_share)
+                try:
+                    result = self._analyze_and_cache(cache_key, texts[i], source, location, crisis_result,
+                                                     deferred, callback_url, mode, timer)
+                except Exception as e:
+                    if raise_errors:
+                        raise
+                    logger.error(f"Batch item {i} failed: {e}")
+                    result = {"error": str(e)}
+                yield i, result
+
+    @staticmethod
+    def _default_location_info() -> Dict[str, Any]:
+        """Location details when none could be extracted (Chennai)"""
+        return {
             "name": "Chennai",
             "extracted_from_text": False,
-            "coordinates": config.CITY_COORDINATES["Chennai"],
+            "coordinates": dict(config.CITY_COORDINATES["Chennai"]),
             "confidence": "default",
             "all_locations": []
         }
 
-    def _handle_provided_location(self, location: str):
-        """Handle provided location"""
+    def _provided_location_info(self, location: str) -> Dict[str, Any]:
+        """Location details for a location given by the caller"""
         try:
-            from ..utils.simple_location import get_simple_location_extractor
             extractor = get_simple_location_extractor()
             
             # Check if location is in our database
             for loc_name, loc_data in extractor.cities_db.items():
                 if (loc_name.lower() == location.lower() or 
                     location.lower() in loc_name.lower()):
-                    self._extracted_location_info = {
+                    return {
                         "name": location,
                         "extracted_from_text": False,
                         "coordinates": {
@@ -498,23 +1116,22 @@ class CrisisPipeline:
                         "confidence": "high",
                         "all_locations": [location]
                     }
-                    return
             
             # If not found in database, use config
-            self._extracted_location_info = {
+            return {
                 "name": location,
                 "extracted_from_text": False,
-                "coordinates": config.CITY_COORDINATES.get(
+                "coordinates": dict(config.CITY_COORDINATES.get(
                     location, 
                     config.CITY_COORDINATES["Chennai"]
-                ),
+                )),
                 "confidence": "provided",
                 "all_locations": [location]
             }
             
         except Exception as e:
-            print(f"   ⚠️  Could not process provided location: {e}")
-            self._handle_location_failure()
+            logger.warning(f"Could not process provided location: {e}")
+            return self._default_location_info()
 
 # ====== GLOBAL INSTANCE & CONVENIENCE FUNCTION ======
 _pipeline_instance = None
@@ -536,6 +1153,41 @@ def analyze_crisis(text: str, **kwargs) -> Dict[str, Any]:
     pipeline = get_pipeline()
     return pipeline.analyze(text, **kwargs)
 
+async def analyze_crisis_async(text: str, **kwargs) -> Dict[str, Any]:
+    """Awaitable analyze_crisis() - see CrisisPipeline.analyze_async"""
+    return await get_pipeline().analyze_async(text, **kwargs)
+
+_cpu_executor = None
+_cpu_executor_lock = threading.Lock()
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Dedicated pool for CPU-bound stages in async serving mode (singleton)"""
+    global _cpu_executor
+    with _cpu_executor_lock:
+        if _cpu_executor is None:
+            _cpu_executor = ThreadPoolExecutor(
+                max_workers=max(1, config.CPU_EXECUTOR_WORKERS),
+                thread_name_prefix="cpu-stage"
+            )
+    return _cpu_executor
+
+def get_batch_scheduler() -> MicroBatchScheduler:
+    """The pipeline's crisis detection micro-batching scheduler"""
+    return get_pipeline()._get_detection_scheduler()
+
+def analyze_crisis_batched(text: str, source: str = "unknown",
+                           location: str = "Chennai",
+                           defer_explanation: Optional[bool] = None,
+                           callback_url: Optional[str] = None,
+                           mode: str = "full") -> Dict[str, Any]:
+    """
+    Same as analyze_crisis(), but the detection forward pass is batched with concurrent callers
+    """
+    return get_pipeline().analyze_batched(
+        text, source=source, location=location, defer_explanation=defer_explanation,
+        callback_url=callback_url, mode=mode
+    )
+
 
 
 
@@ -1,9 +1,18 @@
 #this is the foundation of all Model class
 
-import torch
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+try:
+    from .inference_backend import create_backend
+    from ..utils.config import config
+except ImportError:
+    # For direct execution
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from models.inference_backend import create_backend
+    from utils.config import config
 
 # Setting up logging
 logging.basicConfig(level=logging.INFO)
@@ -11,19 +20,23 @@ logger = logging.getLogger(__name__)
 
 class BaseModel:
     
-    def __init__(self, model_name: str, max_length: int = 256):
+    def __init__(self, model_name: str, max_length: int = 256, backend: Optional[str] = None):
         """
         Initializing a base model
         
         Args:
             model_name: HuggingFace model path 
             max_length: Maximum token length for input text
+            backend: "torch", "torch_int8" or "onnx" (see models/inference_backend.py),
+                defaults to config.CRISIS_DETECTION_BACKEND
         """
         self.model_name = model_name
         self.max_length = max_length
+        self.backend_name = backend or config.CRISIS_DETECTION_BACKEND
+        self.backend = None
         self.model = None
         self.tokenizer = None
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.device = None  # resolved on load(), so torch is only imported when needed
         logger.info(f"Initialized {self.__class__.__name__} with model: {model_name}")
         
     def load(self) -> 'BaseModel':
@@ -36,24 +49,24 @@ class BaseModel:
         if self.model is None:
             try:
                 logger.info(f"Loading model: {self.model_name}")
+                self.device = "cpu"
+                if self.backend_name != "onnx":
+                    import torch
+                    self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
                 
-                # Load tokenizer
-                self.tokenizer = AutoTokenizer.from_pretrained(
-                    self.model_name,
-                    use_fast=True
-                )
-                
-                # Load model
-                self.model = AutoModelForSequenceClassification.from_pretrained(
+                # Load model (moved to GPU if available, in evaluation mode)
+                self.backend = create_backend(
+                    self.backend_name,
                     self.model_name,
+                    device=str(self.device),
                     num_labels=2  # Default, can be overridden in child classes
-                )
+                ).load()
                 
-                # Move to GPU if available
-                self.model.to(self.device)
-                self.model.eval()  # Set to evaluation mode
+                # Load tokenizer
+                self.tokenizer = self.backend.load_tokenizer()
+                self.model = self.backend.model
                 
-                logger.info(f"Successfully loaded {self.model_name} on {self.device}")
+                logger.info(f"Successfully loaded {self.model_name} on the {self.backend_name} backend")
                 
             except Exception as e:
                 logger.error(f"Failed to load model {self.model_name}: {str(e)}")
@@ -61,7 +74,7 @@ class BaseModel:
         
         return self
     
-    def preprocess(self, text: str) -> Dict[str, torch.Tensor]:
+    def preprocess(self, text: str) -> Dict[str, Any]:
         """
         Preprocess text for model input
         
@@ -81,11 +94,12 @@ class BaseModel:
                 truncation=True,
                 max_length=self.max_length,
                 padding='max_length',
-                return_tensors="pt"
+                return_tensors=self.backend.return_tensors
             )
             
             # Move to same device as model
-            inputs = {key: value.to(self.device) for key, value in inputs.items()}
+            if self.backend.return_tensors == "pt":
+                inputs = {key: value.to(self.backend.device) for key, value in inputs.items()}
             
             return inputs
             
@@ -93,6 +107,18 @@ class BaseModel:
             logger.error(f"Text preprocessing failed: {str(e)}")
             raise ValueError(f"Text preprocessing error: {str(e)}")
     
+    def predict_proba(self, text: str) -> list:
+        """
+        Class probabilities for one text on the selected backend
+        
+        Args:
+            text: Input text
+            
+        Returns:
+            List of probabilities, one per label
+        """
+        return self.backend.predict_proba(self.preprocess(text))[0]
+    
     def predict(self, text: str) -> Dict[str, Any]:
         """
         Abstract prediction method - must be implemented by child classes
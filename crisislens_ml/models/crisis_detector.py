@@ -1,70 +1,75 @@
 # models/crisis_detector.py 
 import re
-from typing import Dict, Any, List, Optional
-
-try:
-    import torch
-    import torch.nn.functional as F
-    from transformers import AutoModelForSequenceClassification, AutoTokenizer
-    HAS_TORCH = True
-except ImportError:
-    HAS_TORCH = False
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
 
 try:
+    from .inference_backend import create_backend
     from ..utils.config import config
     from ..utils.logger import logger
+    from ..utils.keyword_engine import KeywordHits
+    from ..utils.text_features import TextFeatures, TextInput, ensure_features
 except ImportError:
     # For direct execution
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from models.inference_backend import create_backend
     from utils.config import config
     from utils.logger import logger
+    from utils.keyword_engine import KeywordHits
+    from utils.text_features import TextFeatures, TextInput, ensure_features
 import math
 
 class CrisisDetector:
     """Step 3: Detect if text is about a crisis"""
     
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None):
         self.crisis_keywords = config.CRISIS_KEYWORDS
         self.non_crisis_keywords = config.NON_CRISIS_KEYWORDS
 
         self.model_name = config.CRISIS_DETECTION_MODEL
+        self.backend_name = backend or config.CRISIS_DETECTION_BACKEND
+        self.backend = None
         self.model = None
         self.tokenizer = None
+        # not_loaded -> loading -> ready | failed
+        self.load_state = "not_loaded"
+        self.load_seconds = None
+        self.load_error = None
+        self._load_lock = threading.Lock()
+        self.max_length = 256
+        self.strong_keywords = config.STRONG_CRISIS_INDICATORS
         
-        # Pre-compile regex patterns for exact word matching
-        self.crisis_patterns = self._compile_keyword_patterns(self.crisis_keywords)
-        self.non_crisis_patterns = self._compile_keyword_patterns(self.non_crisis_keywords)
+        # Requests resolved at each cascade tier
+        self._cascade_lock = threading.Lock()
+        self.cascade_counts = {"keyword_crisis": 0, "keyword_non_crisis": 0, "neural": 0, "keyword_only": 0}
     
-    def _compile_keyword_patterns(self, keywords: List[str]) -> List[re.Pattern]:
-        """Compile keyword patterns with word boundaries"""
-        patterns = []
-        for keyword in keywords:
-            # Escape special regex characters and add word boundaries
-            pattern = re.compile(r'\b{}\b'.format(re.escape(keyword)), re.IGNORECASE)
-            patterns.append(pattern)
-        return patterns
-    
-    def detect(self, text: str, threshold: Optional[float] = None) -> Dict[str, Any]:
-        """Detect if text contains crisis information"""
-        logger.info(f"Detecting crisis in text: {text[:50]}...")
+    def detect(self, text: TextInput, threshold: Optional[float] = None) -> Dict[str, Any]:
+        """Detect if text contains crisis information (raw text or TextFeatures)"""
+        features = ensure_features(text)
+        text = features.text
+        logger.debug("Detecting crisis in text: %.50s...", text)
         
         threshold = threshold or config.CRISIS_DETECTION_THRESHOLD
         
-        # Clean and validate text
+        # Clean and validate text, reusing the features when cleaning is a no-op
         cleaned_text = self._clean_text(text)
-        if not self._validate_text(cleaned_text):
+        if cleaned_text != text:
+            features = TextFeatures(cleaned_text)
+        if not self._validate_text(features):
             return self._invalid_text_response(text)
         
-        text_lower = cleaned_text.lower()
+        # One pass over the text for every keyword list
+        hits = features.keyword_hits
         
         # IMPROVED: Count crisis indicators with better scoring
-        crisis_count = self._count_pattern_matches(text_lower, self.crisis_patterns)
-        non_crisis_count = self._count_pattern_matches(text_lower, self.non_crisis_patterns)
+        crisis_count = self._count_keyword_matches(hits, self.crisis_keywords)
+        non_crisis_count = self._count_keyword_matches(hits, self.non_crisis_keywords)
         
         # IMPROVED: Check for strong crisis indicators
-        strong_indicators = self._check_strong_indicators(text_lower)
+        strong_indicators = self._check_strong_indicators(hits)
         
         # Calculate base score with boost for strong indicators
         total_indicators = crisis_count + non_crisis_count
@@ -78,7 +83,7 @@ class CrisisDetector:
             base_score = min(1.0, base_score + 0.3)
         
         # Adjust for keyword density
-        text_length = len(text_lower.split())
+        text_length = features.word_count
         density_factor = self._calculate_density_factor(text_length, crisis_count)
         adjusted_score = min(1.0, base_score * (1 + density_factor))
         
@@ -86,7 +91,7 @@ class CrisisDetector:
         is_crisis = adjusted_score >= threshold
         
         # Find exact evidence keywords
-        found_keywords = self._find_keyword_matches(text_lower, self.crisis_patterns, self.crisis_keywords)
+        found_keywords = hits.words_found(self.crisis_keywords)
         
         return {
             "is_crisis": bool(is_crisis),
@@ -101,112 +106,379 @@ class CrisisDetector:
             "explanation": self._generate_explanation(is_crisis, adjusted_score, found_keywords, threshold)
         }
 
-    def _check_strong_indicators(self, text: str) -> int:
+    def _check_strong_indicators(self, hits: KeywordHits) -> int:
         """Check for strong crisis indicators"""
-        strong_keywords = [
-            # Fire
-            "chemical fire", "factory fire", "industrial fire", "major fire",
-            # Earthquake
-            "earthquake magnitude", "magnitude", "epicenter", "seismic",
-            # Cyclone
-            "cyclone alert", "storm surge", "landfall", "wind speed",
-            # General urgent
-            "urgent", "emergency", "breaking", "alert", "warning"
-        ]
-        
         count = 0
-        for keyword in strong_keywords:
-            if keyword in text:
+        for keyword in self.strong_keywords:
+            if hits.contains(keyword):
                 count += 1
         
         return count
     
-    def predict(self, text: str) -> Dict[str, Any]:
+    def _load_model(self, wait: bool = False) -> bool:
+        """
+        Lazy load the model on the configured backend, returns False if it is unavailable
+        
+        While another thread is loading, returns False straight away (callers
+        answer from keywords) unless `wait` is set.
+        """
+        if self.model is not None:
+            return True
+        if self.load_state == "loading" and not wait:
+            return False
+        
+        with self._load_lock:
+            if self.model is not None:
+                return True
+            self.load_state = "loading"
+            start = time.perf_counter()
+            try:
+                backend = create_backend(self.backend_name, self.model_name).load()
+                self.tokenizer = backend.load_tokenizer()
+                self.backend = backend
+                self.model = backend.model
+            except Exception as load_error:
+                logger.error(f"Failed to load HuggingFace model: {load_error}")
+                self.load_error = f"{type(load_error).__name__}: {load_error}"
+                self.load_state = "failed"
+                return False
+            self.load_seconds = round(time.perf_counter() - start, 3)
+            self.load_error = None
+            self.load_state = "ready"
+        return True
+
+    def mark_loading(self):
+        """Announce a background load: requests use keyword-only detection until it finishes"""
+        if self.model is None:
+            self.load_state = "loading"
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """Size of the loaded weights and whether they are memory-mapped"""
+        if self.model is None:
+            return {"loaded": False, "state": self.load_state}
+        return {"loaded": True, **self.backend.memory_stats()}
+
+    def warm_up(self) -> bool:
+        """Load the model and run one forward pass; False if it is unavailable"""
+        if not self._load_model(wait=True):
+            return False
+        self.hybrid_scores(["warmup text"])
+        return True
+
+    def _cascade(self, text: TextFeatures) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Keyword tier of the detection cascade
+        
+        Returns (keyword_result, resolved). `resolved` is the final result when
+        the keyword score is outside [CASCADE_LOWER_BOUND, CASCADE_UPPER_BOUND],
+        None when the transformer has to decide. The default bounds are chosen
+        so the hybrid score could not land on the other side of the threshold.
+        
+        A resolved result reports the hybrid score at its conservative bound,
+        i.e. with the neural probability the transformer would have needed to
+        get closest to overturning the decision (0.0 for crisis, 1.0 for
+        non-crisis), so confidences stay on the hybrid scale. Invalid or too
+        short texts resolve to the invalid-text response unchanged and are
+        not counted as a cascade tier.
+        """
+        keyword_result = self.detect(text)
+        if not config.ENABLE_DETECTION_CASCADE:
+            return keyword_result, None
+        if "error" in keyword_result:
+            return keyword_result, keyword_result
+        
+        keyword_score = keyword_result["confidence"]
+        if keyword_score >= config.CASCADE_UPPER_BOUND:
+            tier, is_crisis, neural_bound = "keyword_crisis", True, 0.0
+        elif keyword_score <= config.CASCADE_LOWER_BOUND:
+            tier, is_crisis, neural_bound = "keyword_non_crisis", False, 1.0
+        else:
+            return keyword_result, None
+        
+        self._count_cascade_tier(tier)
+        return keyword_result, {
+            **keyword_result,
+            "is_crisis": is_crisis,
+            "confidence": self._combined_score(neural_bound, keyword_score),
+            "score_breakdown": {
+                "neural_network": None,
+                "neural_bound": neural_bound,
+                "keyword_score": keyword_score,
+                "keywords_found": keyword_result.get("keywords_found", [])
+            },
+            "model": "keyword_cascade",
+            "method": "keyword_cascade",
+            "cascade_tier": tier
+        }
+    
+    def _count_cascade_tier(self, tier: str, count: int = 1):
+        with self._cascade_lock:
+            self.cascade_counts[tier] += count
+    
+    def get_cascade_stats(self) -> Dict[str, Any]:
+        """How many predictions each cascade tier resolved
+        
+        keyword_only counts uncertain texts that could not reach the
+        transformer because the model is unavailable.
+        """
+        with self._cascade_lock:
+            counts = dict(self.cascade_counts)
+        total = sum(counts.values())
+        return {
+            "enabled": config.ENABLE_DETECTION_CASCADE,
+            "band": [config.CASCADE_LOWER_BOUND, config.CASCADE_UPPER_BOUND],
+            **counts,
+            "total": total,
+            "neural_share": round(counts["neural"] / total, 4) if total else 0.0
+        }
+
+    def predict(self, text: TextInput) -> Dict[str, Any]:
         """
         New method that uses HuggingFace model with better fallback
+        
+        The keyword scorer runs first; the transformer only runs when the
+        keyword score falls inside the cascade's uncertainty band.
         """
+        text = ensure_features(text)
+        keyword_result, resolved = self._cascade(text)
+        if resolved is not None:
+            return resolved
+        
         try:
             # Load model if not loaded
-            if self.model is None:
-                try:
-                    self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-                    self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
-                except Exception as load_error:
-                    logger.error(f"Failed to load HuggingFace model: {load_error}")
-                    # IMMEDIATELY fallback to keyword-only
-                    return self.detect(text)
-            
-            # Get neural network prediction
-            inputs = self.tokenizer(
-                text,
-                truncation=True,
-                max_length=256,
-                padding=True,
-                return_tensors="pt"
-            )
+            if not self._load_model():
+                # IMMEDIATELY fallback to keyword-only
+                self._count_cascade_tier("keyword_only")
+                return keyword_result
             
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                probabilities = F.softmax(outputs.logits, dim=-1)
-                # For sentiment model: index 0 = negative (crisis), index 1 = positive
-                crisis_prob = probabilities[0][0].item()
+            # Get neural network prediction (all windows of a long text in one pass)
+            encodings, owners = self._encode([text.text])
+            window_probs = self._batch_crisis_probabilities(encodings, list(range(len(owners))))
+            crisis_prob = self._aggregate_windows(window_probs)
             
-            # Also get keyword score
-            keyword_result = self.detect(text)
-            keyword_score = keyword_result["confidence"]
+            self._count_cascade_tier("neural")
+            return self._hybrid_result(text, crisis_prob, keyword_result)
             
-            # Use higher weight for keywords since model might be generic
-            combined_score = (0.4 * crisis_prob) + (0.6 * keyword_score)  # 60% weight to keywords
-            is_crisis = combined_score >= config.CRISIS_DETECTION_THRESHOLD
+        except Exception as e:
+            logger.error(f"HuggingFace model failed completely: {e}")
+            return self._keyword_fallback(text)
+
+    def predict_batch(self, texts: List[TextInput], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Batched version of predict() - one forward pass per micro-batch
+        
+        Texts are tokenized once without padding, sorted by token length and
+        padded per micro-batch, so each batch only pads to its own longest
+        text. Results come back in input order, in the same shape as predict().
+        """
+        if not texts:
+            return []
+        
+        batch_size = batch_size or config.INFERENCE_BATCH_SIZE
+        texts = [ensure_features(text) for text in texts]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        
+        # Keyword tier first; only uncertain texts reach the transformer
+        keyword_results = []
+        uncertain = []
+        for i, text in enumerate(texts):
+            keyword_result, resolved = self._cascade(text)
+            keyword_results.append(keyword_result)
+            if resolved is not None:
+                results[i] = resolved
+            else:
+                uncertain.append(i)
+        if not uncertain:
+            return results
+        
+        try:
+            if not self._load_model():
+                self._count_cascade_tier("keyword_only", len(uncertain))
+                for i in uncertain:
+                    results[i] = keyword_results[i]
+                return results
             
+            encodings, owners = self._encode([texts[i].text for i in uncertain])
+        except Exception as e:
+            logger.error(f"Batch tokenization failed: {e}")
+            for i in uncertain:
+                results[i] = self._keyword_fallback(texts[i])
+            return results
+        
+        # Group similar lengths together to minimise padding
+        # (positions index into `encodings`; owners[w] indexes into `uncertain`)
+        order = sorted(range(len(owners)), key=lambda w: len(encodings["input_ids"][w]))
+        window_probs: List[Optional[float]] = [None] * len(owners)
+        failed = set()
+        
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            try:
+                crisis_probs = self._batch_crisis_probabilities(encodings, chunk)
+            except Exception as e:
+                logger.error(f"Batched inference failed, using keyword fallback: {e}")
+                failed.update(owners[w] for w in chunk)
+                continue
+            for w, crisis_prob in zip(chunk, crisis_probs):
+                window_probs[w] = crisis_prob
+        
+        per_text: List[List[float]] = [[] for _ in uncertain]
+        for w, j in enumerate(owners):
+            per_text[j].append(window_probs[w])
+        
+        self._count_cascade_tier("neural", len(uncertain) - len(failed))
+        for j, i in enumerate(uncertain):
+            if j in failed:
+                results[i] = self._keyword_fallback(texts[i])
+            else:
+                crisis_prob = self._aggregate_windows(per_text[j])
+                results[i] = self._hybrid_result(texts[i], crisis_prob, keyword_results[i])
+        
+        return results
+
+    def _encode(self, texts: List[str]):
+        """
+        Tokenize texts for the model, returns (encodings, owners)
+        
+        Each encoding row is one model input and owners[row] is the index of
+        the text it came from. In "first" long-document mode every text is
+        truncated to one row; otherwise texts longer than max_length are split
+        into windows overlapping by LONG_DOC_WINDOW_STRIDE tokens, at most
+        LONG_DOC_MAX_WINDOWS per text, spread evenly over the document.
+        """
+        if config.LONG_DOCUMENT_MODE == "first":
+            encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+            return encodings, list(range(len(texts)))
+        
+        encodings = self.tokenizer(
+            texts,
+            truncation=True,
+            max_length=self.max_length,
+            stride=config.LONG_DOC_WINDOW_STRIDE,
+            return_overflowing_tokens=True
+        )
+        mapping = list(encodings["overflow_to_sample_mapping"])
+        windows: Dict[int, List[int]] = {}
+        for row, owner in enumerate(mapping):
+            windows.setdefault(owner, []).append(row)
+        
+        kept = []
+        for owner in range(len(texts)):
+            rows = windows.get(owner, [])
+            cap = max(1, config.LONG_DOC_MAX_WINDOWS)
+            if len(rows) > cap:
+                # Keep the first and last window and space the rest between them
+                step = (len(rows) - 1) / (cap - 1) if cap > 1 else 0
+                rows = sorted({rows[round(k * step)] for k in range(cap)})
+            kept.extend(rows)
+        
+        keys = [key for key in encodings.keys() if key != "overflow_to_sample_mapping"]
+        selected = {key: [encodings[key][row] for row in kept] for key in keys}
+        return selected, [mapping[row] for row in kept]
+
+    @staticmethod
+    def _aggregate_windows(window_probs: List[float]) -> float:
+        """Combine per-window crisis probabilities (LONG_DOCUMENT_MODE)"""
+        if len(window_probs) == 1:
+            return window_probs[0]
+        mode = config.LONG_DOCUMENT_MODE
+        if mode == "mean":
+            return sum(window_probs) / len(window_probs)
+        if mode == "attention":
+            # Softmax over the probabilities: confident windows dominate, but
+            # one outlier does not decide alone as it does with "max"
+            temperature = config.LONG_DOC_ATTENTION_TEMPERATURE
+            peak = max(window_probs)
+            weights = [math.exp((p - peak) / temperature) for p in window_probs]
+            return sum(w * p for w, p in zip(weights, window_probs)) / sum(weights)
+        return max(window_probs)
+
+    def hybrid_scores(self, texts: List[TextInput]) -> List[float]:
+        """
+        Hybrid scores from the transformer for every text, bypassing the
+        cascade - used to compare backends. Raises if the model is unavailable.
+        """
+        if not self._load_model():
+            raise RuntimeError(f"Model {self.model_name} could not be loaded on the {self.backend_name} backend")
+        texts = [ensure_features(text) for text in texts]
+        encodings, owners = self._encode([features.text for features in texts])
+        window_probs = self._batch_crisis_probabilities(encodings, list(range(len(owners))))
+        per_text: List[List[float]] = [[] for _ in texts]
+        for owner, crisis_prob in zip(owners, window_probs):
+            per_text[owner].append(crisis_prob)
+        return [self._hybrid_result(text, self._aggregate_windows(probs))["confidence"]
+                for text, probs in zip(texts, per_text)]
+
+    def estimate_token_length(self, text: TextInput) -> int:
+        """Cheap token length estimate (whitespace words) used for length bucketing"""
+        if isinstance(text, TextFeatures):
+            return min(self.max_length, text.word_count)
+        return min(self.max_length, len(text.split()))
+
+    def _batch_crisis_probabilities(self, encodings, indices: List[int]) -> List[float]:
+        """Run one padded forward pass over the selected encodings"""
+        features = {
+            key: [encodings[key][i] for i in indices]
+            for key in encodings.keys()
+        }
+        inputs = self.tokenizer.pad(features, padding=True, return_tensors=self.backend.return_tensors)
+        
+        # For sentiment model: index 0 = negative (crisis), index 1 = positive
+        return [row[0] for row in self.backend.predict_proba(inputs)]
+
+    @staticmethod
+    def _combined_score(crisis_prob: float, keyword_score: float) -> float:
+        # Use higher weight for keywords since model might be generic
+        return (0.4 * crisis_prob) + (0.6 * keyword_score)  # 60% weight to keywords
+
+    def _hybrid_result(self, text: TextFeatures, crisis_prob: float,
+                       keyword_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Combine neural crisis probability with the keyword score"""
+        if keyword_result is None:
+            keyword_result = self.detect(text)
+        keyword_score = keyword_result["confidence"]
+        combined_score = self._combined_score(crisis_prob, keyword_score)
+        is_crisis = combined_score >= config.CRISIS_DETECTION_THRESHOLD
+        
+        return {
+            "is_crisis": is_crisis,
+            "confidence": combined_score,
+            "score_breakdown": {
+                "neural_network": crisis_prob,
+                "keyword_score": keyword_score,
+                "keywords_found": keyword_result.get("keywords_found", [])
+            },
+            "model": self.model_name,
+            "method": "hybrid"
+        }
+
+    def _keyword_fallback(self, text: TextFeatures) -> Dict[str, Any]:
+        """Fallback to keyword-only with boosted confidence"""
+        keyword_result = self.detect(text)
+        # Boost confidence for clear disaster keywords
+        if any(word in text.text_lower for word in ["landslide", "earthquake", "flood", "fire", "dead", "bodies"]):
+            boosted_confidence = min(1.0, keyword_result["confidence"] + 0.3)
             return {
-                "is_crisis": is_crisis,
-                "confidence": combined_score,
+                "is_crisis": True,
+                "confidence": boosted_confidence,
                 "score_breakdown": {
-                    "neural_network": crisis_prob,
-                    "keyword_score": keyword_score,
+                    "neural_network": 0.0,
+                    "keyword_score": boosted_confidence,
                     "keywords_found": keyword_result.get("keywords_found", [])
                 },
-                "model": self.model_name,
-                "method": "hybrid"
+                "model": "keyword_fallback",
+                "method": "keyword_boosted"
             }
-            
-        except Exception as e:
-            logger.error(f"HuggingFace model failed completely: {e}")
-            # Fallback to keyword-only with boosted confidence
-            keyword_result = self.detect(text)
-            # Boost confidence for clear disaster keywords
-            if any(word in text.lower() for word in ["landslide", "earthquake", "flood", "fire", "dead", "bodies"]):
-                boosted_confidence = min(1.0, keyword_result["confidence"] + 0.3)
-                return {
-                    "is_crisis": True,
-                    "confidence": boosted_confidence,
-                    "score_breakdown": {
-                        "neural_network": 0.0,
-                        "keyword_score": boosted_confidence,
-                        "keywords_found": keyword_result.get("keywords_found", [])
-                    },
-                    "model": "keyword_fallback",
-                    "method": "keyword_boosted"
-                }
-            return self.detect(text)
+        return keyword_result
 
-    def _count_pattern_matches(self, text: str, patterns: List[re.Pattern]) -> int:
-        """Count matches for compiled patterns"""
+    def _count_keyword_matches(self, hits: KeywordHits, keywords: List[str]) -> int:
+        """Count keywords that occur as whole words"""
         count = 0
-        for pattern in patterns:
-            if pattern.search(text):
+        for keyword in keywords:
+            if hits.has_word(keyword):
                 count += 1
         return count
     
-    def _find_keyword_matches(self, text: str, patterns: List[re.Pattern], keywords: List[str]) -> List[str]:
-        """Find which keywords matched"""
-        found = []
-        for pattern, keyword in zip(patterns, keywords):
-            if pattern.search(text):
-                found.append(keyword)
-        return found
-    
     def _calculate_density_factor(self, text_length: int, keyword_count: int) -> float:
         """Calculate density factor with log scaling for longer texts"""
         if text_length == 0 or keyword_count == 0:
@@ -238,17 +510,17 @@ class CrisisDetector:
         
         return text.strip()
     
-    def _validate_text(self, text: str) -> bool:
+    def _validate_text(self, features: TextFeatures) -> bool:
         """Validate text for processing"""
-        if not text:
+        if not features.text:
             return False
         
-        if len(text.split()) < config.MIN_TEXT_LENGTH:
-            logger.warning(f"Text too short: {len(text.split())} words")
+        if features.word_count < config.MIN_TEXT_LENGTH:
+            logger.warning(f"Text too short: {features.word_count} words")
             return False
         
-        if len(text) > config.MAX_TEXT_LENGTH:
-            logger.warning(f"Text too long: {len(text)} chars, truncating")
+        if len(features.text) > config.MAX_TEXT_LENGTH:
+            logger.warning(f"Text too long: {len(features.text)} chars, truncating")
             return True  # We'll process truncated version
         
         return True
@@ -289,7 +561,7 @@ class CrisisDetector:
         
         return explanation
     
-    def detect_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+    def detect_batch(self, texts: List[TextInput]) -> List[Dict[str, Any]]:
         """Detect crises in multiple texts"""
         return [self.detect(text) for text in texts]
 
@@ -0,0 +1,229 @@
+# models/inference_backend.py
+"""
+Inference backends for sequence classification models
+
+- torch:      fp32 PyTorch (AutoModelForSequenceClassification)
+- torch_int8: the same model with its Linear layers dynamically quantized to int8
+- onnx:       an exported ONNX graph executed with ONNX Runtime (see export_model.py)
+
+Every backend turns tokenized inputs into per-row class probabilities, so
+CrisisDetector and BaseModel only decide which tensor format to tokenize to.
+
+torch, transformers and onnxruntime take seconds to import, so they are
+imported when a backend is created, not when this module is.
+"""
+import json
+import os
+from importlib.util import find_spec
+from typing import Any, Dict, List, Optional
+
+HAS_TORCH = find_spec("torch") is not None and find_spec("transformers") is not None
+HAS_ONNX = find_spec("numpy") is not None and find_spec("onnxruntime") is not None
+
+try:
+    from ..utils.config import config
+    from ..utils.logger import logger
+    from ..utils.memory_stats import process_memory
+    from ..utils.mmap_weights import load_mmap_state_dict
+    from ..utils.model_registry import get_model_registry
+except ImportError:
+    # For direct execution
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.config import config
+    from utils.logger import logger
+    from utils.memory_stats import process_memory
+    from utils.mmap_weights import load_mmap_state_dict
+    from utils.model_registry import get_model_registry
+
+BACKENDS = ("torch", "torch_int8", "onnx")
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Written by export_model.py next to the graph, records which model was exported
+EXPORT_INFO_FILE = "export_info.json"
+
+
+def resolve_model_dir(model_name: str, model_dir: Optional[str] = None) -> str:
+    """
+    ONNX export directory of a model
+    
+    Defaults to <ONNX_MODEL_DIR>/<model name>; relative paths are taken from
+    the crisislens_ml folder.
+    """
+    if model_dir is None:
+        model_dir = os.path.join(config.ONNX_MODEL_DIR, model_name.replace("/", "--"))
+    return os.path.join(PACKAGE_DIR, model_dir)
+
+
+class TorchBackend:
+    """fp32 PyTorch model"""
+
+    name = "torch"
+    return_tensors = "pt"
+
+    def __init__(self, model_name: str, device: Optional[str] = None, num_labels: Optional[int] = None):
+        if not HAS_TORCH:
+            raise ImportError("The torch backends need torch and transformers installed")
+        import torch
+        self.model_name = model_name
+        self.device = torch.device(device or "cpu")
+        self.num_labels = num_labels
+        self.model = None
+        self.weights_mmapped = False
+        self.weight_bytes = 0
+        self.load_rss_delta_mb = None
+
+    def load(self) -> 'TorchBackend':
+        if self.model is None:
+            rss_before = process_memory().get("rss_mb")
+            path, local_files_only = get_model_registry().resolve(self.model_name)
+            kwargs = {"num_labels": self.num_labels} if self.num_labels else {}
+            model = None
+            weights_path = os.path.join(path, "model.safetensors")
+            if config.MMAP_MODEL_WEIGHTS and self.device.type == "cpu" and os.path.exists(weights_path):
+                model = self._load_mmapped(path, weights_path, kwargs)
+            if model is None:
+                from transformers import AutoModelForSequenceClassification
+                model = AutoModelForSequenceClassification.from_pretrained(
+                    path, local_files_only=local_files_only, **kwargs
+                )
+            model.eval()
+            self.weight_bytes = sum(t.numel() * t.element_size() for t in model.state_dict().values())
+            self.model = self._prepare(model)
+            rss_after = process_memory().get("rss_mb")
+            if rss_before is not None and rss_after is not None:
+                self.load_rss_delta_mb = round(rss_after - rss_before, 1)
+        return self
+
+    def _load_mmapped(self, path: str, weights_path: str, kwargs: Dict[str, Any]):
+        """Build the model around weights mapped from the safetensors file, None on failure"""
+        from transformers import AutoConfig, AutoModelForSequenceClassification
+        try:
+            model_config = AutoConfig.from_pretrained(path, local_files_only=True, **kwargs)
+            model = AutoModelForSequenceClassification.from_config(model_config)
+            # assign=True keeps the mapped tensors instead of copying into the fresh ones
+            model.load_state_dict(load_mmap_state_dict(weights_path), strict=True, assign=True)
+        except Exception as e:
+            logger.warning(f"Memory-mapped load of {weights_path} failed, using from_pretrained: {e}")
+            return None
+        self.weights_mmapped = True
+        return model
+
+    def memory_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "weights_mb": round(self.weight_bytes / (1024 * 1024), 1),
+            "weights_mmapped": self.weights_mmapped,
+            "load_rss_delta_mb": self.load_rss_delta_mb
+        }
+
+    def _prepare(self, model):
+        return model.to(self.device)
+
+    def load_tokenizer(self):
+        from transformers import AutoTokenizer
+        path, local_files_only = get_model_registry().resolve(self.model_name)
+        return AutoTokenizer.from_pretrained(path, use_fast=True, local_files_only=local_files_only)
+
+    def predict_proba(self, inputs: Dict[str, Any]) -> List[List[float]]:
+        import torch
+        import torch.nn.functional as F
+        inputs = {key: value.to(self.device) for key, value in inputs.items()}
+        with torch.inference_mode():
+            logits = self.model(**inputs).logits
+        return F.softmax(logits, dim=-1).tolist()
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """PyTorch model with int8 dynamic quantization of the Linear layers (CPU only)"""
+
+    name = "torch_int8"
+
+    def __init__(self, model_name: str, device: Optional[str] = None, num_labels: Optional[int] = None):
+        super().__init__(model_name, "cpu", num_labels)
+
+    def _prepare(self, model):
+        import torch
+        # The int8 Linear weights are new heap tensors; only the embeddings stay mapped
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend:
+    """Exported ONNX graph on ONNX Runtime's CPU execution provider"""
+
+    name = "onnx"
+    return_tensors = "np"
+
+    def __init__(self, model_name: str, device: Optional[str] = None, num_labels: Optional[int] = None,
+                 model_dir: Optional[str] = None, model_file: Optional[str] = None):
+        if not HAS_ONNX:
+            raise ImportError("The onnx backend needs numpy and onnxruntime installed")
+        self.model_name = model_name
+        self.model_dir = resolve_model_dir(model_name, model_dir)
+        self.model_path = os.path.join(self.model_dir, model_file or config.ONNX_MODEL_FILE)
+        self.model = None
+        self._input_names = ()
+
+    def load(self) -> 'OnnxBackend':
+        if self.model is None:
+            if not os.path.exists(self.model_path):
+                raise FileNotFoundError(
+                    f"No ONNX model at {self.model_path} - run export_model.py export first"
+                )
+            self._check_export()
+            import onnxruntime as ort
+            options = ort.SessionOptions()
+            if config.ONNX_INTRA_OP_THREADS > 0:
+                options.intra_op_num_threads = config.ONNX_INTRA_OP_THREADS
+            self.model = ort.InferenceSession(
+                self.model_path, options, providers=["CPUExecutionProvider"]
+            )
+            self._input_names = tuple(i.name for i in self.model.get_inputs())
+            logger.info(f"Loaded ONNX model {self.model_path}")
+        return self
+
+    def _check_export(self):
+        """Refuse a graph exported from a different model than the one requested"""
+        info_path = os.path.join(self.model_dir, EXPORT_INFO_FILE)
+        if not os.path.exists(info_path):
+            return
+        with open(info_path, encoding="utf-8") as f:
+            exported = json.load(f).get("model_name")
+        if exported != self.model_name:
+            raise ValueError(
+                f"ONNX model in {self.model_dir} was exported from '{exported}', not '{self.model_name}'"
+            )
+
+    def memory_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "weights_mb": round(os.path.getsize(self.model_path) / (1024 * 1024), 1),
+            "weights_mmapped": False
+        }
+
+    def load_tokenizer(self):
+        from transformers import AutoTokenizer
+        # The export writes the tokenizer next to the graph
+        return AutoTokenizer.from_pretrained(self.model_dir, use_fast=True, local_files_only=True)
+
+    def predict_proba(self, inputs: Dict[str, Any]) -> List[List[float]]:
+        import numpy as np
+        feed = {
+            name: np.asarray(inputs[name], dtype=np.int64)
+            for name in self._input_names if name in inputs
+        }
+        logits = self.model.run(None, feed)[0]
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return (exp / exp.sum(axis=-1, keepdims=True)).tolist()
+
+
+def create_backend(name: Optional[str], model_name: str, **kwargs):
+    """Instantiate (but do not load) the backend selected by name"""
+    name = name or config.CRISIS_DETECTION_BACKEND
+    if name == "torch":
+        return TorchBackend(model_name, **kwargs)
+    if name == "torch_int8":
+        return QuantizedTorchBackend(model_name, **kwargs)
+    if name == "onnx":
+        return OnnxBackend(model_name, **kwargs)
+    raise ValueError(f"Unknown inference backend '{name}', expected one of {BACKENDS}")
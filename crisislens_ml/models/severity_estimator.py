@@ -2,8 +2,120 @@
 4-Dimension Severity Estimator
 """
 import re
+import string
+
+try:
+    from ..utils.config import config
+    from ..utils.text_features import ensure_features
+except ImportError:
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.config import config
+    from utils.text_features import ensure_features
+
+# Spelled-out counts: "two hundred", "twenty-five", "a dozen", "dozens"
+_NUMBER_WORDS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90
+}
+_MULTIPLIER_WORDS = {"dozen": 12, "hundred": 100}
+_SCALE_WORDS = {
+    "thousand": 1000, "lakh": 100000, "lakhs": 100000,
+    "million": 1000000, "crore": 10000000, "crores": 10000000
+}
+# Vague plurals count as their smallest plausible value
+_VAGUE_QUANTITIES = {"dozens": 24, "hundreds": 200, "thousands": 2000}
+
+# "12", "1200", "1,200" and Indian grouping like "1,20,000"
+_DIGIT_TOKEN = re.compile(r'^(?:\d+|\d{1,3}(?:,\d{2,3})+)$')
+
+
+def _is_number_word(word: str) -> bool:
+    return (word in _NUMBER_WORDS or word in _MULTIPLIER_WORDS or word in _SCALE_WORDS
+            or all(part in _NUMBER_WORDS for part in word.split("-")))
+
+
+def _parse_number_mentions(words):
+    """
+    Find numeric mentions in normalized tokens in one left-to-right pass
+    
+    Returns (start, end, value) token spans, end exclusive.
+    """
+    mentions = []
+    i = 0
+    n = len(words)
+    while i < n:
+        word = words[i]
+        
+        if _DIGIT_TOKEN.match(word):
+            value = int(word.replace(",", ""))
+            end = i + 1
+            # "3 lakh", "2 dozen"
+            if end < n and (words[end] in _SCALE_WORDS or words[end] in _MULTIPLIER_WORDS):
+                value *= _SCALE_WORDS.get(words[end]) or _MULTIPLIER_WORDS[words[end]]
+                end += 1
+            mentions.append((i, end, value))
+            i = end
+            continue
+        
+        if word in _VAGUE_QUANTITIES:
+            mentions.append((i, i + 1, _VAGUE_QUANTITIES[word]))
+            i += 1
+            continue
+        
+        # "a hundred", "a dozen"
+        starts_with_a = word == "a" and i + 1 < n and (
+            words[i + 1] in _MULTIPLIER_WORDS or words[i + 1] in _SCALE_WORDS)
+        if not (starts_with_a or _is_number_word(word)):
+            i += 1
+            continue
+        
+        start = i
+        total, current = 0, 0
+        if starts_with_a:
+            current = 1
+            i += 1
+        while i < n:
+            word = words[i]
+            if word in _NUMBER_WORDS:
+                current += _NUMBER_WORDS[word]
+            elif word in _MULTIPLIER_WORDS:
+                current = max(current, 1) * _MULTIPLIER_WORDS[word]
+            elif word in _SCALE_WORDS:
+                total += max(current, 1) * _SCALE_WORDS[word]
+                current = 0
+            elif "-" in word and all(part in _NUMBER_WORDS for part in word.split("-")):
+                current += sum(_NUMBER_WORDS[part] for part in word.split("-"))
+            elif (word == "and" and i > start and i + 1 < n
+                  and (words[i - 1] in _MULTIPLIER_WORDS or words[i - 1] in _SCALE_WORDS)
+                  and words[i + 1] not in _MULTIPLIER_WORDS and words[i + 1] not in _SCALE_WORDS
+                  and _is_number_word(words[i + 1])):
+                # "two hundred and fifty"
+                pass
+            else:
+                break
+            i += 1
+        mentions.append((start, i, total + current))
+    
+    return mentions
+
+
 class SeverityEstimator:
     def __init__(self):
+        self.dimension_keywords = config.SEVERITY_KEYWORDS
+        
+        # Casualty context word -> category (dead / injured / missing)
+        self.casualty_categories = {
+            word: category
+            for category, words in config.CASUALTY_CONTEXT_WORDS.items()
+            for word in words
+        }
+        self.casualty_window = config.CASUALTY_CONTEXT_WINDOW
         print("✅ SeverityEstimator initialized (4 dimensions)")
     
     def estimate(self, text):
@@ -13,42 +125,20 @@ class SeverityEstimator:
         2. Geographic Scale (area affected)  
         3. Infrastructure Damage (buildings, roads)
         4. Temporal Urgency (time sensitivity)
+        
+        Accepts raw text or precomputed TextFeatures.
         """
-        text_lower = text.lower()
+        features = ensure_features(text)
         
         # ===== ENHANCED: Human Impact with death/casualty detection =====
-        human_keywords = [
-            'injured', 'casualty', 'death', 'dead', 'killed', 'fatal',
-            'people', 'person', 'family', 'children', 'victim', 'affected',
-            'body', 'bodies', 'deceased', 'loss of life', 'lives lost',
-            'stranded', 'trapped', 'missing', 'hospitalized', 'wounded'
-        ]
+        human_keywords = self.dimension_keywords["human_impact"]
         
         # Base human score
-        human_score = self._calculate_dimension_score(text_lower, human_keywords)
-        
-        # ENHANCED: Count casualties from numbers in text
-        numbers = re.findall(r'\b\d+\b', text)
-        casualty_count = 0
-        casualty_context_words = ['dead', 'killed', 'casualty', 'death', 'body', 
-                                'bodies', 'injured', 'wounded', 'hospitalized']
-        
-        for i, num in enumerate(numbers):
-            try:
-                num_value = int(num)
-                # Check if number is near casualty keywords
-                words = text_lower.split()
-                if num in words:
-                    idx = words.index(num)
-                    # Check 5 words before and after
-                    context_start = max(0, idx - 5)
-                    context_end = min(len(words), idx + 6)
-                    context = ' '.join(words[context_start:context_end])
-                    
-                    if any(word in context for word in casualty_context_words):
-                        casualty_count += num_value
-            except ValueError:
-                continue
+        human_score = self._calculate_dimension_score(features, human_keywords)
+        
+        # ENHANCED: Count casualties from numbers in text (dead, injured, missing)
+        casualties = self._extract_casualties(features)
+        casualty_count = casualties["dead"] + casualties["injured"]
         
         # Apply casualty multiplier
         if casualty_count > 0:
@@ -62,35 +152,23 @@ class SeverityEstimator:
                 human_score = min(0.85, human_score + 0.20)
         
         # ===== Dimension 2: Geographic Scale =====
-        geo_keywords = [
-            'area', 'region', 'city', 'multiple', 'widespread', 'extensive',
-            'several', 'many', 'whole', 'entire', 'across', 'district',
-            'province', 'state', 'country', 'nationwide', 'large scale'
-        ]
-        geo_score = self._calculate_dimension_score(text_lower, geo_keywords)
+        geo_keywords = self.dimension_keywords["geographic_scale"]
+        geo_score = self._calculate_dimension_score(features, geo_keywords)
         
         # Boost for geographic indicators
-        if any(word in text_lower for word in ['entire', 'whole', 'country', 'nationwide']):
+        hits = features.keyword_hits
+        if any(hits.contains(word) for word in ['entire', 'whole', 'country', 'nationwide']):
             geo_score = min(0.95, geo_score + 0.25)
-        elif any(word in text_lower for word in ['multiple', 'several', 'across']):
+        elif any(hits.contains(word) for word in ['multiple', 'several', 'across']):
             geo_score = min(0.90, geo_score + 0.15)
         
         # ===== Dimension 3: Infrastructure Damage =====
-        infra_keywords = [
-            'building', 'road', 'hospital', 'school', 'bridge', 'house',
-            'shop', 'market', 'damage', 'destroyed', 'collapsed', 'broken',
-            'damaged', 'displaces', 'infrastructure', 'property', 'home',
-            'structure', 'facility', 'power line', 'electricity', 'water supply'
-        ]
-        infra_score = self._calculate_dimension_score(text_lower, infra_keywords)
+        infra_keywords = self.dimension_keywords["infrastructure_damage"]
+        infra_score = self._calculate_dimension_score(features, infra_keywords)
         
         # ===== Dimension 4: Temporal Urgency =====
-        time_keywords = [
-            'urgent', 'immediate', 'emergency', 'evacuate', 'evacuation',
-            'now', 'critical', 'asap', 'quick', 'rush', 'ongoing',
-            'continue', 'still', 'yet', 'remains', 'persisting'
-        ]
-        time_score = self._calculate_dimension_score(text_lower, time_keywords)
+        time_keywords = self.dimension_keywords["temporal_urgency"]
+        time_score = self._calculate_dimension_score(features, time_keywords)
         
         # Overall severity (weighted average)
         overall = (
@@ -107,27 +185,60 @@ class SeverityEstimator:
             overall = min(0.95, overall + 0.05)
         
         return {
+            "casualties": casualties,
+            "casualty_count": casualty_count,
             "human_impact": round(human_score, 3),
             "geographic_scale": round(geo_score, 3),
             "infrastructure_damage": round(infra_score, 3),
             "temporal_urgency": round(time_score, 3),
             "overall": round(overall, 3),
-            "explanation": self._generate_explanation(human_score, geo_score, infra_score, time_score, casualty_count)
+            "explanation": self._generate_explanation(human_score, geo_score, infra_score, time_score, casualty_count, casualties)
         }
     
-    def _calculate_dimension_score(self, text, keywords):
+    def _extract_casualties(self, features):
+        """
+        Per-category casualty counts from numbers near casualty words
+        
+        One pass tokenizes the numbers (digits, "1,200", "two hundred",
+        "dozens"); each number is then attributed to the nearest casualty
+        word within the context window. Every mention is counted at its
+        own position, so "2 dead in Andheri ... 2 dead in Kurla" adds up to 4.
+        """
+        words = [token.strip(string.punctuation) for token in features.tokens]
+        categories = [self.casualty_categories.get(word) for word in words]
+        window = self.casualty_window
+        
+        found = {category: 0 for category in config.CASUALTY_CONTEXT_WORDS}
+        for start, end, value in _parse_number_mentions(words):
+            if value <= 0:
+                continue
+            
+            best_category, best_distance = None, None
+            for idx in range(max(0, start - window), min(len(words), end + window)):
+                category = categories[idx]
+                if category is None or start <= idx < end:
+                    continue
+                distance = start - idx if idx < start else idx - end + 1
+                if best_distance is None or distance < best_distance:
+                    best_category, best_distance = category, distance
+            
+            if best_category is not None:
+                found[best_category] += value
+        
+        return found
+    
+    def _calculate_dimension_score(self, features, keywords):
         """Calculate score for one dimension (0-1)"""
         # Count matching keywords
-        matches = sum(1 for keyword in keywords if keyword in text)
+        hits = features.keyword_hits
+        matches = sum(1 for keyword in keywords if hits.contains(keyword))
         
         # Base score + bonus for matches
         score = min(0.95, 0.2 + (matches * 0.15))
         
         # Check for numbers (indicating scale)
-        import re
-        numbers = re.findall(r'\b\d+\b', text)
-        if numbers:
-            max_number = max(map(int, numbers))
+        max_number = features.max_number
+        if max_number is not None:
             if max_number > 100:
                 score = min(0.99, score + 0.3)
             elif max_number > 10:
@@ -137,13 +248,19 @@ class SeverityEstimator:
         
         return score
     
-    def _generate_explanation(self, human, geo, infra, time, casualty_count=0):
+    def _generate_explanation(self, human, geo, infra, time, casualty_count=0, casualties=None):
         """Generate human-readable explanation"""
         explanations = []
+        casualties = casualties or {}
         
         # Human impact explanation
         if casualty_count > 0:
-            explanations.append(f"{casualty_count}+ casualties reported")
+            breakdown = ", ".join(
+                f"{casualties[category]} {category}"
+                for category in ("dead", "injured")
+                if casualties.get(category)
+            )
+            explanations.append(f"{casualty_count}+ casualties reported ({breakdown})")
         elif human > 0.7:
             explanations.append("High human impact risk")
         elif human > 0.5:
@@ -151,6 +268,9 @@ class SeverityEstimator:
         elif human > 0.3:
             explanations.append("Potential human impact")
         
+        if casualties.get("missing"):
+            explanations.append(f"{casualties['missing']} missing")
+        
         # Geographic scale
         if geo > 0.7:
             explanations.append("Widespread geographic area")
@@ -6,12 +6,15 @@ from typing import Dict, Any, List, Optional
 
 try:
     from ..utils.config import config
+    from ..utils.logger import logger
+    from ..utils.text_features import TextInput, ensure_features
 except ImportError:
     import sys
     import os
-    import logger
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from utils.config import config
+    from utils.logger import logger
+    from utils.text_features import TextInput, ensure_features
 
 class TypeClassifier:
     """Step 4: Classify type of crisis with improved scoring"""
@@ -48,23 +51,9 @@ class TypeClassifier:
         }
         
         # Non-crisis contexts
-        self.non_crisis_contexts = [
-            "drinking water", "water supply", "water treatment",
-            "normal rainfall", "light rain", "drizzle",
-            "campfire", "fireplace", "fire drill", "fire exercise",
-            "practice drill", "training exercise", "mock drill"
-        ]
-        
-        # Compile keyword patterns
-        self.keyword_patterns: Dict[str, List[tuple]] = {}
-        for crisis_type, keywords in self.type_keywords.items():
-            compiled = []
-            for kw in keywords:
-                pattern = re.compile(rf"\b{re.escape(kw)}\b", re.IGNORECASE)
-                compiled.append((pattern, kw))
-            self.keyword_patterns[crisis_type] = compiled
+        self.non_crisis_contexts = config.NON_CRISIS_CONTEXTS
         
-        # Compile phrase patterns
+        # Compile phrase patterns (keywords themselves go through the shared keyword engine)
         self.regex_patterns: Dict[str, List[re.Pattern]] = {
             "Flood": [
                 re.compile(r"heavy\s+rain", re.IGNORECASE),
@@ -88,17 +77,19 @@ class TypeClassifier:
             ]
         }
     
-    def classify(self, text: str, is_crisis: bool = True) -> Dict[str, Any]:
-        print(f"Classifying crisis type for text: {text[:50]}...")
+    def classify(self, text: TextInput, is_crisis: bool = True) -> Dict[str, Any]:
+        features = ensure_features(text)
+        logger.debug("Classifying crisis type for text: %.50s...", features.text)
         
         if not is_crisis:
             return self._non_crisis_response()
         
-        text_lower = text.lower()
+        text_lower = features.text_lower
+        hits = features.keyword_hits
         
         # Check for non-crisis contexts
         for context in self.non_crisis_contexts:
-            if context in text_lower:
+            if hits.contains(context):
                 return {
                     "primary_type": "Other",
                     "confidence": 0.1,
@@ -110,13 +101,13 @@ class TypeClassifier:
         matched: Dict[str, List[str]] = {}
         
         # Calculate scores
-        for crisis_type, patterns in self.keyword_patterns.items():
+        for crisis_type, keywords in self.type_keywords.items():
             score = 0.0
             found = []
             
             # Keyword matches
-            for pattern, keyword in patterns:
-                if pattern.search(text_lower):
+            for keyword in keywords:
+                if hits.has_word(keyword):
                     if keyword in self.strong_indicators:
                         score += self.strong_indicators[keyword]
                         found.append(f"**{keyword}**")  # Mark strong indicators
@@ -267,7 +258,7 @@ class TypeClassifier:
         
         return base_explanation
     
-    def predict(self, text: str) -> Dict[str, Any]:
+    def predict(self, text: TextInput) -> Dict[str, Any]:
         """
         Alias for classify() to match main_pipeline.py expectations
         Uses the same logic as classify but simplifies output format
@@ -2,51 +2,27 @@
 Urgency Detector - Identifies time-sensitive crises
 """
 
+try:
+    from ..utils.config import config
+    from ..utils.text_features import ensure_features
+except ImportError:
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.config import config
+    from utils.text_features import ensure_features
+
 class UrgencyDetector:
     def __init__(self):
         print("✅ UrgencyDetector initialized")
         
         # Time-sensitive keywords with weights
-        self.urgent_keywords = {
-            # High urgency
-            'immediate': 0.9,
-            'urgent': 0.9,
-            'emergency': 0.8,
-            'evacuate now': 0.9,
-            'critical': 0.8,
-            'asap': 0.85,
-            
-            # Medium urgency  
-            'quick': 0.6,
-            'rush': 0.6,
-            'without delay': 0.7,
-            'right now': 0.7,
-            
-            # Low urgency but time-related
-            'soon': 0.4,
-            'pending': 0.3,
-            'monitor': 0.2,
-
-                # Add rescue/response keywords
-            'rescue': 0.7,
-            'search and rescue': 0.85,
-            'recover bodies': 0.8,
-            'trapped': 0.75,
-            'missing': 0.6,
-            'rescuers': 0.7,
-            'emergency response': 0.8,
-            'rescue operations': 0.8,
-            'evacuation': 0.7,
-            
-            # Time indicators
-            'still missing': 0.65,
-            'ongoing': 0.5,
-            'continue to': 0.4,
-        }
+        self.urgent_keywords = config.URGENCY_KEYWORDS
+        self.time_words = config.TIME_INDICATOR_WORDS
     
     def detect(self, text):
         """
-        Detect urgency level in text
+        Detect urgency level in text (raw text or TextFeatures)
         
         Returns:
             {
@@ -57,14 +33,14 @@ class UrgencyDetector:
                 "explanation": str
             }
         """
-        text_lower = text.lower()
+        hits = ensure_features(text).keyword_hits
         
         # Find matching keywords
         found_keywords = []
         total_weight = 0
         
         for keyword, weight in self.urgent_keywords.items():
-            if keyword in text_lower:
+            if hits.contains(keyword):
                 found_keywords.append(keyword)
                 total_weight += weight
         
@@ -98,7 +74,7 @@ class UrgencyDetector:
             explanation = "Low urgency - routine monitoring"
         
         # Check for time indicators
-        time_indicators = self._check_time_indicators(text_lower)
+        time_indicators = self._check_time_indicators(hits)
         if time_indicators:
             explanation += f" | Time indicators: {time_indicators}"
         
@@ -111,16 +87,11 @@ class UrgencyDetector:
             "time_indicators": time_indicators
         }
     
-    def _check_time_indicators(self, text):
+    def _check_time_indicators(self, hits):
         """Check for specific time references"""
-        time_words = [
-            'minutes', 'hours', 'today', 'tonight', 'now', 
-            'immediately', 'within', 'by', 'before', 'after'
-        ]
-        
         found = []
-        for word in time_words:
-            if word in text:
+        for word in self.time_words:
+            if hits.contains(word):
                 found.append(word)
         
         return found if found else None
\ No newline at end of file
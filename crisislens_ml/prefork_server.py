@@ -0,0 +1,199 @@
+"""
+Pre-fork server - N uvicorn workers sharing one copy of the model weights
+
+The parent loads the pipeline (DistilBERT weights included) once, freezes the
+garbage collector so collections do not dirty the inherited pages, and forks
+workers that accept on one shared listening socket; the kernel spreads
+connections across them. Weight pages stay shared copy-on-write, so each
+extra worker costs its Python heap, not another model.
+
+The parent restarts workers that exit or stop heartbeating. Per-worker health
+lives in shared memory and is served by every worker at /workers.
+
+Usage:
+    python prefork_server.py --workers 4 --port 8000
+"""
+import argparse
+import asyncio
+import gc
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+from main import app
+from main_pipeline import config, get_pipeline
+from utils.worker_health import WorkerHealthTable
+
+_table: WorkerHealthTable = None
+_worker_slot = None
+
+
+#Per-worker request counters (no-op outside pre-fork mode)
+@app.middleware("http")
+async def track_worker_requests(request, call_next):
+    if _worker_slot is None:
+        return await call_next(request)
+
+    _table.incr(_worker_slot, "requests")
+    _table.incr(_worker_slot, "in_flight")
+    try:
+        response = await call_next(request)
+    except Exception:
+        _table.incr(_worker_slot, "errors")
+        raise
+    finally:
+        _table.incr(_worker_slot, "in_flight", -1)
+    if response.status_code >= 500:
+        _table.incr(_worker_slot, "errors")
+    return response
+
+
+#Health of every pre-fork worker, from shared memory
+@app.get('/workers')
+def workers_status():
+    if _table is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "served_by": _worker_slot,
+        "workers": _table.snapshot(config.PREFORK_HEARTBEAT_TIMEOUT_SECONDS)
+    }
+
+
+async def _heartbeat():
+    # Runs on the worker's event loop, so a blocked loop stops the heartbeat
+    while True:
+        _table.set(_worker_slot, "heartbeat_at", time.time())
+        await asyncio.sleep(config.PREFORK_HEARTBEAT_SECONDS)
+
+
+def _start_heartbeat():
+    if _worker_slot is not None:
+        asyncio.get_running_loop().create_task(_heartbeat())
+
+app.add_event_handler("startup", _start_heartbeat)
+
+
+def _limit_torch_threads(num_threads: int):
+    """Keep N workers x intra-op threads from oversubscribing the cores"""
+    if num_threads <= 0:
+        return
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+
+def _run_worker(slot: int, sock: socket.socket, host: str, port: int):
+    global _worker_slot
+    _worker_slot = slot
+    gc.enable()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    _table.reset_slot(slot, os.getpid())
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    server.run(sockets=[sock])
+
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = 0):
+    """Load the pipeline once, then fork and supervise the workers"""
+    global _table
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Pre-fork mode needs os.fork (Linux/macOS)")
+    workers = workers or config.PREFORK_WORKERS or os.cpu_count() or 1
+
+    # Objects created from here on are shared with every worker
+    gc.disable()
+    # Set before the warmup pass so no intra-op thread pool exists at fork time
+    _limit_torch_threads(config.PREFORK_TORCH_THREADS)
+    print("⏳ Loading pipeline in the parent process...")
+    get_pipeline().warm_up()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(config.PREFORK_BACKLOG)
+    sock.set_inheritable(True)
+
+    _table = WorkerHealthTable(workers)
+    gc.freeze()
+
+    children = {}  # pid -> slot
+    shutting_down = False
+
+    def spawn(slot: int):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                _run_worker(slot, sock, host, port)
+            except BaseException as e:
+                print(f"❌ Worker {slot} crashed: {e}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        # The worker resets its own counters; this just starts the heartbeat clock
+        _table.set(slot, "pid", pid)
+        _table.set(slot, "heartbeat_at", time.time())
+        children[pid] = slot
+
+    def shutdown(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for slot in range(workers):
+        spawn(slot)
+    print(f"✅ Serving on http://{host}:{port} with {workers} pre-forked workers")
+
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+
+        if pid == 0:
+            # Kill hung workers; the waitpid branch below restarts them
+            if not shutting_down:
+                for child_pid, slot in list(children.items()):
+                    if _table.heartbeat_age(slot) > config.PREFORK_HEARTBEAT_TIMEOUT_SECONDS:
+                        print(f"⚠️  Worker {slot} (pid {child_pid}) missed its heartbeat, killing")
+                        try:
+                            os.kill(child_pid, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+            time.sleep(0.5)
+            continue
+
+        slot = children.pop(pid, None)
+        if slot is not None and not shutting_down:
+            print(f"⚠️  Worker {slot} (pid {pid}) exited with status {status}, restarting")
+            _table.incr(slot, "restarts")
+            spawn(slot)
+
+    sock.close()
+    print("👋 All workers stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-fork CrisisLens ML server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Number of worker processes (default: config.PREFORK_WORKERS or CPU count)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
@@ -3,28 +3,49 @@ Explanation Generator - Creates human-readable crisis explanations
 Uses Gemini API for dynamic explanations
 """
 
+import hashlib
 import json
+import threading
 from typing import Dict, Any, Optional
 import random
 
 try:
-    from ..utils.gemini_client import get_gemini_client, GeminiClient
-    HAS_GEMINI = True
+    from ..utils.config import config
+    from ..utils.cache_manager import LRUCache
+    from ..utils.logger import logger
+except ImportError:
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.config import config
+    from utils.cache_manager import LRUCache
+    from utils.logger import logger
+
+try:
+    from ..utils.gemini_client import get_gemini_client, GeminiClient, AsyncGeminiClient, genai
+    HAS_GEMINI = genai is not None
 except ImportError:
     HAS_GEMINI = False
+if not HAS_GEMINI:
     print("⚠️  Gemini client not available, using rule-based explanations")
 
 class ExplanationGenerator:
     """Generates explanations for crisis analysis results"""
     
-    def __init__(self, use_gemini: bool = True):
+    # Bump when the Gemini prompt changes so cached explanations are not reused
+    PROMPT_VERSION = "1"
+    
+    def __init__(self, use_gemini: bool = True, async_client=None):
         """
         Initialize explanation generator
         
         Args:
             use_gemini: Whether to use Gemini API or rule-based
+            async_client: AsyncGeminiClient used by agenerate (built lazily if None)
         """
         self.use_gemini = use_gemini and HAS_GEMINI
+        self.async_client = async_client
+        self._async_client_lock = threading.Lock()
         
         if self.use_gemini:
             try:
@@ -36,11 +57,20 @@ class ExplanationGenerator:
         
         if not self.use_gemini:
             print("✅ ExplanationGenerator using rule-based explanations")
+        
+        # Gemini explanations reused for repeated situations
+        self.explanation_cache = LRUCache(
+            max_entries=config.EXPLANATION_CACHE_MAX_ENTRIES,
+            ttl_seconds=config.EXPLANATION_CACHE_TTL_SECONDS
+        ) if config.ENABLE_EXPLANATION_CACHE else None
+        self._stats_lock = threading.Lock()
+        self.api_calls_made = 0
+        self.api_calls_saved = 0
     
     def generate(self, crisis_type: str, severity: Dict[str, float], 
                 urgency: Dict[str, Any], info_gaps: Dict[str, Any],
                 priority_score: float, text_snippet: str, 
-                location: str = "") -> Dict[str, Any]:
+                location: str = "", use_gemini: Optional[bool] = None) -> Dict[str, Any]:
         """
         Generate explanation for crisis analysis
         
@@ -52,11 +82,12 @@ class ExplanationGenerator:
             priority_score: Overall priority score (0-1)
             text_snippet: Original text snippet for context
             location: Location of crisis
+            use_gemini: Override for this call (False forces rule-based)
             
         Returns:
             Dictionary with explanation and method
         """
-        if self.use_gemini:
+        if self.use_gemini and use_gemini is not False:
             return self._generate_with_gemini(
                 crisis_type, severity, urgency, info_gaps,
                 priority_score, text_snippet, location
@@ -67,13 +98,96 @@ class ExplanationGenerator:
                 priority_score, text_snippet, location
             )
     
+    async def agenerate(self, crisis_type: str, severity: Dict[str, float],
+                        urgency: Dict[str, Any], info_gaps: Dict[str, Any],
+                        priority_score: float, text_snippet: str,
+                        location: str = "") -> Dict[str, Any]:
+        """
+        Async version of generate - awaits Gemini without blocking the event loop
+        
+        Falls back to the rule-based explanation when Gemini is unavailable,
+        times out, errors or its circuit breaker is open.
+        """
+        client = self._get_async_client()
+        if client is None:
+            return self._generate_rule_based(
+                crisis_type, severity, urgency, info_gaps,
+                priority_score, text_snippet, location
+            )
+        
+        cache_key = self._explanation_cache_key(crisis_type, severity, urgency,
+                                                priority_score, location)
+        cached = self._get_cached_explanation(cache_key)
+        if cached is not None:
+            return cached
+        
+        logger.debug("Calling Gemini API (async)")
+        with self._stats_lock:
+            self.api_calls_made += 1
+        prompt = self._build_prompt(crisis_type, severity, urgency,
+                                    priority_score, text_snippet, location)
+        result = await client.generate_content(prompt)
+        return self._handle_gemini_result(
+            result, cache_key, crisis_type, severity, urgency, info_gaps,
+            priority_score, text_snippet, location
+        )
+    
+    def _get_async_client(self):
+        """Injected async client, or one wrapping the sync Gemini client"""
+        if self.async_client is None and self.use_gemini:
+            with self._async_client_lock:
+                if self.async_client is None:
+                    self.async_client = AsyncGeminiClient(self.gemini_client)
+        return self.async_client
+    
     def _generate_with_gemini(self, crisis_type: str, severity: Dict[str, float],
                              urgency: Dict[str, Any], info_gaps: Dict[str, Any],
                              priority_score: float, text_snippet: str,
                              location: str) -> Dict[str, Any]:
         """Generate explanation using Gemini API"""
-        print("   🤖 Calling Gemini API...")
+        cache_key = self._explanation_cache_key(crisis_type, severity, urgency,
+                                                priority_score, location)
+        cached = self._get_cached_explanation(cache_key)
+        if cached is not None:
+            return cached
+        
+        logger.debug("Calling Gemini API")
+        with self._stats_lock:
+            self.api_calls_made += 1
+        prompt = self._build_prompt(crisis_type, severity, urgency,
+                                    priority_score, text_snippet, location)
         
+        try:
+            # Call Gemini API
+            result = self.gemini_client.generate_content(prompt)
+        except Exception as e:
+            logger.warning(f"Gemini API error, using rule-based explanation: {e}")
+            # Fallback to rule-based
+            return self._generate_rule_based(
+                crisis_type, severity, urgency, info_gaps,
+                priority_score, text_snippet, location
+            )
+        
+        return self._handle_gemini_result(
+            result, cache_key, crisis_type, severity, urgency, info_gaps,
+            priority_score, text_snippet, location
+        )
+    
+    def _get_cached_explanation(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if cache_key is None:
+            return None
+        cached = self.explanation_cache.get(cache_key)
+        if cached is None:
+            return None
+        with self._stats_lock:
+            self.api_calls_saved += 1
+        logger.debug("Reusing cached Gemini explanation")
+        return {**cached, "cached": True}
+    
+    def _build_prompt(self, crisis_type: str, severity: Dict[str, float],
+                      urgency: Dict[str, Any], priority_score: float,
+                      text_snippet: str, location: str) -> str:
+        """Gemini prompt for one analysis (bump PROMPT_VERSION when editing)"""
         # Get priority level
         priority_level = self._get_priority_level(priority_score)
         
@@ -131,39 +245,38 @@ class ExplanationGenerator:
         7. DO NOT mention that you're an AI or mention this prompt
         8. Base recommendations on the actual priority level: {priority_level}
         """
-        
-        try:
-            # Call Gemini API
-            result = self.gemini_client.generate_content(prompt)
-            
-            if result["success"]:
-                explanation = result["text"].strip()
-                
-                # Clean up any unwanted formatting
-                explanation = explanation.replace("```", "")
-                explanation = explanation.replace("**", "")
-                
-                return {
-                    "explanation": explanation,
-                    "method": "gemini_api",
-                    "model": result.get("model", "unknown"),
-                    "success": True
-                }
-            else:
-                print(f"   ⚠️  Gemini API failed: {result.get('error')}")
-                # Fallback to rule-based
-                return self._generate_rule_based(
-                    crisis_type, severity, urgency, info_gaps,
-                    priority_score, text_snippet, location
-                )
-                
-        except Exception as e:
-            print(f"   ⚠️  Gemini API error: {e}")
+        return prompt
+    
+    def _handle_gemini_result(self, result: Dict[str, Any], cache_key: Optional[str],
+                              crisis_type: str, severity: Dict[str, float],
+                              urgency: Dict[str, Any], info_gaps: Dict[str, Any],
+                              priority_score: float, text_snippet: str,
+                              location: str) -> Dict[str, Any]:
+        """Clean up a Gemini response, or fall back to rule-based on failure"""
+        if not result.get("success") or not result.get("text"):
+            logger.warning("Gemini API failed, using rule-based explanation: %s",
+                           result.get("error", "empty response"))
             # Fallback to rule-based
             return self._generate_rule_based(
                 crisis_type, severity, urgency, info_gaps,
                 priority_score, text_snippet, location
             )
+        
+        explanation = result["text"].strip()
+        
+        # Clean up any unwanted formatting
+        explanation = explanation.replace("```", "")
+        explanation = explanation.replace("**", "")
+        
+        generated = {
+            "explanation": explanation,
+            "method": "gemini_api",
+            "model": result.get("model", "unknown"),
+            "success": True
+        }
+        if cache_key is not None:
+            self.explanation_cache.set(cache_key, generated)
+        return generated
     
     def _generate_rule_based(self, crisis_type: str, severity: Dict[str, float],
                             urgency: Dict[str, Any], info_gaps: Dict[str, Any],
@@ -352,6 +465,45 @@ class ExplanationGenerator:
             "success": True
         }
     
+    def _explanation_cache_key(self, crisis_type: str, severity: Dict[str, float],
+                               urgency: Dict[str, Any], priority_score: float,
+                               location: str) -> Optional[str]:
+        """
+        Fingerprint of the prompt inputs that shape the explanation
+        
+        Float scores are bucketed (EXPLANATION_CACHE_SCORE_BUCKET) so nearly
+        identical situations share an entry; the report snippet is left out.
+        """
+        if self.explanation_cache is None:
+            return None
+        
+        bucket = config.EXPLANATION_CACHE_SCORE_BUCKET
+        overall = float(severity.get("overall", 0) or 0)
+        fingerprint = {
+            "prompt_version": self.PROMPT_VERSION,
+            "crisis_type": crisis_type,
+            "severity_bucket": int(round(overall / bucket)) if bucket > 0 else round(overall, 3),
+            "urgency_level": str(urgency.get("urgency_level", "unknown")).lower(),
+            "priority_level": self._get_priority_level(priority_score),
+            "location": " ".join(str(location or "").lower().split())
+        }
+        encoded = json.dumps(fingerprint, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Explanation cache counters, including Gemini calls saved"""
+        with self._stats_lock:
+            stats = {
+                "enabled": self.explanation_cache is not None,
+                "api_calls_made": self.api_calls_made,
+                "api_calls_saved": self.api_calls_saved
+            }
+        if self.explanation_cache is not None:
+            stats.update(self.explanation_cache.get_stats())
+        if self.async_client is not None:
+            stats["async_client"] = self.async_client.get_stats()
+        return stats
+    
     def _get_priority_level(self, score: float) -> str:
         """Convert score to priority level"""
         if score >= 0.9:
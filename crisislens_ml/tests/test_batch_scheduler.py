@@ -0,0 +1,82 @@
+#Test script for the micro-batching scheduler
+
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.batch_scheduler import MicroBatchScheduler
+
+
+def test_concurrent_requests_are_grouped_and_fanned_back():
+    batches = []
+
+    def process_batch(payloads):
+        batches.append(list(payloads))
+        return [payload.upper() for payload in payloads]
+
+    scheduler = MicroBatchScheduler(
+        process_batch,
+        length_fn=lambda payload: len(payload.split()),
+        max_batch_size=8,
+        max_wait_ms=200
+    ).start()
+
+    payloads = [f"report {'word ' * i}{i}" for i in range(8)]
+    results = {}
+
+    def call(payload):
+        results[payload] = scheduler.process(payload, timeout=5)
+
+    threads = [threading.Thread(target=call, args=(p,)) for p in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    scheduler.stop(timeout=5)
+
+    assert results == {payload: payload.upper() for payload in payloads}
+    assert sum(len(batch) for batch in batches) == len(payloads)
+    assert len(batches) < len(payloads)  # at least some requests shared a batch
+
+    metrics = scheduler.get_metrics()
+    assert metrics["items_processed"] == len(payloads)
+    assert metrics["queue_depth"] == 0
+
+
+def test_batches_are_split_into_length_buckets():
+    buckets_seen = []
+
+    def process_batch(payloads):
+        buckets_seen.append([len(p) for p in payloads])
+        return payloads
+
+    scheduler = MicroBatchScheduler(
+        process_batch,
+        length_fn=len,
+        max_batch_size=4,
+        max_wait_ms=10_000,
+        bucket_boundaries=[5]
+    ).start()
+
+    futures = [scheduler.submit(p) for p in ["aaaaaaaa", "a", "aaaaaaa", "aa"]]
+    assert [f.result(timeout=5) for f in futures] == ["aaaaaaaa", "a", "aaaaaaa", "aa"]
+    scheduler.stop(timeout=5)
+
+    assert buckets_seen == [[1, 2], [7, 8]]
+
+
+def test_errors_propagate_to_callers():
+    def process_batch(payloads):
+        raise ValueError("model exploded")
+
+    scheduler = MicroBatchScheduler(process_batch, max_wait_ms=0).start()
+    future = scheduler.submit("text")
+    try:
+        future.result(timeout=5)
+        assert False, "expected the batch error to propagate"
+    except ValueError as e:
+        assert "model exploded" in str(e)
+    finally:
+        scheduler.stop(timeout=5)
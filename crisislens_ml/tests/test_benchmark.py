@@ -0,0 +1,29 @@
+#Test script for the pipeline benchmark harness
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.pipeline_benchmark import LENGTH_CLASSES, corpus_digest, make_corpus, run_benchmark
+
+
+def test_corpus_is_deterministic_per_seed():
+    assert corpus_digest(make_corpus(30, seed=7)) == corpus_digest(make_corpus(30, seed=7))
+    assert corpus_digest(make_corpus(30, seed=7)) != corpus_digest(make_corpus(30, seed=8))
+
+
+def test_reports_reach_their_length_class():
+    for item in make_corpus(40):
+        target = LENGTH_CLASSES[item["length_class"]]
+        assert target <= len(item["text"]) < target + 200
+
+
+def test_report_has_percentiles_per_stage_and_length():
+    report = run_benchmark(reports=12, stages=["type_classifier.classify", "pipeline.analyze"])
+    assert set(report["stages"]) == {"type_classifier.classify", "pipeline.analyze"}
+    analyze = report["stages"]["pipeline.analyze"]
+    assert analyze["count"] == 12
+    assert analyze["p50_ms"] <= analyze["p95_ms"] <= analyze["p99_ms"]
+    assert sum(row["count"] for row in analyze["by_length"].values()) == 12
+    assert report["meta"]["corpus"]["sha256"] == corpus_digest(make_corpus(12))
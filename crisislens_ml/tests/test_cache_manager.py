@@ -0,0 +1,110 @@
+#Test script for the analysis result cache
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache_manager import DiskCache, LRUCache, TieredCache, make_cache_key
+from utils.config import MLConfig
+
+
+def test_lru_eviction_and_counters():
+    cache = LRUCache(max_entries=2, ttl_seconds=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1      # "a" is now most recently used
+    cache.set("c", 3)               # evicts "b"
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+
+def test_entries_expire_after_ttl():
+    cache = LRUCache(max_entries=4, ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_cache_key_normalizes_whitespace_and_tracks_config():
+    cfg = MLConfig()
+    version = cfg.fingerprint()
+    key = make_cache_key("Flood in  Chennai\n", "IMD", "Chennai", version)
+    assert key == make_cache_key(" Flood in Chennai", "IMD", "Chennai", version)
+    assert key != make_cache_key("Flood in Chennai", "SACHET", "Chennai", version)
+
+    cfg.WEIGHTS = {**cfg.WEIGHTS, "severity": 0.5}
+    assert cfg.fingerprint() != version
+    version = cfg.fingerprint()
+    cfg.CRISIS_KEYWORDS.append("tsunami")
+    cfg.mark_changed()
+    assert cfg.fingerprint() != version
+    assert make_cache_key("Flood in Chennai", "IMD", "Chennai", cfg.fingerprint()) != key
+
+
+def test_fingerprint_covers_scoring_settings_only():
+    from dataclasses import fields
+    from utils.config import FINGERPRINT_FIELDS
+
+    cfg = MLConfig()
+    assert set(FINGERPRINT_FIELDS) <= {f.name for f in fields(cfg)}
+    version = cfg.fingerprint()
+    cfg.LOG_LEVEL = "DEBUG"
+    cfg.SERVING_MODE = "async"
+    cfg.GEMINI_API_KEY = "secret"
+    assert cfg.fingerprint() == version
+    cfg.CASCADE_UPPER_BOUND = 0.8
+    assert cfg.fingerprint() != version
+
+
+def test_disk_cache_survives_reopen_and_compacts(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+
+    disk = DiskCache(path, pipeline_version="1.0", max_entries=10)
+    for i in range(12):
+        disk.set(f"key-{i}", {"is_crisis": True, "score": i})
+    assert len(disk) <= 10
+    assert disk.get("key-11") == {"is_crisis": True, "score": 11}
+    disk.close()
+
+    # A restarted service sees the same rows
+    reopened = DiskCache(path, pipeline_version="1.0", max_entries=10)
+    assert reopened.get("key-11") == {"is_crisis": True, "score": 11}
+    tiered = TieredCache(LRUCache(max_entries=4), reopened)
+    assert tiered.get("key-11")["score"] == 11
+    assert "key-11" in tiered.memory
+    reopened.close()
+
+    # Rows from another pipeline version are purged
+    upgraded = DiskCache(path, pipeline_version="2.0", max_entries=10)
+    assert len(upgraded) == 0
+    upgraded.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_workers_open_their_own_disk_connection(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    disk = DiskCache(path, pipeline_version="1.0")
+    disk.set("parent", {"score": 1})
+    parent_conn = disk._connection()
+
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            ok = (disk.get("parent") == {"score": 1} and disk._connection() is not parent_conn)
+            disk.set("child", {"score": 2})
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert disk._connection() is parent_conn
+    assert disk.get("child") == {"score": 2}
+    disk.close()
@@ -77,6 +77,131 @@ def test_crisis_detector():
         traceback.print_exc()
         return False
 
+def test_predict_batch_matches_predict():
+    """predict_batch must return the same per-text results as predict"""
+    detector = CrisisDetector()
+
+    texts = [
+        "Severe flooding in Chennai, homes submerged and people trapped",
+        "Nice weather in Marina Beach today for a family picnic outing",
+        "Fire at T Nagar market",
+        "Earthquake of magnitude 6.1 shakes the region, buildings collapsed",
+    ]
+
+    batch_results = detector.predict_batch(texts, batch_size=2)
+    single_results = [detector.predict(text) for text in texts]
+
+    assert len(batch_results) == len(texts)
+    for batch_result, single_result in zip(batch_results, single_results):
+        assert batch_result["is_crisis"] == single_result["is_crisis"]
+        assert abs(batch_result["confidence"] - single_result["confidence"]) < 1e-4
+        assert batch_result.get("method") == single_result.get("method")
+
+    assert detector.predict_batch([]) == []
+
+def test_cascade_skips_transformer_for_decisive_keyword_scores():
+    """Texts outside the uncertainty band never reach the model"""
+    from utils.config import config
+
+    detector = CrisisDetector()
+    model_loads = []
+    detector._load_model = lambda: model_loads.append(1) and False
+
+    decisive = [
+        "Severe flooding in Chennai, people trapped and dead, urgent rescue needed",
+        "Routine maintenance drill and training workshop scheduled for Monday",
+    ]
+    for text in decisive:
+        result = detector.predict(text)
+        assert result["method"] == "keyword_cascade"
+        # The neural score cannot flip a decision made outside the band
+        for crisis_prob in (0.0, 1.0):
+            assert detector._hybrid_result(text, crisis_prob)["is_crisis"] == result["is_crisis"]
+        # Confidence is the hybrid score at the bound least favourable to the decision
+        bound = 0.0 if result["is_crisis"] else 1.0
+        assert result["score_breakdown"]["neural_bound"] == bound
+        assert result["confidence"] == detector._hybrid_result(text, bound)["confidence"]
+        assert (result["confidence"] >= config.CRISIS_DETECTION_THRESHOLD) == result["is_crisis"]
+    assert [r["cascade_tier"] for r in detector.predict_batch(decisive)] == ["keyword_crisis", "keyword_non_crisis"]
+    assert model_loads == []
+
+    detector.predict("Residents gathered near the river this morning")
+    assert model_loads == [1]
+
+    stats = detector.get_cascade_stats()
+    assert stats["keyword_crisis"] == 2 and stats["keyword_non_crisis"] == 2
+    assert stats["keyword_only"] == 1 and stats["neural"] == 0
+
+def test_cascade_returns_invalid_text_unchanged():
+    """Empty or too-short texts keep the invalid-text response and no cascade tier"""
+    detector = CrisisDetector()
+    detector._load_model = lambda: False
+
+    for text in ("", "hi", "ok ok"):
+        assert detector.predict(text) == detector._invalid_text_response(text)
+    assert detector.predict_batch(["hi", ""]) == [detector._invalid_text_response("")] * 2
+    assert detector.get_cascade_stats()["total"] == 0
+
+class WordTokenizer:
+    """One token per word; id 1 marks "flood". Mimics HF overflow/stride output"""
+
+    def __call__(self, texts, truncation=True, max_length=4, stride=0,
+                 return_overflowing_tokens=False, **kwargs):
+        rows, mapping = [], []
+        for owner, text in enumerate(texts):
+            ids = [1 if word == "flood" else 0 for word in text.split()]
+            starts = [0]
+            if return_overflowing_tokens:
+                starts = range(0, max(1, len(ids) - stride), max_length - stride)
+            for start in starts:
+                rows.append(ids[start:start + max_length])
+                mapping.append(owner)
+        encodings = {"input_ids": rows}
+        if return_overflowing_tokens:
+            encodings["overflow_to_sample_mapping"] = mapping
+        return encodings
+
+    def pad(self, features, **kwargs):
+        return features
+
+
+class FloodBackend:
+    return_tensors = "np"
+
+    def __init__(self):
+        self.windows_seen = 0
+
+    def predict_proba(self, inputs):
+        self.windows_seen += len(inputs["input_ids"])
+        return [[0.9, 0.1] if 1 in ids else [0.1, 0.9] for ids in inputs["input_ids"]]
+
+
+def test_long_documents_are_scored_over_capped_windows(monkeypatch):
+    from utils.config import config
+
+    detector = CrisisDetector()
+    detector.tokenizer, detector.backend, detector.model = WordTokenizer(), FloodBackend(), object()
+    detector.max_length = 4
+    monkeypatch.setattr(config, "LONG_DOC_WINDOW_STRIDE", 1)
+    monkeypatch.setattr(config, "ENABLE_DETECTION_CASCADE", False)
+    # 30 words: the only crisis token is in the last window
+    text = " ".join(["residents"] * 29 + ["flood"])
+
+    def neural_score(mode, max_windows=8):
+        monkeypatch.setattr(config, "LONG_DOCUMENT_MODE", mode)
+        monkeypatch.setattr(config, "LONG_DOC_MAX_WINDOWS", max_windows)
+        return detector.predict(text)["score_breakdown"]["neural_network"]
+
+    assert neural_score("first") == 0.1
+    assert neural_score("max") == 0.9
+    detector.backend.windows_seen = 0
+    assert neural_score("max", max_windows=3) == 0.9   # first and last window are always kept
+    assert detector.backend.windows_seen == 3
+    attention = neural_score("attention")
+    mean = neural_score("mean")
+    assert 0.1 < mean < attention < 0.9
+    assert [r["score_breakdown"]["neural_network"] for r in detector.predict_batch([text, "flood " * 5])] == [mean, 0.9]
+
 # ====== MAIN ======
 if __name__ == "__main__":
     success = test_crisis_detector()
@@ -0,0 +1,56 @@
+#Test script for the Gemini explanation cache
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoring.explanation_generator import ExplanationGenerator
+
+
+class StubGeminiClient:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        return {"success": True, "text": f"**Assessment {self.calls}**", "model": "stub"}
+
+
+def make_generator():
+    generator = ExplanationGenerator(use_gemini=False)
+    generator.use_gemini = True
+    generator.gemini_client = StubGeminiClient()
+    return generator
+
+
+def explain(generator, overall, location="Chennai", snippet="Flood in Chennai"):
+    return generator.generate(
+        "Flood", {"overall": overall}, {"urgency_level": "high"}, {},
+        0.72, snippet, location
+    )
+
+
+def test_similar_situations_reuse_one_gemini_call():
+    generator = make_generator()
+
+    first = explain(generator, 0.81)
+    second = explain(generator, 0.79, location=" chennai ", snippet="Another report")
+    assert generator.gemini_client.calls == 1
+    assert second["explanation"] == first["explanation"] == "Assessment 1"
+    assert second["cached"] and "cached" not in first
+
+    explain(generator, 0.55)                     # different severity bucket
+    explain(generator, 0.81, location="Mumbai")  # different location
+    assert generator.gemini_client.calls == 3
+
+    stats = generator.get_cache_stats()
+    assert (stats["api_calls_made"], stats["api_calls_saved"]) == (3, 1)
+
+
+def test_failed_calls_are_not_cached():
+    generator = make_generator()
+    generator.gemini_client.generate_content = lambda prompt: {"success": False, "error": "quota"}
+
+    assert explain(generator, 0.8)["method"] == "rule_based_dynamic"
+    assert len(generator.explanation_cache) == 0
@@ -0,0 +1,201 @@
+#Test script for deferred (background) explanations
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from utils.explanation_jobs import ExplanationJobManager, check_callback_url
+from main_pipeline import CrisisPipeline
+
+
+def wait_for(manager, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in (ExplanationJobManager.COMPLETED, ExplanationJobManager.FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_jobs_complete_and_post_to_callback():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append(json.loads(body))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        manager = ExplanationJobManager(lambda **kwargs: {"content": kwargs["text"].upper()},
+                                        callback_allowed_hosts=["127.0.0.1"])
+        url = f"http://127.0.0.1:{server.server_port}/done"
+        job_id = manager.submit({"text": "flood"}, callback_url=url)
+
+        job = wait_for(manager, job_id)
+        assert job["explanation"] == {"content": "FLOOD"}
+        deadline = time.monotonic() + 5
+        while not received and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert received[0]["job_id"] == job_id
+        assert received[0]["status"] == ExplanationJobManager.COMPLETED
+    finally:
+        server.shutdown()
+
+    failing = ExplanationJobManager(lambda **kwargs: 1 / 0)
+    assert wait_for(failing, failing.submit({}))["status"] == ExplanationJobManager.FAILED
+
+
+def test_callbacks_to_internal_addresses_are_refused():
+    manager = ExplanationJobManager(lambda **kwargs: {"content": "x"})
+    for url in ("http://127.0.0.1:8000/done", "http://localhost/done", "http://10.0.0.5/done",
+                "http://169.254.169.254/latest/meta-data", "http://[::1]/done", "file:///etc/passwd"):
+        with pytest.raises(ValueError):
+            manager.submit({}, callback_url=url)
+    assert manager.get_stats()["submitted"] == 0
+
+    check_callback_url("https://93.184.216.34/hook")
+    with pytest.raises(ValueError):
+        check_callback_url("https://93.184.216.34/hook", allowed_hosts=["hooks.example.org"])
+
+
+def test_finished_jobs_expire_in_completion_order():
+    release = {"slow": threading.Event(), "fast": threading.Event()}
+    manager = ExplanationJobManager(lambda name: release[name].wait(5) and {"content": name},
+                                    result_ttl_seconds=0.05, max_jobs=3)
+    slow = manager.submit({"name": "slow"})
+    fast = manager.submit({"name": "fast"})
+    release["fast"].set()
+    wait_for(manager, fast)
+    assert manager.get_stats()["pending"] == 1
+
+    time.sleep(0.06)
+    manager.submit({"name": "fast"})
+    # The expired job went; the older but still running one is kept
+    assert manager.get(fast) is None
+    assert manager.get(slow)["status"] == ExplanationJobManager.RUNNING
+
+    release["slow"].set()
+    wait_for(manager, slow)
+    manager.result_ttl_seconds = 60.0
+    manager.submit({"name": "fast"})
+    manager.submit({"name": "fast"})
+    # Over max_jobs the oldest submitted job is dropped first
+    assert manager.get(slow) is None
+    assert manager.get_stats()["jobs_stored"] == 3
+
+
+class SlowGeminiClient:
+    model_name = "stub"
+
+    def generate_content(self, prompt):
+        time.sleep(0.2)
+        return {"success": True, "text": "Gemini assessment", "model": self.model_name}
+
+
+def test_deferred_analysis_returns_rule_based_and_patches_cache():
+    pipeline = CrisisPipeline()
+    pipeline.explanation_generator.use_gemini = True
+    pipeline.explanation_generator.gemini_client = SlowGeminiClient()
+    text = "Flood in Chennai, 12 people dead and hundreds trapped, urgent rescue needed"
+
+    start = time.perf_counter()
+    result = pipeline.analyze(text, source="test", location="Chennai", defer_explanation=True)
+    assert time.perf_counter() - start < 0.2
+    assert result["explanation"]["method"] == "rule_based_dynamic"
+    assert result["explanation"]["status"] == ExplanationJobManager.PENDING
+
+    job = wait_for(pipeline.explanation_jobs, result["explanation_job_id"])
+    assert job["explanation"]["content"] == "Gemini assessment"
+
+    cached = pipeline.analyze(text, source="test", location="Chennai", defer_explanation=True)
+    assert cached["metadata"]["cache_hit"]
+    assert cached["explanation"]["method"] == "gemini_api"
+    assert cached["explanation"]["status"] == ExplanationJobManager.COMPLETED
+
+
+def test_unusable_callbacks_are_rejected_before_scoring():
+    pipeline = CrisisPipeline()
+    text = "Flood in Chennai, 12 people dead and hundreds trapped, urgent rescue needed"
+
+    # Gemini off: nothing is deferred, so the callback could never fire
+    with pytest.raises(ValueError):
+        pipeline.analyze(text, source="test", callback_url="https://93.184.216.34/hook")
+
+    pipeline.explanation_generator.use_gemini = True
+    pipeline.explanation_generator.gemini_client = SlowGeminiClient()
+    with pytest.raises(ValueError):
+        pipeline.analyze(text, source="test", defer_explanation=True,
+                         callback_url="http://127.0.0.1:9/hook")
+    assert pipeline.crisis_detector.get_cascade_stats()["total"] == 0
+    assert pipeline.explanation_jobs.get_stats()["submitted"] == 0
+
+    results = dict(pipeline.iter_analyze_batch(
+        [text, text], sources=["test", "test"], defer_explanations=[True, False],
+        callback_urls=["http://127.0.0.1:9/hook", None]
+    ))
+    assert "non-public" in results[0]["error"]
+    assert results[1]["is_crisis"]
+
+
+def test_async_deferral_runs_off_the_event_loop():
+    pipeline = CrisisPipeline()
+    pipeline.result_cache = None
+    pipeline.explanation_generator.use_gemini = True
+    pipeline.explanation_generator.gemini_client = SlowGeminiClient()
+    submit = pipeline.explanation_jobs.submit
+    threads = []
+
+    def recording_submit(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return submit(*args, **kwargs)
+
+    pipeline.explanation_jobs.submit = recording_submit
+    text = "Flood in Chennai, 12 people dead and hundreds trapped, urgent rescue needed"
+    result = asyncio.run(pipeline.analyze_async(text, source="test", defer_explanation=True))
+    assert result["explanation"]["status"] == ExplanationJobManager.PENDING
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_deferred_results_are_cached_only_once_explained():
+    pipeline = CrisisPipeline()
+    pipeline.explanation_generator.use_gemini = True
+    pipeline.explanation_generator.gemini_client = SlowGeminiClient()
+    pipeline.explanation_jobs.generate_fn = lambda **kwargs: 1 / 0
+    text = "Flood in Chennai, 12 people dead and hundreds trapped, urgent rescue needed"
+
+    first = pipeline.analyze(text, source="test", defer_explanation=True)
+    assert wait_for(pipeline.explanation_jobs, first["explanation_job_id"])["status"] == ExplanationJobManager.FAILED
+    # The failed job's pending result was never cached
+    retry = pipeline.analyze(text, source="test", defer_explanation=True)
+    assert not retry["metadata"]["cache_hit"]
+    assert retry["explanation_job_id"] != first["explanation_job_id"]
+    wait_for(pipeline.explanation_jobs, retry["explanation_job_id"])
+
+    pipeline.explanation_jobs.generate_fn = pipeline._generate_deferred_explanation
+    done = pipeline.analyze(text, source="test", defer_explanation=True)
+    wait_for(pipeline.explanation_jobs, done["explanation_job_id"])
+    assert pipeline.analyze(text, source="test", defer_explanation=True)["metadata"]["cache_hit"]
+
+    # A caller with a callback gets its own job instead of the cached one
+    pipeline.explanation_jobs.callback_allowed_hosts = ("127.0.0.1",)
+    with_callback = pipeline.analyze(text, source="test", defer_explanation=True,
+                                     callback_url="http://127.0.0.1:9/hook")
+    assert not with_callback["metadata"]["cache_hit"]
+    assert with_callback["explanation"]["status"] == ExplanationJobManager.PENDING
+    wait_for(pipeline.explanation_jobs, with_callback["explanation_job_id"])
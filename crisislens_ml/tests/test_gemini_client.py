@@ -0,0 +1,165 @@
+#Test script for the async Gemini client and circuit breaker
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.gemini_client import AsyncGeminiClient, CircuitBreaker
+from scoring.explanation_generator import ExplanationGenerator
+
+
+class StubGeminiClient:
+    """Blocking stand-in for GeminiClient with configurable latency and errors"""
+
+    model_name = "stub"
+
+    def __init__(self, latency=0.0, fail=False):
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.latency)
+        with self._lock:
+            self.active -= 1
+        if self.fail:
+            return {"success": False, "error": "500 internal", "model": self.model_name}
+        return {"success": True, "text": "Assessment", "model": self.model_name}
+
+
+def test_concurrency_is_bounded_and_calls_time_out():
+    stub = StubGeminiClient(latency=0.05)
+    client = AsyncGeminiClient(stub, max_concurrency=2, timeout_seconds=1.0)
+
+    async def run_many():
+        return await asyncio.gather(*(client.generate_content("p") for _ in range(6)))
+
+    results = asyncio.run(run_many())
+    assert all(result["success"] for result in results)
+    assert stub.max_active == 2
+
+    slow = AsyncGeminiClient(StubGeminiClient(latency=0.3), timeout_seconds=0.05)
+    result = asyncio.run(slow.generate_content("p"))
+    assert not result["success"] and "timed out" in result["error"]
+    assert slow.get_stats()["timeouts"] == 1
+
+
+def test_breaker_opens_on_failures_and_recovers():
+    breaker = CircuitBreaker(window_size=4, min_calls=2, failure_rate=0.5,
+                             slow_call_seconds=1.0, reset_seconds=0.05)
+    stub = StubGeminiClient(fail=True)
+    generator = ExplanationGenerator(use_gemini=False,
+                                     async_client=AsyncGeminiClient(stub, breaker=breaker))
+
+    def explain():
+        return asyncio.run(generator.agenerate(
+            "Flood", {"overall": 0.8}, {"urgency_level": "high"}, {}, 0.7, "Flood", "Chennai"))
+
+    for _ in range(3):
+        assert explain()["method"] == "rule_based_dynamic"
+    assert breaker.state == CircuitBreaker.OPEN
+    assert stub.calls == 2          # third call was short-circuited
+    assert breaker.rejected_calls == 1
+
+    stub.fail = False
+    time.sleep(0.06)
+    result = explain()               # half-open trial succeeds
+    assert result["method"] == "gemini_api"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_trial_call_reopens_the_breaker():
+    breaker = CircuitBreaker(window_size=4, min_calls=2, failure_rate=0.5,
+                             slow_call_seconds=1.0, reset_seconds=0.05)
+    stub = StubGeminiClient(fail=True)
+    client = AsyncGeminiClient(stub, breaker=breaker)
+    for _ in range(2):
+        asyncio.run(client.generate_content("p"))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    stub.fail = False
+    stub.latency = 0.5
+    time.sleep(0.06)
+
+    async def cancel_trial():
+        trial = asyncio.create_task(client.generate_content("p"))
+        await asyncio.sleep(0.05)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        trial.cancel()
+        await asyncio.gather(trial, return_exceptions=True)
+
+    asyncio.run(cancel_trial())
+    assert breaker.state == CircuitBreaker.OPEN
+    assert client.in_flight == 0
+
+    stub.latency = 0.0
+    time.sleep(0.06)
+    assert asyncio.run(client.generate_content("p"))["success"]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_model_fallback_does_not_mutate_the_configured_model():
+    from utils.gemini_client import GeminiClient
+
+    class Models:
+        def __init__(self):
+            self.requested = []
+
+        def generate_content(self, model, contents):
+            self.requested.append(model)
+            if model == "gemini-2.0-flash":
+                raise RuntimeError("404 model not found")
+            return type("Response", (), {"text": "Assessment"})()
+
+    # Skip __init__: it needs the google-genai package and an API key
+    client = GeminiClient.__new__(GeminiClient)
+    client.client = type("Client", (), {"models": Models()})()
+    client.model_name = "gemini-2.0-flash"
+    client.fallback_model_name = "gemini-1.5-flash"
+    client._primary_unavailable = False
+
+    first = client.generate_content("p")
+    second = client.generate_content("p")
+    assert first["model"] == second["model"] == "gemini-1.5-flash"
+    assert client.model_name == "gemini-2.0-flash"
+    # Once the primary is known to be missing, calls go straight to the fallback
+    assert client.client.models.requested == ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-flash"]
+
+
+def test_async_sdk_path_falls_back_to_the_secondary_model():
+    from utils.gemini_client import GeminiClient
+
+    class AsyncModels:
+        def __init__(self):
+            self.requested = []
+
+        async def generate_content(self, model, contents):
+            self.requested.append(model)
+            if model == "gemini-2.0-flash":
+                raise RuntimeError("404 model not found")
+            return type("Response", (), {"text": "Assessment"})()
+
+    sdk = type("Client", (), {"aio": type("Aio", (), {"models": AsyncModels()})()})()
+    client = GeminiClient.__new__(GeminiClient)
+    client.client = sdk
+    client.model_name = "gemini-2.0-flash"
+    client.fallback_model_name = "gemini-1.5-flash"
+    client._primary_unavailable = False
+    async_client = AsyncGeminiClient(client)
+
+    first = asyncio.run(async_client.generate_content("p"))
+    second = asyncio.run(async_client.generate_content("p"))
+    assert first["success"] and first["model"] == second["model"] == "gemini-1.5-flash"
+    assert sdk.aio.models.requested == ["gemini-2.0-flash", "gemini-1.5-flash", "gemini-1.5-flash"]
+    assert async_client.breaker.state == CircuitBreaker.CLOSED
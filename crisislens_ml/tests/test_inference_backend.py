@@ -0,0 +1,83 @@
+#Test script for pluggable inference backends and the parity check
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.base_model import BaseModel
+from models.crisis_detector import CrisisDetector
+from models.inference_backend import create_backend, resolve_model_dir
+from export_model import compare_backends
+from utils.config import config
+
+TEXTS = [
+    "Residents gathered near the river this morning",
+    "Traffic was slow on the main road near the station",
+]
+
+
+class StubTokenizer:
+    def __call__(self, texts, truncation=True, max_length=256, **kwargs):
+        texts = [texts] if isinstance(texts, str) else texts
+        return {"input_ids": [[len(text)] for text in texts]}
+
+    def pad(self, features, padding=True, return_tensors=None):
+        return features
+
+
+class StubBackend:
+    """Crisis probability derived from the text length, shifted by `offset`"""
+    return_tensors = "np"
+
+    def __init__(self, offset=0.0):
+        self.offset = offset
+
+    def predict_proba(self, inputs):
+        probs = [min(1.0, ids[0] / 100 + self.offset) for ids in inputs["input_ids"]]
+        return [[p, 1 - p] for p in probs]
+
+
+def stub_detector(name, offset=0.0):
+    detector = CrisisDetector(backend=name)
+    detector.backend = StubBackend(offset)
+    detector.model = object()
+    detector.tokenizer = StubTokenizer()
+    return detector
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_backend("tensorrt", "distilbert-base-uncased")
+
+
+def test_each_model_has_its_own_onnx_export_dir():
+    first = resolve_model_dir("distilbert-base-uncased")
+    second = resolve_model_dir("org/crisis-model")
+    assert first != second
+    assert os.path.basename(second) == "org--crisis-model"
+    assert resolve_model_dir("org/crisis-model", "exports/custom").endswith(os.path.join("exports", "custom"))
+
+
+def test_base_model_uses_the_configured_backend():
+    assert BaseModel("distilbert-base-uncased").backend_name == config.CRISIS_DETECTION_BACKEND
+    assert BaseModel("distilbert-base-uncased", backend="onnx").backend_name == "onnx"
+
+
+def test_uncertain_texts_run_on_the_selected_backend():
+    detector = stub_detector("onnx")
+    result = detector.predict(TEXTS[0])
+    assert result["method"] == "hybrid"
+    assert result["score_breakdown"]["neural_network"] == pytest.approx(len(TEXTS[0]) / 100)
+    assert [r["method"] for r in detector.predict_batch(TEXTS)] == ["hybrid", "hybrid"]
+
+
+def test_parity_check_flags_backends_outside_tolerance():
+    reference = stub_detector("torch")
+    close = compare_backends(reference, stub_detector("torch_int8", 0.01), TEXTS, tolerance=0.02)
+    assert close["passed"] and close["max_abs_diff"] == pytest.approx(0.004)
+
+    far = compare_backends(reference, stub_detector("onnx", 0.2), TEXTS, tolerance=0.02)
+    assert not far["passed"] and far["max_abs_diff"] == pytest.approx(0.08)
@@ -0,0 +1,60 @@
+#Test script for the Aho-Corasick keyword engine
+
+import os
+import random
+import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.keyword_engine import KeywordAutomaton, get_keyword_engine
+from utils.config import config
+
+
+KEYWORDS = ["fire", "fire drill", "now", "heavy rain", "rain", "he", "she", "hers", "storm surge", "a"]
+
+
+def test_scan_matches_regex_and_substring_semantics():
+    automaton = KeywordAutomaton(KEYWORDS)
+    words = ["fire", "drill", "now", "known", "heavy", "rain", "rains", "she", "hers", "ushers",
+             "storm", "surge", "a", "firefighters", "x_fire", "fire-drill", "now!", "(rain)"]
+    random.seed(7)
+
+    for _ in range(300):
+        text = " ".join(random.choice(words) for _ in range(random.randint(0, 30)))
+        hits = automaton.scan(text)
+        for keyword in KEYWORDS:
+            expected_positions = [m.start() for m in re.finditer(
+                r"(?=\b{}\b)".format(re.escape(keyword)), text)]
+            assert hits.positions(keyword) == expected_positions, (keyword, text)
+            assert hits.has_word(keyword) == bool(expected_positions)
+            assert hits.contains(keyword) == (keyword in text), (keyword, text)
+
+
+def test_keywords_outside_vocabulary_fall_back_to_direct_search():
+    hits = KeywordAutomaton(["flood"]).scan("flash flood warning issued")
+    assert hits.has_word("warning")
+    assert not hits.has_word("warn")
+    assert hits.contains("warn")
+    assert hits.words_found(["flood", "warning", "fire"]) == ["flood", "warning"]
+
+
+def test_shared_engine_covers_config_keyword_lists():
+    engine = get_keyword_engine()
+    for keyword in config.CRISIS_KEYWORDS + config.NON_CRISIS_KEYWORDS:
+        assert keyword.lower() in engine.vocabulary
+    for keywords in config.SEVERITY_KEYWORDS.values():
+        assert all(keyword in engine.vocabulary for keyword in keywords)
+    assert get_keyword_engine() is engine
+
+
+def test_shared_engine_follows_config_changes(monkeypatch):
+    engine = get_keyword_engine()
+    monkeypatch.setattr(config, "WEIGHTS", {**config.WEIGHTS})
+    assert get_keyword_engine() is engine
+
+    monkeypatch.setattr(config, "CRISIS_KEYWORDS", config.CRISIS_KEYWORDS + ["sinkhole"])
+    updated = get_keyword_engine()
+    assert updated is not engine and "sinkhole" in updated.vocabulary
+    monkeypatch.undo()
+    assert "sinkhole" not in get_keyword_engine().vocabulary
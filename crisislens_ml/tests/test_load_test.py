@@ -0,0 +1,82 @@
+#Test script for the load-test harness and its stub Gemini client
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import (StubGeminiClient, build_requests, install_stub_gemini,
+                                  parse_mix, run_level)
+from main_pipeline import CrisisPipeline
+
+
+class FakeService(BaseHTTPRequestHandler):
+    """Answers /analyze_crisis, fails every triage request with a 500"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        failed = isinstance(body, dict) and body.get("mode") == "triage"
+        payload = b'{"is_crisis": false}'
+        self.send_response(500 if failed else 200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_service():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeService)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_mix_is_normalised_and_validated():
+    assert parse_mix("full=3,triage=1") == {"full": 0.75, "triage": 0.25}
+    with pytest.raises(ValueError):
+        parse_mix("full=1,stream=1")
+
+
+def test_requests_follow_the_mix_deterministically():
+    requests = build_requests(40, {"full": 0.5, "batch": 0.5}, batch_size=3)
+    assert requests == build_requests(40, {"full": 0.5, "batch": 0.5}, batch_size=3)
+    batches = [json.loads(body) for kind, path, body in requests if kind == "batch"]
+    assert batches and all(len(batch) == 3 for batch in batches)
+    assert {path for kind, path, _ in requests} == {"/analyze_crisis", "/analyze_batch"}
+
+
+def test_run_level_counts_throughput_and_errors(fake_service):
+    requests = build_requests(30, {"full": 0.5, "triage": 0.5})
+    row = run_level(fake_service, requests, concurrency=4, total=30)
+    triage = sum(kind == "triage" for kind, _, _ in requests)
+    assert row["requests"] == 30
+    assert row["errors"] == {"http_500": triage}
+    assert row["succeeded"] == 30 - triage
+    assert row["by_kind"]["full"]["count"] == 30 - triage
+    assert row["throughput_rps"] > 0
+
+
+def test_stub_gemini_injects_errors_into_explanations():
+    pipeline = CrisisPipeline()
+    stub = StubGeminiClient(latency_ms=0, jitter_ms=0, error_rate=1.0)
+    install_stub_gemini(pipeline, stub)
+    text = "Flood in Chennai, 12 people dead and hundreds trapped, urgent rescue needed"
+
+    result = pipeline.analyze(text, source="test", location="Chennai")
+    assert stub.get_stats() == {"calls": 1, "errors": 1, "hangs": 0}
+    assert result["explanation"]["method"] != "gemini_api"
+
+    stub.error_rate = 0.0
+    result = pipeline.analyze(text, source="test", location="Chennai")
+    assert result["explanation"]["method"] == "gemini_api"
+    assert pipeline.result_cache is None
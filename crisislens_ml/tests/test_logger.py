@@ -0,0 +1,89 @@
+#Test script for structured request logging
+
+import json
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main_pipeline import CrisisPipeline
+from utils.logger import JsonFormatter, log_event, logger
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class Unformattable:
+    def __str__(self):
+        raise AssertionError("formatted while the level was disabled")
+
+
+def capture(level):
+    handler = RecordingHandler()
+    logger.addHandler(handler)
+    previous = logger.level
+    logger.setLevel(level)
+    return handler, previous
+
+
+def release(handler, previous):
+    logger.removeHandler(handler)
+    logger.setLevel(previous)
+
+
+def test_disabled_level_skips_formatting():
+    handler, previous = capture(logging.WARNING)
+    try:
+        log_event("analysis", value=Unformattable())
+        logger.debug("%s", Unformattable())
+    finally:
+        release(handler, previous)
+    assert handler.records == []
+
+
+def test_json_formatter_puts_fields_at_top_level():
+    record = logger.makeRecord(logger.name, logging.INFO, __file__, 1, "analysis", (), None,
+                               extra={"fields": {"kind": "crisis", "stage_timings_ms": {"type": 0.5}}})
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["message"] == "analysis"
+    assert payload["level"] == "INFO"
+    assert payload["kind"] == "crisis"
+    assert payload["stage_timings_ms"] == {"type": 0.5}
+
+
+def test_one_summary_record_per_analysis():
+    pipeline = CrisisPipeline()
+    pipeline.result_cache = None
+    handler, previous = capture(logging.INFO)
+    try:
+        pipeline.analyze("Flood in Chennai, 12 people dead and hundreds trapped, urgent rescue needed",
+                         source="test", location="Chennai")
+    finally:
+        release(handler, previous)
+
+    summaries = [record for record in handler.records if record.getMessage() == "analysis"]
+    assert len(summaries) == 1
+    fields = summaries[0].fields
+    assert fields["kind"] == "crisis"
+    assert fields["source"] == "test"
+    assert set(fields["stage_timings_ms"]) >= {"detection", "type", "severity", "explanation"}
+    # The step trace is DEBUG only
+    assert all(record.levelno >= logging.INFO for record in handler.records)
+
+
+def test_log_files_go_to_the_package_directory(tmp_path, monkeypatch):
+    from utils.logger import LOG_DIR, TextFormatter, _sink_handlers
+
+    monkeypatch.chdir(tmp_path)
+    console_handler, file_handler = _sink_handlers(TextFormatter())
+    file_handler.close()
+    assert os.path.dirname(file_handler.baseFilename) == LOG_DIR
+    assert LOG_DIR == os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+    assert not os.path.exists(tmp_path / "logs")
@@ -0,0 +1,45 @@
+#Test script for process memory stats and the safetensors header reader
+
+import json
+import os
+import struct
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.memory_stats as memory_stats
+from utils.memory_stats import process_memory
+from utils.mmap_weights import read_safetensors_header
+
+
+def test_process_memory_reports_resident_size():
+    stats = process_memory()
+    assert stats
+    assert all(value >= 0 for value in stats.values())
+    if sys.platform.startswith("linux"):
+        assert stats["rss_mb"] >= stats["rss_anon_mb"]
+
+
+def test_process_memory_without_proc_or_resource(monkeypatch):
+    def no_proc(path, fields):
+        raise OSError(path)
+
+    monkeypatch.setattr(memory_stats, "_read_kb_fields", no_proc)
+    monkeypatch.setitem(sys.modules, "resource", None)  # as on Windows
+    assert process_memory() == {}
+
+
+def test_safetensors_header_gives_entries_and_data_offset(tmp_path):
+    header = {
+        "__metadata__": {"format": "pt"},
+        "bias": {"dtype": "F32", "shape": [2], "data_offsets": [0, 8]},
+    }
+    encoded = json.dumps(header).encode("utf-8")
+    encoded += b" " * (-len(encoded) % 8)
+    path = tmp_path / "model.safetensors"
+    path.write_bytes(struct.pack("<Q", len(encoded)) + encoded + struct.pack("<2f", 1.0, 2.0))
+
+    entries, data_start = read_safetensors_header(str(path))
+    assert entries == {"bias": header["bias"]}
+    assert data_start == 8 + len(encoded)
+    assert struct.unpack("<2f", path.read_bytes()[data_start:]) == (1.0, 2.0)
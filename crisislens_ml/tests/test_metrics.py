@@ -0,0 +1,47 @@
+#Test script for per-stage latency metrics
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main_pipeline import CrisisPipeline
+from utils.metrics import MetricsRegistry, StageTimer
+
+CRISIS_STAGES = {"location", "preprocessing", "detection", "type", "severity",
+                 "urgency", "priority", "explanation", "compile"}
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(buckets=(0.01, 0.1))
+    timer = StageTimer()
+    timer.record("detection", 0.005)
+    timer.record("type", 0.05)
+    timer.finish("crisis", registry)
+    timer = StageTimer()
+    timer.record("detection", 0.5)
+    timer.finish("crisis", registry)
+
+    text = registry.render()
+    assert 'crisislens_stage_duration_seconds_bucket{stage="detection",le="0.01"} 1' in text
+    assert 'crisislens_stage_duration_seconds_bucket{stage="detection",le="0.1"} 1' in text
+    assert 'crisislens_stage_duration_seconds_bucket{stage="detection",le="+Inf"} 2' in text
+    assert 'crisislens_stage_duration_seconds_count{stage="type"} 1' in text
+    assert 'crisislens_request_duration_seconds_count{kind="crisis"} 2' in text
+
+
+def test_analysis_reports_stage_breakdown_and_metrics():
+    pipeline = CrisisPipeline()
+    pipeline.result_cache = None
+    result = pipeline.analyze(
+        "Flood in Chennai, 12 people dead and hundreds trapped, urgent rescue needed",
+        source="test", location="Chennai"
+    )
+    timings = result["metadata"]["stage_timings_ms"]
+    assert set(timings) == CRISIS_STAGES
+    assert all(ms >= 0 for ms in timings.values())
+
+    text = pipeline.render_metrics()
+    assert 'crisislens_stage_duration_seconds_bucket{stage="explanation",le="+Inf"}' in text
+    assert 'crisislens_request_duration_seconds_count{kind="crisis"}' in text
+    assert "# TYPE crisislens_detection_tier_total counter" in text
@@ -0,0 +1,75 @@
+#Test script for the pinned local model registry
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.model_registry as model_registry
+from utils.config import config
+from utils.model_registry import ModelIntegrityError, ModelRegistry
+
+MODEL = "org/tiny-classifier"
+
+
+def make_model_dir(registry):
+    model_dir = registry.local_dir(MODEL)
+    os.makedirs(model_dir)
+    for name, content in (("config.json", b"{}"), ("model.safetensors", b"weights")):
+        with open(os.path.join(model_dir, name), "wb") as f:
+            f.write(content)
+    registry.write_manifest(MODEL, "abc123")
+    return model_dir
+
+
+def test_fetched_models_resolve_locally_after_checksum_check(tmp_path):
+    registry = ModelRegistry(cache_dir=str(tmp_path), offline=True)
+    model_dir = make_model_dir(registry)
+
+    assert registry.resolve(MODEL) == (model_dir, True)
+    assert set(registry.manifest(MODEL)["files"]) == {"config.json", "model.safetensors"}
+
+    with open(os.path.join(model_dir, "model.safetensors"), "wb") as f:
+        f.write(b"tampered")
+    with pytest.raises(ModelIntegrityError):
+        ModelRegistry(cache_dir=str(tmp_path)).resolve(MODEL)
+
+
+def test_missing_models_use_the_hub_unless_offline(tmp_path):
+    assert ModelRegistry(cache_dir=str(tmp_path), offline=False).resolve(MODEL) == (MODEL, False)
+    with pytest.raises(FileNotFoundError):
+        ModelRegistry(cache_dir=str(tmp_path), offline=True).resolve(MODEL)
+
+
+def test_unchanged_files_are_not_rehashed(tmp_path, monkeypatch):
+    model_dir = make_model_dir(ModelRegistry(cache_dir=str(tmp_path)))
+    hashed = []
+    sha256 = model_registry._sha256
+    monkeypatch.setattr(model_registry, "_sha256", lambda path: hashed.append(path) or sha256(path))
+
+    # The stamp written with the manifest covers the next process start
+    ModelRegistry(cache_dir=str(tmp_path)).resolve(MODEL)
+    assert hashed == []
+
+    # Same size, new mtime: rehashed and caught
+    weights = os.path.join(model_dir, "model.safetensors")
+    with open(weights, "wb") as f:
+        f.write(b"WEIGHTS")
+    os.utime(weights, ns=(0, 12345))
+    with pytest.raises(ModelIntegrityError):
+        ModelRegistry(cache_dir=str(tmp_path)).resolve(MODEL)
+    assert len(hashed) == 2
+
+
+def test_local_copy_must_match_the_pinned_commit(tmp_path, monkeypatch):
+    registry = ModelRegistry(cache_dir=str(tmp_path))
+    make_model_dir(registry)
+    monkeypatch.setitem(config.MODEL_REVISIONS, MODEL, "f" * 40)
+    with pytest.raises(ModelIntegrityError):
+        registry.resolve(MODEL)
+
+    monkeypatch.setitem(config.MODEL_REVISIONS, MODEL, "main")
+    with pytest.raises(ValueError):
+        registry.fetch(MODEL)
@@ -0,0 +1,294 @@
+#Test script for the end-to-end CrisisPipeline
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main_pipeline import CrisisPipeline
+
+REPORTS = [
+    "Flood in Chennai, 12 people dead and hundreds trapped, urgent rescue needed",
+    "Fire breaks out at T Nagar market complex, 5 shops affected, 3 injured",
+    "Beautiful weather in Chennai today, perfect for the beach",
+]
+
+
+def comparable(result):
+    result = dict(result)
+    metadata = dict(result.get("metadata", {}))
+    for volatile in ("timestamp", "processing_time_ms", "cache_hit", "stage_timings_ms"):
+        metadata.pop(volatile, None)
+    result["metadata"] = metadata
+    return result
+
+
+class SlowAsyncGemini:
+    """Async client stub: every call takes 0.2s of awaited I/O"""
+
+    async def generate_content(self, prompt):
+        await asyncio.sleep(0.2)
+        return {"success": True, "text": "Gemini assessment", "model": "stub"}
+
+
+def test_analyze_async_matches_sync_results():
+    pipeline = CrisisPipeline()
+    pipeline.result_cache = None
+    expected = [comparable(pipeline.analyze(text, source="test", location="Chennai")) for text in REPORTS]
+
+    async def run_all():
+        return await asyncio.gather(*(
+            pipeline.analyze_async(text, source="test", location="Chennai") for text in REPORTS
+        ))
+
+    assert [comparable(result) for result in asyncio.run(run_all())] == expected
+
+
+def test_awaited_gemini_calls_do_not_block_the_event_loop():
+    pipeline = CrisisPipeline()
+    pipeline.result_cache = None
+    pipeline.explanation_generator.async_client = SlowAsyncGemini()
+    ticks = []
+
+    async def heartbeat():
+        for _ in range(10):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.02)
+
+    async def run_all():
+        texts = [f"{REPORTS[0]} report {i}" for i in range(8)]
+        beat = asyncio.create_task(heartbeat())
+        results = await asyncio.gather(*(
+            pipeline.analyze_async(text, source="test", location="Chennai") for text in texts
+        ))
+        await beat
+        return results
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+    assert time.perf_counter() - start < 1.0          # 8 x 0.2s Gemini calls overlap
+    assert all(result["explanation"]["method"] == "gemini_api" for result in results)
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.15
+
+
+class SlowGemini:
+    """Sync client stub: every call takes 0.2s and records the calling thread"""
+
+    def __init__(self):
+        self.threads = set()
+
+    def generate_content(self, prompt):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(0.2)
+        return {"success": True, "text": "Gemini assessment", "model": "stub"}
+
+
+def test_batched_analyze_only_batches_detection():
+    pipeline = CrisisPipeline()
+    pipeline.result_cache = None
+    expected = [comparable(pipeline.analyze(text, source="test", location="Chennai")) for text in REPORTS]
+    assert [comparable(pipeline.analyze_batched(text, source="test", location="Chennai"))
+            for text in REPORTS] == expected
+
+    gemini = SlowGemini()
+    pipeline.explanation_generator.gemini_client = gemini
+    pipeline.explanation_generator.explanation_cache = None
+    pipeline.explanation_generator.use_gemini = True
+    results = {}
+
+    def call(i):
+        results[i] = pipeline.analyze_batched(f"{REPORTS[0]} report {i}", source="test",
+                                              location="Chennai", defer_explanation=False)
+
+    threads = [threading.Thread(target=call, args=(i,), name=f"caller-{i}") for i in range(6)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    # The Gemini calls ran on the callers' threads, side by side
+    assert time.perf_counter() - start < 0.8
+    assert gemini.threads == {thread.name for thread in threads}
+    assert all(result["explanation"]["method"] == "gemini_api" for result in results.values())
+    assert pipeline._get_detection_scheduler().get_metrics()["items_processed"] == len(REPORTS) + 6
+
+
+def test_iter_analyze_batch_streams_chunks_and_isolates_failures():
+    pipeline = CrisisPipeline()
+    pipeline.result_cache = None
+    texts = [f"{REPORTS[i % 2]} update {i}" for i in range(6)]
+    expected = [comparable(result) for result in pipeline.analyze_batch(texts)]
+
+    detection_passes = []
+    predict_batch = pipeline.crisis_detector.predict_batch
+    pipeline.crisis_detector.predict_batch = lambda batch, **kwargs: (
+        detection_passes.append(len(batch)) or predict_batch(batch, **kwargs)
+    )
+    stream = pipeline.iter_analyze_batch(texts, chunk_size=2)
+    first_index, first = next(stream)
+    assert detection_passes == [2]               # only the first chunk has run
+    streamed = dict([(first_index, first), *stream])
+    assert detection_passes == [2, 2, 2]
+    assert [comparable(streamed[i]) for i in range(6)] == expected
+
+    estimate = pipeline.severity_estimator.estimate
+    pipeline.severity_estimator.estimate = lambda features: (
+        1 / 0 if "update 3" in features.text else estimate(features)
+    )
+    results = dict(pipeline.iter_analyze_batch(texts, chunk_size=4))
+    assert results[3] == {"error": "division by zero"}
+    assert comparable(results[4]) == expected[4]
+
+
+def test_triage_mode_returns_compact_scores_matching_full_mode():
+    pipeline = CrisisPipeline()
+    for text in REPORTS:
+        full = pipeline.analyze(text, source="test", location="Chennai")
+        triage = pipeline.analyze(text, source="test", location="Chennai", mode="triage")
+        assert triage["mode"] == "triage" and "explanation" not in triage
+        assert triage["is_crisis"] == full["is_crisis"]
+        if not full["is_crisis"]:
+            continue
+        assert triage["type"] == full["type_classification"]["type"]
+        assert triage["severity"] == round(full["severity"]["overall"], 3)
+        assert triage["urgency"]["score"] == round(full["urgency"]["score"], 3)
+        assert triage["priority"] == {"score": full["priority"]["score"],
+                                      "level": full["priority"]["level"]}
+        assert len(str(triage)) < len(str(full)) / 4
+
+    # Separate cache entries per mode
+    assert pipeline.analyze(REPORTS[0], source="test", location="Chennai", mode="triage")["mode"] == "triage"
+    assert "mode" not in pipeline.analyze(REPORTS[0], source="test", location="Chennai")
+
+
+class StubTokenizer:
+    def __call__(self, texts, **kwargs):
+        texts = [texts] if isinstance(texts, str) else texts
+        return {"input_ids": [[len(text)] for text in texts]}
+
+    def pad(self, features, **kwargs):
+        return features
+
+
+class SlowLoadingBackend:
+    """Backend whose load() blocks until the test releases it"""
+    return_tensors = "np"
+    model = "stub-model"
+
+    def __init__(self, release):
+        self.release = release
+
+    def load(self):
+        assert self.release.wait(5)
+        return self
+
+    def load_tokenizer(self):
+        return StubTokenizer()
+
+    def predict_proba(self, inputs):
+        return [[0.9, 0.1] for _ in inputs["input_ids"]]
+
+
+def test_background_warmup_serves_keyword_results_until_ready():
+    pipeline = CrisisPipeline()
+    detector = pipeline.crisis_detector
+    release = threading.Event()
+    detector_module = sys.modules[type(detector).__module__]
+    create_backend = detector_module.create_backend
+    detector_module.create_backend = lambda name, model_name: SlowLoadingBackend(release)
+    try:
+        text = "Residents near the river reported water entering homes"
+        pipeline.warm_up(background=True)
+        assert pipeline.get_readiness()["ready"] is False
+
+        start = time.perf_counter()
+        loading = pipeline.analyze(text, source="test", location="Chennai", mode="triage")
+        assert time.perf_counter() - start < 1.0
+        assert detector.get_cascade_stats()["keyword_only"] == 1
+
+        release.set()
+        pipeline._warmup_thread.join(5)
+        assert pipeline.get_readiness() == {"ready": True, "model_state": "ready",
+                                            "degraded": False, "load_seconds": detector.load_seconds,
+                                            "load_error": None}
+        # The keyword-only answer was not cached under the ready model's key
+        ready = pipeline.analyze(text, source="test", location="Chennai", mode="triage")
+        assert detector.get_cascade_stats()["neural"] == 1
+        assert ready["crisis_confidence"] != loading["crisis_confidence"]
+    finally:
+        detector_module.create_backend = create_backend
+
+
+def test_keyword_results_after_a_failed_load_are_not_cached_as_ready():
+    pipeline = CrisisPipeline()
+    detector = pipeline.crisis_detector
+    release = threading.Event()
+    release.set()
+    detector_module = sys.modules[type(detector).__module__]
+    create_backend = detector_module.create_backend
+
+    def unavailable(name, model_name):
+        raise OSError("model files missing")
+
+    detector_module.create_backend = unavailable
+    try:
+        text = "Residents near the river reported water entering homes"
+        failed = pipeline.analyze(text, source="test", location="Chennai", mode="triage")
+        assert detector.load_state == "failed"
+        assert detector.get_cascade_stats()["keyword_only"] == 1
+
+        # A later request loads the model, then the first text is analysed again
+        detector_module.create_backend = lambda name, model_name: SlowLoadingBackend(release)
+        pipeline.analyze(text, source="retry", location="Chennai", mode="triage")
+        assert detector.load_state == "ready"
+        ready = pipeline.analyze(text, source="test", location="Chennai", mode="triage")
+        assert detector.get_cascade_stats()["neural"] == 2
+        assert ready["crisis_confidence"] != failed["crisis_confidence"]
+    finally:
+        detector_module.create_backend = create_backend
+
+
+def test_concurrent_analyses_keep_their_own_location():
+    pipeline = CrisisPipeline()
+    pipeline.result_cache = None
+    cases = [
+        ("Flood in the city, 12 people dead and hundreds trapped, urgent rescue needed", "Mumbai"),
+        ("Fire breaks out at the market complex, 5 shops affected, 3 injured", "Delhi"),
+        ("Earthquake of magnitude 5.8 felt, buildings collapsed and 40 injured", "Kolkata"),
+        ("Cyclone warning issued, fishermen missing and coastal homes damaged", "Chennai"),
+        ("Heavy flooding in Hyderabad, 200 families displaced and stranded", None),
+        ("Landslide blocks the highway near Pune after heavy rain, vehicles stranded", None),
+    ]
+    expected = [comparable(pipeline.analyze(text, source="test", location=location))
+                for text, location in cases]
+    assert len({result["location"]["name"] for result in expected}) == len(cases)
+
+    rounds = 25
+    start = threading.Barrier(len(cases) * 2)
+    results = {}
+    errors = []
+
+    def hammer(worker):
+        index = worker % len(cases)
+        text, location = cases[index]
+        start.wait()
+        try:
+            for _ in range(rounds):
+                result = comparable(pipeline.analyze(text, source="test", location=location))
+                if result != expected[index]:
+                    results.setdefault(index, []).append(result["location"]["name"])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=hammer, args=(worker,)) for worker in range(len(cases) * 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert errors == []
+    assert results == {}
@@ -0,0 +1,48 @@
+#Test script for SeverityEstimator casualty extraction
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.severity_estimator import SeverityEstimator
+
+
+def test_casualties_are_counted_per_category():
+    estimator = SeverityEstimator()
+
+    result = estimator.estimate("Flood kills 12, 40 injured and 3 missing in Chennai")
+    assert result["casualties"] == {"dead": 12, "injured": 40, "missing": 3}
+    assert result["casualty_count"] == 52
+
+    result = estimator.estimate("Death toll rises to 1,200 as two hundred and fifty people remain missing")
+    assert result["casualties"] == {"dead": 1200, "injured": 0, "missing": 250}
+
+    result = estimator.estimate("Dozens injured and a dozen dead after building collapse")
+    assert result["casualties"] == {"dead": 12, "injured": 24, "missing": 0}
+
+
+def test_separate_incidents_with_the_same_count_add_up():
+    estimator = SeverityEstimator()
+    result = estimator.estimate("Wall collapse leaves 2 dead in Andheri while a fire leaves 2 dead in Kurla")
+    assert result["casualties"]["dead"] == 4
+
+
+def test_repeated_numbers_beyond_the_first_occurrence_are_found():
+    estimator = SeverityEstimator()
+    text = ("Officials met on 7 March to review the road network. " * 20
+            + "Later 7 people were killed when the bridge collapsed.")
+    assert estimator.estimate(text)["casualties"]["dead"] == 7
+
+
+def test_long_articles_scale_linearly():
+    estimator = SeverityEstimator()
+    paragraph = "Rescue teams found 3 bodies and 14 injured near the river. "
+    text = paragraph * 800  # ~48k chars, thousands of numbers
+
+    start = time.perf_counter()
+    result = estimator.estimate(text)
+    assert time.perf_counter() - start < 2.0
+    assert result["casualties"]["dead"] == 3 * 800
+    assert result["casualties"]["injured"] == 14 * 800
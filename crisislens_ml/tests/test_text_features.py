@@ -0,0 +1,32 @@
+#Test script for the shared per-request TextFeatures
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.text_features import TextFeatures, ensure_features
+from models.crisis_detector import CrisisDetector
+from models.severity_estimator import SeverityEstimator
+from models.urgency_estimator import UrgencyDetector
+
+TEXT = ("Urgent: flash flood in Chennai, 12 people dead and 40 injured.  "
+        "Rescue teams are searching the entire region now.")
+
+
+def test_features_match_naive_text_processing():
+    features = TextFeatures(TEXT)
+    assert features.text_lower == TEXT.lower()
+    assert features.tokens == TEXT.lower().split()
+    assert [features.text_lower[o:o + len(t)] for o, t in zip(features.token_offsets, features.tokens)] == features.tokens
+    assert features.numbers == ["12", "40"]
+    assert features.max_number == 40
+    assert features.keyword_hits.has_word("flood")
+    assert ensure_features(features) is features
+
+
+def test_stages_accept_raw_text_or_features():
+    features = TextFeatures(TEXT)
+    assert CrisisDetector().detect(TEXT) == CrisisDetector().detect(features)
+    assert SeverityEstimator().estimate(TEXT) == SeverityEstimator().estimate(features)
+    assert UrgencyDetector().detect(TEXT) == UrgencyDetector().detect(features)
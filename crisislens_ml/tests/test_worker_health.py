@@ -0,0 +1,33 @@
+#Test script for the shared-memory worker health table
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.worker_health import WorkerHealthTable
+
+
+def test_forked_workers_write_their_own_slots():
+    table = WorkerHealthTable(2)
+    pids = []
+    for slot in range(2):
+        pid = os.fork()
+        if pid == 0:
+            table.reset_slot(slot, os.getpid())
+            for _ in range(slot + 3):
+                table.incr(slot, "requests")
+            os._exit(0)
+        pids.append(pid)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    workers = table.snapshot(heartbeat_timeout=60.0)
+    assert [worker["pid"] for worker in workers] == pids
+    assert [worker["requests"] for worker in workers] == [3, 4]
+    assert all(worker["healthy"] for worker in workers)
+
+    table.incr(1, "restarts")
+    table.reset_slot(1, 12345)
+    assert table.snapshot(60.0)[1]["restarts"] == 1
+    assert table.snapshot(60.0)[1]["requests"] == 0
@@ -0,0 +1,190 @@
+"""
+Micro-batching scheduler - groups concurrent requests into batched passes
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+
+class _PendingRequest:
+    """A queued payload waiting for its batch"""
+    __slots__ = ("payload", "length", "future", "enqueued_at")
+
+    def __init__(self, payload: Any, length: int):
+        self.payload = payload
+        self.length = length
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class MicroBatchScheduler:
+    """
+    In-process micro-batching queue
+
+    Requests arriving within `max_wait_ms` of the oldest queued request (or
+    until `max_batch_size` requests are waiting) are grouped, sorted by token
+    length into buckets to minimise padding, and each bucket is handed to
+    `process_batch` once. Results are fanned back to the waiting callers.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]],
+                 length_fn: Optional[Callable[[Any], int]] = None,
+                 max_batch_size: int = 16, max_wait_ms: float = 10.0,
+                 bucket_boundaries: Optional[List[int]] = None):
+        """
+        Args:
+            process_batch: Function mapping a list of payloads to a list of results
+            length_fn: Returns the (estimated) token length of a payload
+            max_batch_size: Maximum number of requests grouped together
+            max_wait_ms: How long the oldest request may wait for company
+            bucket_boundaries: Upper token-length bounds of the padding buckets
+        """
+        self.process_batch = process_batch
+        self.length_fn = length_fn or (lambda payload: 0)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.bucket_boundaries = sorted(bucket_boundaries or [])
+
+        self._queue: deque = deque()
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._running = False
+
+        # Metrics
+        self._max_queue_depth = 0
+        self._batches_dispatched = 0
+        self._buckets_dispatched = 0
+        self._items_processed = 0
+        self._items_failed = 0
+        self._total_wait = 0.0
+        self._batch_size_histogram: Dict[int, int] = {}
+
+    def start(self) -> 'MicroBatchScheduler':
+        """Start the background batching thread"""
+        with self._condition:
+            if self._running:
+                return self
+            self._running = True
+        self._worker = threading.Thread(
+            target=self._run, name="micro-batch-scheduler", daemon=True
+        )
+        self._worker.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker after draining the queue"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def submit(self, payload: Any) -> Future:
+        """Queue a payload and return a Future for its result"""
+        request = _PendingRequest(payload, self.length_fn(payload))
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("MicroBatchScheduler is not running")
+            self._queue.append(request)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            self._condition.notify_all()
+        return request.future
+
+    def process(self, payload: Any, timeout: Optional[float] = None) -> Any:
+        """Submit a payload and block until its result is ready"""
+        return self.submit(payload).result(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._queue:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+
+                # Hold the batch open until it is full or the window expires
+                deadline = self._queue[0].enqueued_at + self.max_wait
+                while self._running and len(self._queue) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                size = min(len(self._queue), self.max_batch_size)
+                batch = [self._queue.popleft() for _ in range(size)]
+
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[_PendingRequest]):
+        now = time.monotonic()
+        buckets = self._bucketize(batch)
+
+        with self._condition:
+            self._batches_dispatched += 1
+            self._buckets_dispatched += len(buckets)
+            self._batch_size_histogram[len(batch)] = self._batch_size_histogram.get(len(batch), 0) + 1
+            self._total_wait += sum(now - request.enqueued_at for request in batch)
+
+        for bucket in buckets:
+            try:
+                results = self.process_batch([request.payload for request in bucket])
+                if len(results) != len(bucket):
+                    raise RuntimeError(
+                        f"process_batch returned {len(results)} results for {len(bucket)} requests"
+                    )
+            except Exception as e:
+                for request in bucket:
+                    request.future.set_exception(e)
+                with self._condition:
+                    self._items_failed += len(bucket)
+                continue
+
+            for request, result in zip(bucket, results):
+                request.future.set_result(result)
+            with self._condition:
+                self._items_processed += len(bucket)
+
+    def _bucketize(self, batch: List[_PendingRequest]) -> List[List[_PendingRequest]]:
+        """Sort by length and split at the bucket boundaries"""
+        ordered = sorted(batch, key=lambda request: request.length)
+        if not self.bucket_boundaries:
+            return [ordered]
+
+        buckets: List[List[_PendingRequest]] = []
+        current_bucket = None
+        for request in ordered:
+            bucket_index = next(
+                (i for i, bound in enumerate(self.bucket_boundaries) if request.length <= bound),
+                len(self.bucket_boundaries)
+            )
+            if bucket_index != current_bucket:
+                buckets.append([])
+                current_bucket = bucket_index
+            buckets[-1].append(request)
+        return buckets
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth and batch size metrics"""
+        with self._condition:
+            batches = self._batches_dispatched
+            items = self._items_processed + self._items_failed
+            return {
+                "running": self._running,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_queue_depth,
+                "batches_dispatched": batches,
+                "buckets_dispatched": self._buckets_dispatched,
+                "items_processed": self._items_processed,
+                "items_failed": self._items_failed,
+                "avg_batch_size": round(items / batches, 3) if batches else 0.0,
+                "avg_queue_wait_ms": round(self._total_wait / items * 1000, 3) if items else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_size_histogram.items())),
+                "config": {
+                    "max_batch_size": self.max_batch_size,
+                    "max_wait_ms": self.max_wait * 1000,
+                    "bucket_boundaries": list(self.bucket_boundaries)
+                }
+            }
@@ -0,0 +1,328 @@
+"""
+Cache Manager - bounded LRU/TTL cache for pipeline results, with an
+optional SQLite store behind it that survives service restarts
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially re-formatted reports share a key"""
+    if not isinstance(text, str):
+        return ""
+    return " ".join(text.split())
+
+
+def make_cache_key(text: str, source: Optional[str], location: Optional[str],
+                   config_version: str) -> str:
+    """Hash of normalized text + source + location + config version"""
+    parts = [
+        normalize_text(text),
+        source or "",
+        location or "",
+        config_version
+    ]
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry time-to-live"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 3600.0):
+        """
+        Args:
+            max_entries: Maximum number of entries before the least recently used is evicted
+            ttl_seconds: Entry lifetime, None for no expiry
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value (refreshing its recency) or default"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> bool:
+        """Drop one entry, returns True if it existed"""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class DiskCache:
+    """
+    SQLite-backed result store keyed by content hash
+
+    Rows carry the pipeline version they were computed with; rows from other
+    versions are purged on open. When the table grows past `max_entries` the
+    least recently read rows are dropped and the freed pages are returned to
+    the filesystem.
+
+    SQLite connections must not cross fork(), so each process (e.g. every
+    prefork_server.py worker) opens its own connection on first use.
+    """
+
+    # Only rewrite accessed_at when it is older than this, so hot reads stay read-only
+    _TOUCH_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, path: str, pipeline_version: str, max_entries: int = 50000,
+                 ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            pipeline_version: Version tag stored with every row
+            max_entries: Row count that triggers compaction
+            ttl_seconds: Row lifetime, None for no expiry
+        """
+        self.path = path
+        self.pipeline_version = pipeline_version
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = None
+        self._conn_pid = None
+        # Connections opened before a fork: kept referenced so the child never
+        # closes (and checkpoints through) the parent's connection
+        self._inherited = []
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.compactions = 0
+        self.rows_compacted = 0
+
+        self._connection().execute(
+            "DELETE FROM results WHERE pipeline_version != ?", (self.pipeline_version,)
+        )
+        self._row_count = self._count_rows()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process's connection, opened on first use after a fork"""
+        pid = os.getpid()
+        if self._conn_pid != pid:
+            if self._conn is not None:
+                self._inherited.append(self._conn)
+            self._conn = self._open()
+            self._conn_pid = pid
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " pipeline_version TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results(accessed_at)")
+        return conn
+
+    def _count_rows(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, created_at, accessed_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or (self.ttl_seconds is not None and now - row[1] > self.ttl_seconds):
+                self.misses += 1
+                return default
+
+            if now - row[2] > self._TOUCH_INTERVAL_SECONDS:
+                self._connection().execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            value = row[0]
+
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        encoded = json.dumps(value, default=str)
+        now = time.time()
+        with self._lock:
+            exists = self._connection().execute(
+                "SELECT 1 FROM results WHERE key = ?", (key,)
+            ).fetchone() is not None
+            self._connection().execute(
+                "INSERT OR REPLACE INTO results (key, pipeline_version, value, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, self.pipeline_version, encoded, now, now)
+            )
+            self.writes += 1
+            if not exists:
+                self._row_count += 1
+            if self._row_count > self.max_entries:
+                self._compact_locked()
+
+    def compact(self):
+        """Drop expired rows and trim to 90% of max_entries by last access"""
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        before = self._count_rows()
+        if self.ttl_seconds is not None:
+            self._connection().execute(
+                "DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+        keep = int(self.max_entries * 0.9)
+        self._connection().execute(
+            "DELETE FROM results WHERE key IN ("
+            " SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (keep,)
+        )
+        self._connection().execute("PRAGMA incremental_vacuum")
+        self._row_count = self._count_rows()
+        self.compactions += 1
+        self.rows_compacted += before - self._row_count
+
+    def invalidate(self, key: str) -> bool:
+        with self._lock:
+            deleted = self._connection().execute("DELETE FROM results WHERE key = ?", (key,)).rowcount
+            self._row_count -= deleted
+            return deleted > 0
+
+    def clear(self):
+        with self._lock:
+            self._connection().execute("DELETE FROM results")
+            self._connection().execute("PRAGMA incremental_vacuum")
+            self._row_count = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._conn_pid = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._row_count
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "size": self._row_count,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "compactions": self.compactions,
+                "rows_compacted": self.rows_compacted,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+class TieredCache:
+    """In-memory LRU in front of a persistent DiskCache"""
+
+    def __init__(self, memory: LRUCache, disk: DiskCache):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        value = self.disk.get(key)
+        if value is None:
+            return default
+
+        # Promote warm disk entries so the next read is in-memory
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def invalidate(self, key: str) -> bool:
+        in_memory = self.memory.invalidate(key)
+        on_disk = self.disk.invalidate(key)
+        return in_memory or on_disk
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.memory.get_stats(),
+            "disk": self.disk.get_stats()
+        }
@@ -1,8 +1,28 @@
 
 # utils/config.py
+import hashlib
+import json
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
+# Settings that change what an analysis returns; serving, logging and
+# resource settings are left out of the fingerprint
+FINGERPRINT_FIELDS = (
+    "CRISIS_TYPES", "CRISIS_KEYWORDS", "NON_CRISIS_KEYWORDS", "TYPE_KEYWORDS",
+    "STRONG_CRISIS_INDICATORS", "NON_CRISIS_CONTEXTS", "SEVERITY_KEYWORDS",
+    "CASUALTY_CONTEXT_WORDS", "CASUALTY_CONTEXT_WINDOW", "URGENCY_KEYWORDS",
+    "TIME_INDICATOR_WORDS",
+    "CRISIS_DETECTION_MODEL", "TYPE_CLASSIFICATION_MODEL", "MODEL_REVISIONS",
+    "CRISIS_DETECTION_BACKEND", "ONNX_MODEL_DIR", "ONNX_MODEL_FILE",
+    "CRISIS_DETECTION_THRESHOLD", "ENABLE_DETECTION_CASCADE",
+    "CASCADE_LOWER_BOUND", "CASCADE_UPPER_BOUND", "TYPE_CLASSIFICATION_THRESHOLD",
+    "MAX_TEXT_LENGTH", "MIN_TEXT_LENGTH",
+    "LONG_DOCUMENT_MODE", "LONG_DOC_WINDOW_STRIDE", "LONG_DOC_MAX_WINDOWS",
+    "LONG_DOC_ATTENTION_TEMPERATURE",
+    "WEIGHTS", "PRIORITY_THRESHOLDS", "CITY_COORDINATES",
+    "USE_GEMINI_FOR_EXPLANATIONS", "EXPLANATION_CACHE_SCORE_BUCKET",
+)
+
 @dataclass
 class MLConfig:
     """Configuration for ML Pipeline"""
@@ -97,18 +117,168 @@ class MLConfig:
                         "shortage", "scarcity", "malnutrition", "dearth"]
     })
 
+    # Strong indicators that boost the keyword crisis score
+    STRONG_CRISIS_INDICATORS: List[str] = field(default_factory=lambda: [
+        # Fire
+        "chemical fire", "factory fire", "industrial fire", "major fire",
+        # Earthquake
+        "earthquake magnitude", "magnitude", "epicenter", "seismic",
+        # Cyclone
+        "cyclone alert", "storm surge", "landfall", "wind speed",
+        # General urgent
+        "urgent", "emergency", "breaking", "alert", "warning"
+    ])
+
+    # Contexts that mean a type keyword is routine, not a crisis
+    NON_CRISIS_CONTEXTS: List[str] = field(default_factory=lambda: [
+        "drinking water", "water supply", "water treatment",
+        "normal rainfall", "light rain", "drizzle",
+        "campfire", "fireplace", "fire drill", "fire exercise",
+        "practice drill", "training exercise", "mock drill"
+    ])
+
+    # Severity dimensions
+    SEVERITY_KEYWORDS: Dict[str, List[str]] = field(default_factory=lambda: {
+        "human_impact": [
+            'injured', 'casualty', 'death', 'dead', 'killed', 'fatal',
+            'people', 'person', 'family', 'children', 'victim', 'affected',
+            'body', 'bodies', 'deceased', 'loss of life', 'lives lost',
+            'stranded', 'trapped', 'missing', 'hospitalized', 'wounded'
+        ],
+        "geographic_scale": [
+            'area', 'region', 'city', 'multiple', 'widespread', 'extensive',
+            'several', 'many', 'whole', 'entire', 'across', 'district',
+            'province', 'state', 'country', 'nationwide', 'large scale'
+        ],
+        "infrastructure_damage": [
+            'building', 'road', 'hospital', 'school', 'bridge', 'house',
+            'shop', 'market', 'damage', 'destroyed', 'collapsed', 'broken',
+            'damaged', 'displaces', 'infrastructure', 'property', 'home',
+            'structure', 'facility', 'power line', 'electricity', 'water supply'
+        ],
+        "temporal_urgency": [
+            'urgent', 'immediate', 'emergency', 'evacuate', 'evacuation',
+            'now', 'critical', 'asap', 'quick', 'rush', 'ongoing',
+            'continue', 'still', 'yet', 'remains', 'persisting'
+        ]
+    })
+
+    # Words that attribute a nearby number to a casualty category
+    CASUALTY_CONTEXT_WORDS: Dict[str, List[str]] = field(default_factory=lambda: {
+        "dead": ["dead", "killed", "kills", "killing", "death", "deaths", "died", "drowned",
+                 "perished", "casualty", "casualties", "fatalities", "fatality", "deceased",
+                 "body", "bodies", "lives", "toll"],
+        "injured": ["injured", "injuries", "wounded", "hospitalized", "hospitalised", "hurt"],
+        "missing": ["missing", "unaccounted"]
+    })
+    CASUALTY_CONTEXT_WINDOW: int = 5
+
+    # Time-sensitive keywords with urgency weights
+    URGENCY_KEYWORDS: Dict[str, float] = field(default_factory=lambda: {
+        # High urgency
+        'immediate': 0.9,
+        'urgent': 0.9,
+        'emergency': 0.8,
+        'evacuate now': 0.9,
+        'critical': 0.8,
+        'asap': 0.85,
+        
+        # Medium urgency  
+        'quick': 0.6,
+        'rush': 0.6,
+        'without delay': 0.7,
+        'right now': 0.7,
+        
+        # Low urgency but time-related
+        'soon': 0.4,
+        'pending': 0.3,
+        'monitor': 0.2,
+
+        # Rescue/response keywords
+        'rescue': 0.7,
+        'search and rescue': 0.85,
+        'recover bodies': 0.8,
+        'trapped': 0.75,
+        'missing': 0.6,
+        'rescuers': 0.7,
+        'emergency response': 0.8,
+        'rescue operations': 0.8,
+        'evacuation': 0.7,
+        
+        # Time indicators
+        'still missing': 0.65,
+        'ongoing': 0.5,
+        'continue to': 0.4,
+    })
+
+    TIME_INDICATOR_WORDS: List[str] = field(default_factory=lambda: [
+        'minutes', 'hours', 'today', 'tonight', 'now', 
+        'immediately', 'within', 'by', 'before', 'after'
+    ])
+
     # HuggingFace Models
     CRISIS_DETECTION_MODEL: str = "distilbert-base-uncased-finetuned-sst-2-english"
     TYPE_CLASSIFICATION_MODEL: str = "roberta-base"
 
+    # Model registry: pinned local copies written by fetch_models.py
+    MODEL_CACHE_DIR: str = "model_cache"  # relative to crisislens_ml/
+    # Commit SHA fetched per model; a local copy fetched at another commit
+    # fails verification
+    MODEL_REVISIONS: Dict[str, str] = field(default_factory=lambda: {
+        "distilbert-base-uncased-finetuned-sst-2-english": "714eb0fa89d2f80546fda750413ed43d93601a13",
+        "roberta-base": "e2da8e2f811d1448a5b465c236feacd80ffbac7b"
+    })
+    # Never contact the HuggingFace hub: models missing locally fail to load
+    MODEL_OFFLINE: bool = False
+    VERIFY_MODEL_CHECKSUMS: bool = True
+
+    # Map model.safetensors from the local model cache instead of copying the
+    # weights to the heap, so processes on one host share the pages
+    MMAP_MODEL_WEIGHTS: bool = True
+
+    # Inference backend for the crisis detection model: "torch" (fp32),
+    # "torch_int8" (dynamic int8 quantization) or "onnx" (ONNX Runtime,
+    # graph produced by export_model.py)
+    CRISIS_DETECTION_BACKEND: str = "torch"
+    # Export root relative to crisislens_ml/; each model gets its own sub-directory
+    ONNX_MODEL_DIR: str = "onnx_models"
+    ONNX_MODEL_FILE: str = "model.onnx"
+    ONNX_INTRA_OP_THREADS: int = 0  # 0 = ONNX Runtime default
+    # Largest hybrid score difference from fp32 accepted by the parity check
+    BACKEND_PARITY_TOLERANCE: float = 0.02
+
     # Thresholds
     CRISIS_DETECTION_THRESHOLD: float = 0.5
+
+    # Detection cascade: keyword scores outside [LOWER, UPPER] are decided
+    # without the transformer. With the 0.4/0.6 hybrid weights and a 0.5
+    # threshold, any band within [0.167, 0.833] keeps every decision identical.
+    ENABLE_DETECTION_CASCADE: bool = True
+    CASCADE_LOWER_BOUND: float = 0.15
+    CASCADE_UPPER_BOUND: float = 0.85
     TYPE_CLASSIFICATION_THRESHOLD: float = 0.3
 
     # Text Processing 
     MAX_TEXT_LENGTH: int = 50000
     MIN_TEXT_LENGTH: int = 5
 
+    # Long documents: "first" truncates to the first 256 tokens; "max", "mean"
+    # or "attention" score overlapping token windows in one forward pass and
+    # combine their crisis probabilities
+    LONG_DOCUMENT_MODE: str = "first"
+    LONG_DOC_WINDOW_STRIDE: int = 64  # tokens shared by neighbouring windows
+    LONG_DOC_MAX_WINDOWS: int = 8
+    LONG_DOC_ATTENTION_TEMPERATURE: float = 0.1
+
+    # Batched Inference
+    INFERENCE_BATCH_SIZE: int = 32
+
+    # Micro-batching for the /analyze_crisis service
+    ENABLE_MICRO_BATCHING: bool = False
+    MICRO_BATCH_WINDOW_MS: float = 10.0
+    MICRO_BATCH_MAX_SIZE: int = 16
+    MICRO_BATCH_LENGTH_BUCKETS: List[int] = field(default_factory=lambda: [32, 64, 128, 256])
+
     # Priority Weights
     WEIGHTS: Dict[str, float] = field(default_factory=lambda: {
 
@@ -136,4 +306,91 @@ class MLConfig:
     # Explanation Generator 
     USE_GEMINI_FOR_EXPLANATIONS: bool = True 
 
+    # Gemini explanation cache (keyed on bucketed prompt inputs)
+    ENABLE_EXPLANATION_CACHE: bool = True
+    EXPLANATION_CACHE_MAX_ENTRIES: int = 512
+    EXPLANATION_CACHE_TTL_SECONDS: float = 6 * 3600.0
+    EXPLANATION_CACHE_SCORE_BUCKET: float = 0.1
+
+    # /analyze_batch streaming endpoint
+    STREAM_BATCH_CHUNK_SIZE: int = 16
+    MAX_BATCH_ITEMS: int = 1000
+
+    # Serving: "sync" runs the pipeline on FastAPI's threadpool, "async" uses
+    # async endpoints with CPU stages on a dedicated executor and awaited Gemini
+    SERVING_MODE: str = "sync"
+    CPU_EXECUTOR_WORKERS: int = 4
+
+    # Load the crisis detection model in a background thread at app startup;
+    # until it is ready /ready returns 503 and detection is keyword-only
+    BACKGROUND_MODEL_WARMUP: bool = True
+
+    # Pre-fork server (prefork_server.py)
+    PREFORK_WORKERS: int = 0  # 0 = one per CPU core
+    PREFORK_TORCH_THREADS: int = 1  # intra-op threads per worker
+    PREFORK_BACKLOG: int = 2048
+    PREFORK_HEARTBEAT_SECONDS: float = 2.0
+    PREFORK_HEARTBEAT_TIMEOUT_SECONDS: float = 60.0
+
+    # Logging: level of the crisislens_ml logger and its format, "text" or
+    # "json" (one object per line). INFO writes one summary record per
+    # analysis with its stage timings; DEBUG adds the step-by-step trace.
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"
+
+    # Deferred explanations: answer with the rule-based explanation and
+    # compute the Gemini one in a background worker pool
+    DEFER_EXPLANATIONS: bool = False
+    EXPLANATION_WORKERS: int = 4
+    EXPLANATION_JOB_TTL_SECONDS: float = 3600.0
+    EXPLANATION_JOB_MAX: int = 10000
+    EXPLANATION_CALLBACK_TIMEOUT_SECONDS: float = 5.0
+    # Hosts callback URLs may point at; empty = any host that resolves to
+    # public addresses only (loopback and private networks are refused)
+    EXPLANATION_CALLBACK_ALLOWED_HOSTS: List[str] = field(default_factory=list)
+
+    # Async Gemini client
+    GEMINI_MAX_CONCURRENCY: int = 4
+    GEMINI_TIMEOUT_SECONDS: float = 10.0
+    # Circuit breaker: opens when the share of failed or slow calls in the
+    # rolling window reaches the threshold, retries after the reset delay
+    GEMINI_BREAKER_WINDOW: int = 20
+    GEMINI_BREAKER_MIN_CALLS: int = 5
+    GEMINI_BREAKER_FAILURE_RATE: float = 0.5
+    GEMINI_BREAKER_SLOW_CALL_SECONDS: float = 8.0
+    GEMINI_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Result Cache
+    ENABLE_RESULT_CACHE: bool = True
+    RESULT_CACHE_MAX_ENTRIES: int = 1024
+    RESULT_CACHE_TTL_SECONDS: float = 3600.0
+    # Optional SQLite store behind the in-memory cache (None = memory only)
+    RESULT_CACHE_DB_PATH: Optional[str] = None
+    RESULT_CACHE_DB_MAX_ENTRIES: int = 50000
+    RESULT_CACHE_DB_TTL_SECONDS: Optional[float] = 7 * 24 * 3600.0
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in FINGERPRINT_FIELDS:
+            self.__dict__["_fingerprint"] = None
+
+    def fingerprint(self) -> str:
+        """
+        Hash of the scoring settings - changes whenever weights, keywords or thresholds change
+        
+        Computed once and memoised; assigning a setting resets it. Lists and
+        dicts edited in place need a call to mark_changed().
+        """
+        fingerprint = self.__dict__.get("_fingerprint")
+        if fingerprint is None:
+            settings = {name: getattr(self, name) for name in FINGERPRINT_FIELDS}
+            encoded = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+            fingerprint = hashlib.sha256(encoded).hexdigest()[:16]
+            self.__dict__["_fingerprint"] = fingerprint
+        return fingerprint
+
+    def mark_changed(self):
+        """Recompute the fingerprint after editing a list or dict setting in place"""
+        self.__dict__["_fingerprint"] = None
+
 config = MLConfig()
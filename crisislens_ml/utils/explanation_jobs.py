@@ -0,0 +1,224 @@
+"""
+Explanation Jobs - background Gemini explanations for deferred analyses
+
+The pipeline can answer with scores and a rule-based explanation right away
+and hand the slow Gemini call to this worker pool. Finished explanations are
+kept for polling (`get`) and optionally POSTed to a caller-supplied URL.
+Callback URLs must resolve to public addresses (or name an allowlisted host),
+so callers cannot use the service to reach internal endpoints.
+"""
+import ipaddress
+import json
+import socket
+import threading
+import time
+import urllib.request
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence
+from urllib.parse import urlparse
+
+from .logger import logger
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """A redirect could point the callback at an internal address"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_callback_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def check_callback_url(callback_url: str, allowed_hosts: Sequence[str] = ()):
+    """
+    Raise ValueError unless callback_url is safe to POST to
+    
+    With an allowlist only those hosts are accepted. Without one the host
+    must resolve to public addresses only (no loopback, private, link-local
+    or reserved ranges).
+    """
+    parsed = urlparse(callback_url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError(f"Unsupported callback URL: {callback_url}")
+    host = parsed.hostname.lower()
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise ValueError(f"Callback host '{host}' is not allowed")
+        return
+    
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except socket.gaierror as e:
+        raise ValueError(f"Callback host '{host}' does not resolve: {e}")
+    for address in addresses:
+        if not ipaddress.ip_address(address.split("%")[0]).is_global:
+            raise ValueError(f"Callback host '{host}' resolves to non-public address {address}")
+
+
+class ExplanationJobManager:
+    """Thread pool running explanation jobs, with a bounded job store"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(self, generate_fn: Callable[..., Dict[str, Any]], max_workers: int = 4,
+                 result_ttl_seconds: float = 3600.0, max_jobs: int = 10000,
+                 callback_timeout_seconds: float = 5.0,
+                 callback_allowed_hosts: Optional[Sequence[str]] = None):
+        """
+        Args:
+            generate_fn: Called with the job's keyword arguments, returns the explanation
+            max_workers: Size of the worker pool
+            result_ttl_seconds: How long finished jobs stay retrievable
+            max_jobs: Maximum number of jobs kept (oldest are dropped first)
+            callback_timeout_seconds: Timeout of the callback POST
+            callback_allowed_hosts: Only these callback hosts are accepted; when
+                empty, any host resolving to public addresses is
+        """
+        self.generate_fn = generate_fn
+        self.result_ttl_seconds = result_ttl_seconds
+        self.max_jobs = max(1, max_jobs)
+        self.callback_timeout_seconds = callback_timeout_seconds
+        self.callback_allowed_hosts = tuple(host.lower() for host in callback_allowed_hosts or ())
+
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                            thread_name_prefix="explanation-job")
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Finished job ids -> completed_at, in completion order, so expiry
+        # only ever looks at the head
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.callbacks_sent = 0
+        self.callbacks_failed = 0
+
+    def submit(self, kwargs: Dict[str, Any], callback_url: Optional[str] = None,
+               on_finish: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """
+        Queue one explanation
+
+        Args:
+            kwargs: Keyword arguments for generate_fn
+            callback_url: http(s) URL that receives the finished job as JSON
+                (see check_callback_url)
+            on_finish: Called with a snapshot of the job once it has completed or
+                failed (e.g. to cache the final result)
+
+        Returns:
+            Job id to poll with get()
+        """
+        if callback_url:
+            check_callback_url(callback_url, self.callback_allowed_hosts)
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._prune_locked()
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": self.PENDING,
+                "explanation": None,
+                "error": None,
+                "created_at": time.time(),
+                "completed_at": None
+            }
+            self.submitted += 1
+
+        self._executor.submit(self._run, job_id, kwargs, callback_url, on_finish)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job, None if unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def _run(self, job_id: str, kwargs: Dict[str, Any], callback_url: Optional[str],
+             on_finish: Optional[Callable[[Dict[str, Any]], None]]):
+        self._update(job_id, status=self.RUNNING)
+        try:
+            explanation = self.generate_fn(**kwargs)
+        except Exception as e:
+            logger.exception("Explanation job %s failed: %s", job_id, e)
+            self._update(job_id, status=self.FAILED, error=str(e), completed_at=time.time())
+            with self._lock:
+                self.failed += 1
+        else:
+            self._update(job_id, status=self.COMPLETED, explanation=explanation,
+                         completed_at=time.time())
+            with self._lock:
+                self.completed += 1
+
+        job = self.get(job_id)
+        if on_finish is not None and job is not None:
+            try:
+                on_finish(job)
+            except Exception as e:
+                logger.exception("Explanation job %s completion hook failed: %s", job_id, e)
+        if callback_url:
+            self._send_callback(callback_url, job)
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+                if fields.get("completed_at") is not None:
+                    self._finished[job_id] = fields["completed_at"]
+
+    def _send_callback(self, callback_url: str, job: Optional[Dict[str, Any]]):
+        if job is None:
+            return
+        request = urllib.request.Request(
+            callback_url,
+            data=json.dumps(job, default=str).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        try:
+            # Checked again at send time: the name may resolve differently now
+            check_callback_url(callback_url, self.callback_allowed_hosts)
+            with _callback_opener.open(request, timeout=self.callback_timeout_seconds):
+                pass
+            with self._lock:
+                self.callbacks_sent += 1
+        except Exception as e:
+            logger.warning("Explanation callback to %s failed: %s", callback_url, e)
+            with self._lock:
+                self.callbacks_failed += 1
+
+    def _prune_locked(self):
+        """Drop expired finished jobs, then the oldest jobs beyond max_jobs"""
+        cutoff = time.time() - self.result_ttl_seconds
+        while self._finished:
+            job_id, completed_at = next(iter(self._finished.items()))
+            if completed_at >= cutoff:
+                break
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+        while len(self._jobs) >= self.max_jobs:
+            job_id, _ = self._jobs.popitem(last=False)
+            self._finished.pop(job_id, None)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "jobs_stored": len(self._jobs),
+                "pending": len(self._jobs) - len(self._finished),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "callbacks_sent": self.callbacks_sent,
+                "callbacks_failed": self.callbacks_failed
+            }
@@ -2,10 +2,31 @@
 Gemini API Client using NEW google-genai package
 """
 
-import google.genai as genai  # NEW IMPORT
+import asyncio
 import os
+import threading
+import time
+from collections import deque
 from typing import Dict, Any, Optional
 
+try:
+    import google.genai as genai  # NEW IMPORT
+except ImportError:
+    genai = None
+
+from .config import config
+
+
+def _response_result(response, model_name: str) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "text": response.text,
+        "model": model_name,
+        "usage": getattr(response, 'usage_metadata', {}),
+        "full_response": response
+    }
+
+
 class GeminiClient:
     """Client for Gemini API using new google-genai package"""
     
@@ -16,6 +37,9 @@ class GeminiClient:
         Args:
             api_key: Gemini API key. If None, tries GEMINI_API_KEY env var
         """
+        if genai is None:
+            raise ImportError("google-genai package is not installed")
+        
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         
         if not self.api_key:
@@ -29,10 +53,30 @@ class GeminiClient:
         
         # Use gemini-2.0-flash or gemini-1.5-flash
         self.model_name = "gemini-2.0-flash"  # Fast and capable
+        self.fallback_model_name = "gemini-1.5-flash"
+        # Set once the primary model has returned "not found"; one-way, so
+        # concurrent calls never see a half-updated model choice
+        self._primary_unavailable = False
         
         print(f"✅ Gemini API configured with {self.model_name}")
         print(f"   Key: {self.api_key[:12]}...{self.api_key[-4:]}")
     
+    @property
+    def active_model_name(self) -> str:
+        """Model the next call goes to"""
+        return self.fallback_model_name if self._primary_unavailable else self.model_name
+    
+    def fallback_for(self, model_name: str, error: Exception) -> Optional[str]:
+        """Model to retry with after `error`, None when the error is not a missing model"""
+        error_msg = str(error)
+        if model_name != self.fallback_model_name and ("404" in error_msg or "not found" in error_msg):
+            return self.fallback_model_name
+        return None
+    
+    def mark_primary_unavailable(self):
+        """The fallback answered where the primary was missing: use it from now on"""
+        self._primary_unavailable = True
+    
     def generate_content(self, prompt: str) -> Dict[str, Any]:
         """
         Generate content using Gemini API
@@ -43,40 +87,29 @@ class GeminiClient:
         Returns:
             Dictionary with response and metadata
         """
+        model_name = self.active_model_name
         try:
             # NEW SYNTAX for generate_content
             response = self.client.models.generate_content(
-                model=self.model_name,
+                model=model_name,
                 contents=prompt
             )
-            
-            return {
-                "success": True,
-                "text": response.text,
-                "model": self.model_name,
-                "usage": getattr(response, 'usage_metadata', {}),
-                "full_response": response
-            }
+            return _response_result(response, model_name)
             
         except Exception as e:
             error_msg = str(e)
             
             # Try fallback model if first fails
-            if "404" in error_msg or "not found" in error_msg:
+            fallback = self.fallback_for(model_name, e)
+            if fallback is not None:
+                model_name = fallback
                 try:
-                    self.model_name = "gemini-1.5-flash"
                     response = self.client.models.generate_content(
-                        model=self.model_name,
+                        model=model_name,
                         contents=prompt
                     )
-                    
-                    return {
-                        "success": True,
-                        "text": response.text,
-                        "model": self.model_name,
-                        "usage": getattr(response, 'usage_metadata', {}),
-                        "full_response": response
-                    }
+                    self.mark_primary_unavailable()
+                    return _response_result(response, model_name)
                     
                 except Exception as e2:
                     error_msg = f"Primary model failed: {error_msg}. Fallback failed: {str(e2)}"
@@ -84,7 +117,7 @@ class GeminiClient:
             return {
                 "success": False,
                 "error": error_msg,
-                "model": self.model_name
+                "model": model_name
             }
     
     def list_models(self) -> list:
@@ -103,4 +136,216 @@ def get_gemini_client(api_key: Optional[str] = None) -> GeminiClient:
     global _gemini_client
     if _gemini_client is None:
         _gemini_client = GeminiClient(api_key=api_key)
-    return _gemini_client
\ No newline at end of file
+    return _gemini_client
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for Gemini calls
+    
+    A call counts as failed when it errors, times out or takes longer than
+    `slow_call_seconds`. Once the failed share of the last `window_size`
+    calls reaches `failure_rate`, the breaker opens and rejects calls for
+    `reset_seconds`; then a single trial call decides whether it closes again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, window_size: int = 20, min_calls: int = 5,
+                 failure_rate: float = 0.5, slow_call_seconds: float = 8.0,
+                 reset_seconds: float = 30.0):
+        self.window_size = max(1, window_size)
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_seconds = reset_seconds
+        
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=self.window_size)  # True = failed or slow
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+        
+        self.times_opened = 0
+        self.rejected_calls = 0
+    
+    def allow_request(self) -> bool:
+        """Whether a call may go out now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN  # let one trial call through
+                return True
+            self.rejected_calls += 1
+            return False
+    
+    def record(self, success: bool, latency_seconds: float):
+        """Record the outcome of a call that was allowed through"""
+        failed = not success or latency_seconds > self.slow_call_seconds
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                if failed:
+                    self._open_locked()
+                else:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                return
+            
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_calls:
+                if sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                    self._open_locked()
+    
+    def _open_locked(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.times_opened += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "window_failures": sum(self._outcomes),
+                "window_calls": len(self._outcomes),
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected_calls
+            }
+
+
+def _model_name(client) -> str:
+    # Stubs in tests only carry model_name
+    return getattr(client, "active_model_name", None) or getattr(client, "model_name", "unknown")
+
+
+class AsyncGeminiClient:
+    """
+    Non-blocking wrapper around GeminiClient
+    
+    Uses the SDK's async surface (`client.aio`, sharing the sync client's
+    connection pool) when available and otherwise offloads the blocking call
+    to a thread. Concurrent calls are bounded by a semaphore, each call has a
+    timeout, and a CircuitBreaker short-circuits calls while Gemini is failing.
+    """
+    
+    def __init__(self, client: Optional[GeminiClient] = None,
+                 max_concurrency: Optional[int] = None,
+                 timeout_seconds: Optional[float] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            client: Sync client to wrap (any object with generate_content and
+                model_name works, e.g. a stub in tests). Defaults to the singleton.
+            max_concurrency: Maximum in-flight Gemini calls
+            timeout_seconds: Per-call timeout
+            breaker: Circuit breaker, built from config if None
+        """
+        self.client = client if client is not None else get_gemini_client()
+        self.max_concurrency = max(1, max_concurrency or config.GEMINI_MAX_CONCURRENCY)
+        self.timeout_seconds = timeout_seconds or config.GEMINI_TIMEOUT_SECONDS
+        self.breaker = breaker or CircuitBreaker(
+            window_size=config.GEMINI_BREAKER_WINDOW,
+            min_calls=config.GEMINI_BREAKER_MIN_CALLS,
+            failure_rate=config.GEMINI_BREAKER_FAILURE_RATE,
+            slow_call_seconds=config.GEMINI_BREAKER_SLOW_CALL_SECONDS,
+            reset_seconds=config.GEMINI_BREAKER_RESET_SECONDS
+        )
+        
+        # asyncio primitives belong to one event loop; recreate per loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.in_flight = 0
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def generate_content(self, prompt: str) -> Dict[str, Any]:
+        """
+        Async version of GeminiClient.generate_content
+        
+        Never raises: timeouts, errors and an open circuit come back as
+        {"success": False, ...} so callers can fall back to rule-based text.
+        """
+        model_name = _model_name(self.client)
+        if not self.breaker.allow_request():
+            return {
+                "success": False,
+                "error": "Gemini circuit breaker is open",
+                "circuit_open": True,
+                "model": model_name
+            }
+        
+        result = None
+        start = time.monotonic()
+        try:
+            async with self._get_semaphore():
+                self.in_flight += 1
+                self.calls += 1
+                start = time.monotonic()
+                try:
+                    result = await asyncio.wait_for(self._call(prompt), timeout=self.timeout_seconds)
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    result = {
+                        "success": False,
+                        "error": f"Gemini call timed out after {self.timeout_seconds}s",
+                        "model": model_name
+                    }
+                except Exception as e:
+                    result = {"success": False, "error": str(e), "model": model_name}
+                finally:
+                    self.in_flight -= 1
+        finally:
+            # A cancelled call (result is None) counts as failed; left unrecorded,
+            # a half-open breaker would wait forever for its trial call
+            success = result is not None and bool(result.get("success"))
+            if not success:
+                self.failures += 1
+            self.breaker.record(success, time.monotonic() - start)
+        return result
+    
+    async def _call(self, prompt: str) -> Dict[str, Any]:
+        aio = getattr(getattr(self.client, "client", None), "aio", None)
+        if aio is None:
+            # No async SDK surface: run the blocking call off the event loop
+            return await asyncio.to_thread(self.client.generate_content, prompt)
+        
+        model_name = _model_name(self.client)
+        try:
+            response = await aio.models.generate_content(model=model_name, contents=prompt)
+        except Exception as e:
+            # Same missing-model fallback as GeminiClient.generate_content
+            fallback = self.client.fallback_for(model_name, e)
+            if fallback is None:
+                raise
+            try:
+                response = await aio.models.generate_content(model=fallback, contents=prompt)
+            except Exception as e2:
+                return {
+                    "success": False,
+                    "error": f"Primary model failed: {e}. Fallback failed: {str(e2)}",
+                    "model": fallback
+                }
+            self.client.mark_primary_unavailable()
+            model_name = fallback
+        return _response_result(response, model_name)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout_seconds,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "breaker": self.breaker.get_stats()
+        }
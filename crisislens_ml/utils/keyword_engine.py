@@ -0,0 +1,204 @@
+"""
+Keyword Engine - single-pass Aho-Corasick matching for all keyword lists
+
+Every rule-based stage used to scan the text once per keyword (a compiled
+regex or a `keyword in text` check each). The automaton here is compiled
+once from every keyword list in MLConfig and scans a lowercased text in a
+single pass, producing a hit table the stages query instead.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from .config import MLConfig, config
+
+
+def _is_word_char(ch: str) -> bool:
+    """Same notion of a word character as regex \\w"""
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordHits:
+    """Hit table produced by one scan of a (lowercased) text"""
+
+    def __init__(self, text: str, word_positions: Dict[str, List[int]],
+                 substrings: Set[str], vocabulary: frozenset):
+        self.text = text
+        self._word_positions = word_positions
+        self._substrings = substrings
+        self._vocabulary = vocabulary
+
+    def has_word(self, keyword: str) -> bool:
+        """Whole-word match, same as re.search(r'\\b<keyword>\\b', re.IGNORECASE)"""
+        keyword = keyword.lower()
+        if keyword in self._vocabulary:
+            return keyword in self._word_positions
+        return bool(self._word_positions_slow(keyword))
+
+    def contains(self, keyword: str) -> bool:
+        """Plain substring match, same as `keyword in text`"""
+        if keyword in self._vocabulary:
+            return keyword in self._substrings
+        return keyword in self.text
+
+    def count(self, keyword: str) -> int:
+        """Number of whole-word occurrences"""
+        return len(self.positions(keyword))
+
+    def positions(self, keyword: str) -> List[int]:
+        """Start offsets of the whole-word occurrences"""
+        keyword = keyword.lower()
+        if keyword in self._vocabulary:
+            return self._word_positions.get(keyword, [])
+        return self._word_positions_slow(keyword)
+
+    def words_found(self, keywords: Iterable[str]) -> List[str]:
+        """Keywords (in the given order) that occur as whole words"""
+        return [keyword for keyword in keywords if self.has_word(keyword)]
+
+    def substrings_found(self, keywords: Iterable[str]) -> List[str]:
+        """Keywords (in the given order) that occur anywhere in the text"""
+        return [keyword for keyword in keywords if self.contains(keyword)]
+
+    def _word_positions_slow(self, keyword: str) -> List[int]:
+        """Fallback for keywords that were not compiled into the automaton"""
+        if not keyword:
+            return []
+        positions = []
+        start = self.text.find(keyword)
+        while start != -1:
+            if _has_boundaries(self.text, start, start + len(keyword), keyword):
+                positions.append(start)
+            start = self.text.find(keyword, start + 1)
+        return positions
+
+
+def _has_boundaries(text: str, start: int, end: int, keyword: str) -> bool:
+    """Check regex \\b semantics on both ends of text[start:end]"""
+    before = _is_word_char(text[start - 1]) if start > 0 else False
+    after = _is_word_char(text[end]) if end < len(text) else False
+    return (before != _is_word_char(keyword[0])) and (_is_word_char(keyword[-1]) != after)
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton compiled into a deterministic transition table"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted({kw.lower() for kw in keywords if kw})
+        self.vocabulary = frozenset(self.keywords)
+        self._build()
+
+    def _build(self):
+        goto: List[Dict[str, int]] = [{}]
+        terminal: List[Optional[int]] = [None]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    terminal.append(None)
+                state = next_state
+            terminal[state] = index
+
+        # Breadth-first pass for failure links, folding them into a full
+        # transition table so scanning never has to follow failure chains
+        fail = [0] * len(goto)
+        outputs: List[tuple] = [()] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+
+        queue = list(goto[0].values())
+        for state in queue:
+            outputs[state] = (terminal[state],) if terminal[state] is not None else ()
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            transitions = dict(delta[fail[state]])
+            for ch, next_state in goto[state].items():
+                fail_state = delta[fail[state]].get(ch, 0) if state else 0
+                fail[next_state] = fail_state
+                own = (terminal[next_state],) if terminal[next_state] is not None else ()
+                outputs[next_state] = own + outputs[fail_state]
+                transitions[ch] = next_state
+                queue.append(next_state)
+            delta[state] = transitions
+
+        self._delta = delta
+        self._outputs = outputs
+        self._lengths = [len(keyword) for keyword in self.keywords]
+
+    def scan(self, text_lower: str) -> KeywordHits:
+        """Scan a lowercased text once and return every keyword hit"""
+        delta = self._delta
+        outputs = self._outputs
+        keywords = self.keywords
+        lengths = self._lengths
+        text_length = len(text_lower)
+
+        word_positions: Dict[str, List[int]] = {}
+        substrings: Set[str] = set()
+        state = 0
+
+        for end, ch in enumerate(text_lower):
+            state = delta[state].get(ch, 0)
+            matched = outputs[state]
+            if not matched:
+                continue
+            for index in matched:
+                keyword = keywords[index]
+                substrings.add(keyword)
+                start = end - lengths[index] + 1
+                before = _is_word_char(text_lower[start - 1]) if start > 0 else False
+                after = _is_word_char(text_lower[end + 1]) if end + 1 < text_length else False
+                if before != _is_word_char(keyword[0]) and _is_word_char(keyword[-1]) != after:
+                    word_positions.setdefault(keyword, []).append(start)
+
+        return KeywordHits(text_lower, word_positions, substrings, self.vocabulary)
+
+
+def config_vocabulary(cfg: MLConfig) -> frozenset:
+    """Every keyword the rule-based stages look for"""
+    vocabulary: Set[str] = set()
+    vocabulary.update(cfg.CRISIS_KEYWORDS)
+    vocabulary.update(cfg.NON_CRISIS_KEYWORDS)
+    vocabulary.update(cfg.STRONG_CRISIS_INDICATORS)
+    vocabulary.update(cfg.NON_CRISIS_CONTEXTS)
+    vocabulary.update(cfg.URGENCY_KEYWORDS)
+    vocabulary.update(cfg.TIME_INDICATOR_WORDS)
+    for keywords in cfg.TYPE_KEYWORDS.values():
+        vocabulary.update(keywords)
+    for keywords in cfg.SEVERITY_KEYWORDS.values():
+        vocabulary.update(keywords)
+    return frozenset(kw.lower() for kw in vocabulary if kw)
+
+
+_engine: Optional[KeywordAutomaton] = None
+_engine_fingerprint: Optional[str] = None
+_engine_lock = threading.Lock()
+
+def get_keyword_engine() -> KeywordAutomaton:
+    """
+    Get the shared automaton, recompiling it if the config keyword lists changed
+    
+    The vocabulary is only rebuilt when the (memoised) config fingerprint
+    changes; the automaton only when the vocabulary itself changed.
+    """
+    global _engine, _engine_fingerprint
+    fingerprint = config.fingerprint()
+    engine = _engine
+    if engine is not None and _engine_fingerprint == fingerprint:
+        return engine
+    vocabulary = config_vocabulary(config)
+    with _engine_lock:
+        if _engine is None or _engine.vocabulary != vocabulary:
+            _engine = KeywordAutomaton(vocabulary)
+        _engine_fingerprint = fingerprint
+        return _engine
+
+def scan_keywords(text: str) -> KeywordHits:
+    """Convenience function: lowercase and scan text with the shared automaton"""
+    return get_keyword_engine().scan(text.lower())
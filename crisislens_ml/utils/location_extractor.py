@@ -3,6 +3,7 @@ Simple Location Extractor - Works without complex dependencies
 """
 
 import re
+import threading
 from typing import Dict, List, Optional
 
 class SimpleLocationExtractor:
@@ -161,14 +162,16 @@ class SimpleLocationExtractor:
             "text_preview": text[:100] + "..." if len(text) > 100 else text
         }
 
-# Singleton instance
+# Singleton instance (read-only after construction, shared by all requests)
 _simple_location_extractor = None
+_simple_location_extractor_lock = threading.Lock()
 
 def get_simple_location_extractor() -> SimpleLocationExtractor:
     """Get or create extractor instance"""
     global _simple_location_extractor
-    if _simple_location_extractor is None:
-        _simple_location_extractor = SimpleLocationExtractor()
+    with _simple_location_extractor_lock:
+        if _simple_location_extractor is None:
+            _simple_location_extractor = SimpleLocationExtractor()
     return _simple_location_extractor
 
 def extract_location_simple(text: str) -> Dict:
@@ -1,77 +1,119 @@
 # utils/logger.py
+"""
+Logging setup
+
+Records go through a QueueHandler: the calling thread only enqueues them and
+a QueueListener thread formats and writes them to stdout and the daily log
+file, so a slow disk never stalls a request. LOG_FORMAT="json" writes one
+JSON object per line; the pipeline's per-request summary (log_event) puts
+its fields at the top level of that object.
+"""
+import atexit
+import json
 import logging
-import sys
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict
 
-def setup_logger(name: str = "crisislens_ml"):
-    """Setup logging configuration"""
+from .config import config
 
-    # Ensure logs directory exists
-    os.makedirs("logs", exist_ok=True)
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Daily log files go to crisislens_ml/logs whatever the working directory
+LOG_DIR = os.path.join(PACKAGE_DIR, "logs")
 
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
 
-     # Prevent duplicate handlers
-    if logger.handlers:
-        return logger
-    
-    # Create handlers
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        payload.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """The classic pipe-separated line, with log_event fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s | %(name)s | %(levelname)s | %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " | " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def _sink_handlers(formatter: logging.Formatter):
+    # Ensure logs directory exists
+    os.makedirs(LOG_DIR, exist_ok=True)
+
     console_handler = logging.StreamHandler(sys.stdout)
-    file_handler = logging.FileHandler(f"logs/ml_pipeline_{datetime.now().strftime('%Y%m%d')}.log")
-    
-   # Formatter
-    formatter = logging.Formatter(
-        "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
+    # UTF-8 so emoji and non-ASCII locations survive on Windows
+    file_handler = logging.FileHandler(
+        os.path.join(LOG_DIR, f"ml_pipeline_{datetime.now().strftime('%Y%m%d')}.log"),
+        encoding='utf-8'
     )
-    
-    # Add formatters to handlers
-    console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    
-    return logger
+    for handler in (console_handler, file_handler):
+        handler.setFormatter(formatter)
+    return console_handler, file_handler
+
 
 def setup_logger(name: str = "crisislens_ml"):
-    """Setup logging configuration with Unicode support"""
-    
-    # Ensure logs directory exists
-    os.makedirs("logs", exist_ok=True)
+    """Setup logging configuration with a non-blocking queue in front of the sinks"""
 
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
+    logger.setLevel(getattr(logging, config.LOG_LEVEL.upper(), logging.INFO))
 
     # Prevent duplicate handlers
     if logger.handlers:
         return logger
-    
-    # Create handlers with UTF-8 encoding
-    console_handler = logging.StreamHandler(sys.stdout)
-    
-    # Fix for Windows: Use UTF-8 encoding for file handler
-    file_handler = logging.FileHandler(
-        f"logs/ml_pipeline_{datetime.now().strftime('%Y%m%d')}.log",
-        encoding='utf-8'
-    )
-    
-    # Formatter
-    formatter = logging.Formatter(
-        "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
+
+    formatter = JsonFormatter() if config.LOG_FORMAT == "json" else TextFormatter()
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    listener = logging.handlers.QueueListener(
+        queue_handler.queue, *_sink_handlers(formatter), respect_handler_level=True
     )
-    
-    # Add formatters to handlers
-    console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    
+    listener.start()
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    def restart_in_child():
+        # The listener thread does not survive fork (prefork_server.py workers)
+        queue_handler.queue = queue.SimpleQueue()
+        listener.queue = queue_handler.queue
+        listener._thread = None
+        listener.start()
+
+    # Flush queued records on exit
+    atexit.register(listener.stop)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=restart_in_child)
+
     return logger
 
+
+def log_event(message: str, level: int = logging.INFO, **fields):
+    """One structured record; nothing is formatted when the level is disabled"""
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={"fields": fields})
+
+
+def trace_enabled() -> bool:
+    """Whether the per-step DEBUG trace of each analysis is on"""
+    return logger.isEnabledFor(logging.DEBUG)
+
+
 logger = setup_logger()
-logger.info("Logger initialized successfully")
\ No newline at end of file
+logger.info("Logger initialized successfully")
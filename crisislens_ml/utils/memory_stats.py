@@ -0,0 +1,43 @@
+"""
+Memory Stats - resident memory of the current process
+
+On Linux, RSS is split into anonymous (private heap) and file-backed pages,
+plus PSS, which divides shared pages between the processes mapping them.
+Elsewhere only the peak RSS is available (nothing on Windows, which has no
+`resource` module).
+"""
+import sys
+from typing import Dict
+
+_STATUS_FIELDS = {"VmRSS": "rss_mb", "RssAnon": "rss_anon_mb", "RssFile": "rss_file_mb", "RssShmem": "rss_shmem_mb"}
+_ROLLUP_FIELDS = {"Pss": "pss_mb", "Pss_Anon": "pss_anon_mb", "Pss_File": "pss_file_mb"}
+
+
+def _read_kb_fields(path: str, fields: Dict[str, str]) -> Dict[str, float]:
+    values = {}
+    with open(path) as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in fields:
+                values[fields[key]] = round(int(rest.split()[0]) / 1024, 1)
+    return values
+
+
+def process_memory() -> Dict[str, float]:
+    """Resident memory of this process in MB"""
+    try:
+        stats = _read_kb_fields("/proc/self/status", _STATUS_FIELDS)
+    except OSError:
+        try:
+            import resource
+        except ImportError:
+            return {}
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS, kilobytes on Linux
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return {"peak_rss_mb": round(peak / divisor, 1)}
+    try:
+        stats.update(_read_kb_fields("/proc/self/smaps_rollup", _ROLLUP_FIELDS))
+    except OSError:
+        pass
+    return stats
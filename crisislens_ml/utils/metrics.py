@@ -0,0 +1,148 @@
+"""
+Metrics - per-stage latency histograms in Prometheus text format
+
+Each request gets a StageTimer; when the request finishes its stage times are
+added to the process-wide histograms served on /metrics. With the pre-fork
+server every worker keeps (and serves) its own histograms.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; spans regex stages (sub-millisecond) to Gemini calls (seconds)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram for one label set (not thread-safe on its own)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        rows = []
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            rows.append((_format_bound(bound), running))
+        rows.append(("+Inf", self.count))
+        return rows
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+class MetricsRegistry:
+    """Thread-safe stage and request latency histograms"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._stages: Dict[str, Histogram] = {}
+        self._requests: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe_request(self, kind: str, total_seconds: float, stages: Dict[str, float]):
+        with self._lock:
+            for stage, seconds in stages.items():
+                self._histogram(self._stages, stage).observe(seconds)
+            self._histogram(self._requests, kind).observe(total_seconds)
+
+    def _histogram(self, table: Dict[str, Histogram], label: str) -> Histogram:
+        histogram = table.get(label)
+        if histogram is None:
+            histogram = table[label] = Histogram(self.buckets)
+        return histogram
+
+    def render(self) -> str:
+        """Prometheus text exposition (format 0.0.4)"""
+        with self._lock:
+            lines = []
+            lines += _render_histogram(
+                "crisislens_stage_duration_seconds", "Time spent in each pipeline stage",
+                "stage", self._stages
+            )
+            lines += _render_histogram(
+                "crisislens_request_duration_seconds", "End-to-end analysis time by result kind",
+                "kind", self._requests
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _render_histogram(name: str, help_text: str, label: str,
+                      table: Dict[str, Histogram]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for value in sorted(table):
+        histogram = table[value]
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{label}="{value}",le="{bound}"}} {count}')
+        lines.append(f'{name}_sum{{{label}="{value}"}} {histogram.total:.6f}')
+        lines.append(f'{name}_count{{{label}="{value}"}} {histogram.count}')
+    return lines
+
+
+def render_counter(name: str, help_text: str, label: str, values: Dict[str, float]) -> str:
+    """Prometheus text for a labelled counter"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for value in sorted(values):
+        lines.append(f'{name}{{{label}="{value}"}} {values[value]}')
+    return "\n".join(lines) + "\n"
+
+
+class StageTimer:
+    """
+    Wall-clock time per stage for one request
+
+    Sequential steps are timed with mark()/lap(): each lap is charged the
+    time since the previous mark or lap. Stages timed more than once
+    accumulate. The request total is the sum of its stages.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def mark(self):
+        self._last = time.perf_counter()
+
+    def lap(self, name: str):
+        now = time.perf_counter()
+        self.record(name, now - self._last)
+        self._last = now
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def breakdown_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+
+    def finish(self, kind: str, registry: Optional[MetricsRegistry] = None):
+        """Add this request to the histograms"""
+        (registry or get_metrics()).observe_request(kind, sum(self.stages.values()), self.stages)
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    return _metrics
@@ -0,0 +1,46 @@
+"""
+Memory-mapped safetensors loading
+
+Tensors are views into one read-only, copy-on-write mapping of the file, so
+their pages live in the page cache: every process on the host that maps the
+same file shares them instead of holding a private heap copy.
+"""
+import json
+import os
+import struct
+from typing import Any, Dict, Tuple
+
+# safetensors dtype codes -> torch dtype names
+_DTYPES = {
+    "F64": "float64", "F32": "float32", "F16": "float16", "BF16": "bfloat16",
+    "I64": "int64", "I32": "int32", "I16": "int16", "I8": "int8",
+    "U8": "uint8", "BOOL": "bool",
+}
+
+
+def read_safetensors_header(path: str) -> Tuple[Dict[str, Any], int]:
+    """Return (tensor entries, byte offset where the tensor data starts)"""
+    with open(path, "rb") as f:
+        (header_size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_size))
+    header.pop("__metadata__", None)
+    return header, 8 + header_size
+
+
+def load_mmap_state_dict(path: str) -> Dict[str, Any]:
+    """State dict whose tensors are backed by a shared mapping of the file"""
+    import torch
+
+    header, data_start = read_safetensors_header(path)
+    storage = torch.UntypedStorage.from_file(path, shared=False, nbytes=os.path.getsize(path))
+    file_bytes = torch.empty(0, dtype=torch.uint8).set_(storage)
+
+    state_dict = {}
+    for name, entry in header.items():
+        dtype = getattr(torch, _DTYPES[entry["dtype"]])
+        start, end = entry["data_offsets"]
+        raw = file_bytes[data_start + start:data_start + end]
+        if (data_start + start) % dtype.itemsize:
+            raw = raw.clone()  # misaligned entries cannot be viewed in place
+        state_dict[name] = raw.view(dtype).reshape(entry["shape"])
+    return state_dict
@@ -0,0 +1,226 @@
+"""
+Model Registry - pinned local copies of the HuggingFace models
+
+fetch_models.py downloads each model at its pinned revision into
+<MODEL_CACHE_DIR>/<name> and writes a manifest with the resolved commit and
+a sha256 per file. At load time the registry hands the backends that
+directory (loaded with local_files_only, so the hub is never contacted) after
+checking the files against the manifest.
+
+Hashing multi-GB weights at every worker start is slow, so a successful check
+leaves a stamp with each file's size and mtime; while those are unchanged the
+files count as verified. fetch_models.py --verify always rehashes.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .config import config
+
+MANIFEST_FILE = "manifest.json"
+# (size, mtime) of every file at its last successful checksum verification
+VERIFIED_STAMP_FILE = ".verified.json"
+COMMIT_SHA = re.compile(r"^[0-9a-f]{40}$")
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files needed to load a sequence classifier and its tokenizer
+DOWNLOAD_PATTERNS = ["*.json", "*.safetensors", "*.txt", "*.model", "merges.txt", "vocab.*"]
+
+
+class ModelIntegrityError(RuntimeError):
+    """A pinned model directory does not match its manifest"""
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_stats(model_dir: str, relatives) -> Optional[Dict[str, list]]:
+    """{relative: [size, mtime_ns]}, None if a file is missing"""
+    stats = {}
+    for relative in relatives:
+        try:
+            stat = os.stat(os.path.join(model_dir, relative))
+        except FileNotFoundError:
+            return None
+        stats[relative] = [stat.st_size, stat.st_mtime_ns]
+    return stats
+
+
+class ModelRegistry:
+    """Resolves model names to verified local directories"""
+
+    def __init__(self, cache_dir: Optional[str] = None, offline: Optional[bool] = None,
+                 verify_checksums: Optional[bool] = None):
+        self.cache_dir = os.path.join(PACKAGE_DIR, cache_dir or config.MODEL_CACHE_DIR)
+        self.offline = config.MODEL_OFFLINE if offline is None else offline
+        self.verify_checksums = config.VERIFY_MODEL_CHECKSUMS if verify_checksums is None else verify_checksums
+        self._verified = set()
+        self._lock = threading.Lock()
+
+    def local_dir(self, model_name: str) -> str:
+        return os.path.join(self.cache_dir, model_name.replace("/", "--"))
+
+    def manifest(self, model_name: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.local_dir(model_name), MANIFEST_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_manifest(self, model_name: str, revision: Optional[str] = None) -> Dict[str, Any]:
+        """Record a sha256 for every file currently in the model's directory"""
+        model_dir = self.local_dir(model_name)
+        files = {}
+        for root, _, names in os.walk(model_dir):
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, model_dir)
+                if relative in (MANIFEST_FILE, VERIFIED_STAMP_FILE) or relative.startswith(".cache"):
+                    continue
+                files[relative] = _sha256(path)
+
+        manifest = {
+            "model_name": model_name,
+            "revision": revision,
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "files": files
+        }
+        with open(os.path.join(model_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        # The hashes were just taken from these very files
+        self._write_stamp(model_name, manifest)
+        return manifest
+
+    def verify(self, model_name: str, use_stamp: bool = True) -> Dict[str, Any]:
+        """
+        Raise ModelIntegrityError unless every manifest file is present and unchanged
+
+        With use_stamp, files whose size and mtime match the last successful
+        verification are not rehashed.
+        """
+        manifest = self.manifest(model_name)
+        if manifest is None:
+            raise ModelIntegrityError(f"No manifest for {model_name} in {self.local_dir(model_name)}")
+
+        pinned = config.MODEL_REVISIONS.get(model_name)
+        if pinned and manifest["revision"] != pinned:
+            raise ModelIntegrityError(
+                f"{model_name}: local copy is revision {manifest['revision']}, pinned {pinned} - run fetch_models.py"
+            )
+        if use_stamp and self._stamp_matches(model_name, manifest):
+            return manifest
+
+        model_dir = self.local_dir(model_name)
+        for relative, expected in manifest["files"].items():
+            path = os.path.join(model_dir, relative)
+            if not os.path.exists(path):
+                raise ModelIntegrityError(f"{model_name}: missing {relative}")
+            if _sha256(path) != expected:
+                raise ModelIntegrityError(f"{model_name}: checksum mismatch for {relative}")
+        self._write_stamp(model_name, manifest)
+        return manifest
+
+    def _stamp_payload(self, model_name: str, manifest: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        files = _file_stats(self.local_dir(model_name), manifest["files"])
+        if files is None:
+            return None
+        manifest_digest = hashlib.sha256(
+            json.dumps(manifest["files"], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return {"manifest": manifest_digest, "files": files}
+
+    def _stamp_matches(self, model_name: str, manifest: Dict[str, Any]) -> bool:
+        path = os.path.join(self.local_dir(model_name), VERIFIED_STAMP_FILE)
+        try:
+            with open(path, encoding="utf-8") as f:
+                stamp = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return stamp == self._stamp_payload(model_name, manifest)
+
+    def _write_stamp(self, model_name: str, manifest: Dict[str, Any]):
+        payload = self._stamp_payload(model_name, manifest)
+        if payload is None:
+            return
+        path = os.path.join(self.local_dir(model_name), VERIFIED_STAMP_FILE)
+        # Written to a temp file and renamed, so prefork workers never read half a stamp
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(temp_path, path)
+        except OSError:
+            pass  # read-only model directory: verify again next time
+
+    def resolve(self, model_name: str) -> Tuple[str, bool]:
+        """
+        Where to load a model from
+
+        Returns (path_or_name, local_files_only). A fetched model resolves to
+        its verified local directory; a missing one falls back to the hub
+        name, or raises FileNotFoundError when MODEL_OFFLINE is set.
+        """
+        model_dir = self.local_dir(model_name)
+        if not os.path.exists(os.path.join(model_dir, MANIFEST_FILE)):
+            if self.offline:
+                raise FileNotFoundError(
+                    f"{model_name} is not in {self.cache_dir} - run fetch_models.py (MODEL_OFFLINE is set)"
+                )
+            return model_name, False
+
+        # Checksums are verified once per process (rehashed only when files changed)
+        with self._lock:
+            if self.verify_checksums and model_name not in self._verified:
+                self.verify(model_name)
+                self._verified.add(model_name)
+        return model_dir, True
+
+    def fetch(self, model_name: str, revision: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Download a model and write its manifest
+
+        Without `revision` the model must have a commit SHA pinned in
+        config.MODEL_REVISIONS; an explicit revision (branch or tag) is
+        resolved to the commit it points at right now.
+        """
+        if revision is None:
+            revision = config.MODEL_REVISIONS.get(model_name)
+            if not revision or not COMMIT_SHA.match(revision):
+                raise ValueError(
+                    f"{model_name} has no commit SHA pinned in config.MODEL_REVISIONS "
+                    f"(got {revision!r}) - pass an explicit revision to resolve one"
+                )
+        from huggingface_hub import HfApi, snapshot_download
+
+        commit = HfApi().model_info(model_name, revision=revision).sha
+        snapshot_download(
+            repo_id=model_name,
+            revision=commit,
+            local_dir=self.local_dir(model_name),
+            allow_patterns=DOWNLOAD_PATTERNS
+        )
+        with self._lock:
+            self._verified.discard(model_name)
+        return self.write_manifest(model_name, commit)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create the registry (singleton)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+    return _registry
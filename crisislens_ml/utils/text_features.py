@@ -0,0 +1,81 @@
+"""
+Text Features - per-request text analysis shared by every pipeline stage
+
+The pipeline used to lowercase, split and regex-scan the same report in
+every stage. TextFeatures does that work once; each stage accepts either a
+raw string or a TextFeatures instance.
+"""
+import re
+from typing import List, Optional, Tuple, Union
+
+from .keyword_engine import KeywordHits, get_keyword_engine
+
+_TOKEN_PATTERN = re.compile(r'\S+')
+_NUMBER_PATTERN = re.compile(r'\b\d+\b')
+
+
+class TextFeatures:
+    """Normalized text, tokens, number spans and keyword hits for one text"""
+
+    __slots__ = ("text", "text_lower", "tokens", "token_offsets",
+                 "number_spans", "_keyword_hits", "_max_number")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.text_lower = text.lower()
+
+        # Same tokens as text_lower.split(), plus where each one starts
+        self.tokens: List[str] = []
+        self.token_offsets: List[int] = []
+        for match in _TOKEN_PATTERN.finditer(self.text_lower):
+            self.tokens.append(match.group())
+            self.token_offsets.append(match.start())
+
+        # Spans of standalone digit runs in the original text
+        self.number_spans: List[Tuple[int, int]] = [
+            match.span() for match in _NUMBER_PATTERN.finditer(text)
+        ]
+
+        self._keyword_hits: Optional[KeywordHits] = None
+        self._max_number: Optional[int] = None
+
+    @classmethod
+    def from_text(cls, text: Union[str, 'TextFeatures']) -> 'TextFeatures':
+        """Build features for raw text (features are passed through unchanged)"""
+        if isinstance(text, TextFeatures):
+            return text
+        return cls(text if isinstance(text, str) else "")
+
+    @property
+    def keyword_hits(self) -> KeywordHits:
+        """Keyword hit table, computed on first use"""
+        if self._keyword_hits is None:
+            self._keyword_hits = get_keyword_engine().scan(self.text_lower)
+        return self._keyword_hits
+
+    @property
+    def word_count(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def numbers(self) -> List[str]:
+        """Standalone numbers, same as re.findall(r'\\b\\d+\\b', text)"""
+        return [self.text[start:end] for start, end in self.number_spans]
+
+    @property
+    def max_number(self) -> Optional[int]:
+        """Largest standalone number, None if the text has no numbers"""
+        if self._max_number is None and self.number_spans:
+            self._max_number = max(map(int, self.numbers))
+        return self._max_number
+
+    def __repr__(self) -> str:
+        preview = self.text[:40] + "..." if len(self.text) > 40 else self.text
+        return f"TextFeatures({preview!r}, tokens={len(self.tokens)})"
+
+
+TextInput = Union[str, TextFeatures]
+
+def ensure_features(text: TextInput) -> TextFeatures:
+    """Accept raw text or precomputed features and return features"""
+    return TextFeatures.from_text(text)
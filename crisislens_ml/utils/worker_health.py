@@ -0,0 +1,61 @@
+"""
+Worker Health - per-worker counters in shared memory for the pre-fork server
+
+The table is allocated in the parent before forking, so every worker writes
+its own slot and any worker (or the parent) can read all of them.
+"""
+import time
+from multiprocessing.sharedctypes import RawArray
+from typing import Any, Dict, List
+
+_FIELDS = ("pid", "started_at", "heartbeat_at", "requests", "errors", "in_flight", "restarts")
+_INDEX = {name: i for i, name in enumerate(_FIELDS)}
+
+
+class WorkerHealthTable:
+    """Fixed-size table of worker slots backed by an anonymous shared mapping"""
+
+    def __init__(self, num_workers: int):
+        self.num_workers = max(1, num_workers)
+        self._values = RawArray('d', self.num_workers * len(_FIELDS))
+
+    def _offset(self, slot: int, field: str) -> int:
+        return slot * len(_FIELDS) + _INDEX[field]
+
+    def get(self, slot: int, field: str) -> float:
+        return self._values[self._offset(slot, field)]
+
+    def set(self, slot: int, field: str, value: float):
+        self._values[self._offset(slot, field)] = value
+
+    def incr(self, slot: int, field: str, delta: float = 1):
+        # Each field of a slot has a single writer (its worker, or the parent
+        # for "restarts"), so no cross-process lock is needed
+        self._values[self._offset(slot, field)] += delta
+
+    def reset_slot(self, slot: int, pid: int):
+        """Start a fresh worker generation in a slot (restart count is kept)"""
+        now = time.time()
+        for field in _FIELDS:
+            if field != "restarts":
+                self.set(slot, field, 0)
+        self.set(slot, "pid", pid)
+        self.set(slot, "started_at", now)
+        self.set(slot, "heartbeat_at", now)
+
+    def heartbeat_age(self, slot: int) -> float:
+        return time.time() - self.get(slot, "heartbeat_at")
+
+    def snapshot(self, heartbeat_timeout: float) -> List[Dict[str, Any]]:
+        """All slots as dicts, with uptime and a healthy flag"""
+        now = time.time()
+        workers = []
+        for slot in range(self.num_workers):
+            row = {field: self.get(slot, field) for field in _FIELDS}
+            for field in ("pid", "requests", "errors", "in_flight", "restarts"):
+                row[field] = int(row[field])
+            row["slot"] = slot
+            row["uptime_seconds"] = round(now - row["started_at"], 1) if row["pid"] else 0.0
+            row["healthy"] = bool(row["pid"]) and now - row["heartbeat_at"] <= heartbeat_timeout
+            workers.append(row)
+        return workers